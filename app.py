@@ -5,15 +5,29 @@
 
 import json
 import logging
-from typing import List
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
 from fastapi import APIRouter, FastAPI
+from fastapi.openapi.constants import REF_TEMPLATE
 from fastapi.openapi.utils import get_openapi
+from pydantic import TypeAdapter
+from pydantic.json_schema import GenerateJsonSchema
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
 
 from repository_service_tuf_api import (
+    BOOTSTRAP_STATE_CACHE_TTL,
+    SETTINGS_SNAPSHOT_TTL,
+    TOPOLOGY_CACHE_TTL,
     __version__,
+    bootstrap_state_async,
+    replicas_state,
     settings,
-    settings_repository,
+    shared_settings_refresher,
+    start_replicas_monitor,
+    start_settings_listener,
 )
 from repository_service_tuf_api.api.artifacts import router as artifacts_v1
 from repository_service_tuf_api.api.bootstrap import router as bootstrap_v1
@@ -21,17 +35,57 @@ from repository_service_tuf_api.api.config import router as config_v1
 from repository_service_tuf_api.api.delegations import router as delegations_v1
 from repository_service_tuf_api.api.metadata import router as metadata_v1
 from repository_service_tuf_api.api.tasks import router as tasks_v1
+from repository_service_tuf_api.artifacts import AddPayload
+from repository_service_tuf_api.bootstrap import start_bootstrap_watchdog
+from repository_service_tuf_api.config import CONFIG_CACHE_TTL
+from repository_service_tuf_api.http_cache import PrecompressedContent
+from repository_service_tuf_api.metadata import METADATA_SIGN_CACHE_TTL
+from repository_service_tuf_api.metrics import MetricsMiddleware, metrics
 
 TITLE = "Repository Service for TUF API"
 DESCRITPTION = "Repository Service for TUF Rest API"
 DOCS_URL = "/"
 OPENAPI_VERSION = "3.0.0"
+# Request body models validated by the endpoints from the raw request body
+# (not declared as endpoint parameters)
+RAW_BODY_MODELS = [AddPayload]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if (
+        BOOTSTRAP_STATE_CACHE_TTL > 0
+        or CONFIG_CACHE_TTL > 0
+        or METADATA_SIGN_CACHE_TTL > 0
+        or SETTINGS_SNAPSHOT_TTL > 0
+        or TOPOLOGY_CACHE_TTL > 0
+        or shared_settings_refresher is not None
+    ):
+        start_settings_listener()
+
+    if replicas_state is not None:
+        start_replicas_monitor()
+
+    if shared_settings_refresher is not None:
+        shared_settings_refresher.start()
+
+    # resume the pending bootstrap tasks (if any)
+    start_bootstrap_watchdog()
+
+    bs_state = await bootstrap_state_async()
+    logging.info(f"Bootstrap ID: {bs_state.task_id}")
+
+    openapi_document()
+
+    yield
+
 
 rstuf_app = FastAPI(
     title=TITLE,
     version=__version__.version,
     openapi_version=OPENAPI_VERSION,
     docs_url="/",
+    lifespan=lifespan,
 )
 
 
@@ -45,12 +99,58 @@ def _custom_openapi():  # pragma: no cover -- not used by RSTUF logic
         description=DESCRITPTION,
         routes=rstuf_app.routes,
     )
+    _, definitions = GenerateJsonSchema(
+        ref_template=REF_TEMPLATE
+    ).generate_definitions(
+        inputs=[
+            (model, "validation", TypeAdapter(model).core_schema)
+            for model in RAW_BODY_MODELS
+        ]
+    )
+    schemas = {**openapi_schema["components"]["schemas"], **definitions}
+    openapi_schema["components"]["schemas"] = dict(sorted(schemas.items()))
     rstuf_app.openapi_schema = openapi_schema
     return rstuf_app.openapi_schema
 
 
 rstuf_app.openapi = _custom_openapi
 
+_openapi_document: Optional[PrecompressedContent] = None
+
+
+def openapi_document() -> PrecompressedContent:
+    """The OpenAPI document, generated and encoded once (on startup)."""
+    global _openapi_document
+    if _openapi_document is None:
+        # same encoding as the FastAPI default `JSONResponse`
+        content = json.dumps(
+            rstuf_app.openapi(),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode()
+        _openapi_document = PrecompressedContent(content, "application/json")
+
+    return _openapi_document
+
+
+async def openapi_json(request: Request) -> Response:
+    return openapi_document().response(request)
+
+
+# Serve the OpenAPI document (used by the docs) from `openapi_document`
+# instead of the FastAPI default, which encodes it in every request.
+rstuf_app.router.routes = [
+    (
+        Route(rstuf_app.openapi_url, openapi_json, include_in_schema=False)
+        if getattr(route, "path", None) == rstuf_app.openapi_url
+        else route
+    )
+    for route in rstuf_app.router.routes
+]
+rstuf_app.add_middleware(MetricsMiddleware)
+rstuf_app.add_route("/metrics", metrics, include_in_schema=False)
+
 
 api_v1 = APIRouter(
     prefix="/api/v1",
@@ -94,7 +194,6 @@ def load_endpoints():
 
 
 load_endpoints()
-logging.info(f"Bootstrap ID: {settings_repository.get_fresh('BOOTSTRAP')}")
 
 
 def export_swagger_json(filepath):
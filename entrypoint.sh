@@ -1,6 +1,14 @@
 #!/bin/bash
 #
 
+if [[ ${RSTUF_API_SERVER} == "gunicorn" ]]; then
+    if [[ -n ${SECRETS_RSTUF_SSL_CERT} ]] && [[ -z ${SECRETS_RSTUF_SSL_KEY} ]]; then
+        echo "Missing variable SECRETS_RSTUF_SSL_KEY"
+        exit 1
+    fi
+    exec gunicorn -c gunicorn.conf.py app:rstuf_app
+fi
+
 if [[ -z ${SECRETS_RSTUF_SSL_CERT} ]]; then
     uvicorn app:rstuf_app --host 0.0.0.0 --port 80
 else
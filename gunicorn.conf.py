@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+# Multi-process server configuration (gunicorn with uvicorn workers).
+#
+# The app is loaded once by the main process (preload) and the workers are
+# forked from it. The workers reopen their connections after fork.
+#
+# Usage: gunicorn -c gunicorn.conf.py app:rstuf_app
+import glob
+import os
+import tempfile
+
+
+def _available_cpus() -> int:
+    try:
+        # CPUs available to the process (i.e. container CPU affinity)
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover -- not available in macOS
+        return os.cpu_count() or 1
+
+
+workers = int(os.environ.get("RSTUF_API_WORKERS") or _available_cpus())
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# Graceful worker recycling. The workers are restarted after a number of
+# requests (`0` disables it). The jitter avoids restarting all the workers
+# at the same time.
+max_requests = int(os.environ.get("RSTUF_API_WORKER_MAX_REQUESTS", 0))
+max_requests_jitter = int(
+    os.environ.get("RSTUF_API_WORKER_MAX_REQUESTS_JITTER", max_requests // 10)
+)
+graceful_timeout = int(os.environ.get("RSTUF_API_GRACEFUL_TIMEOUT", 30))
+
+if os.path.isdir("/dev/shm"):
+    # Workers heartbeat in memory (the container disk can block)
+    worker_tmp_dir = "/dev/shm"
+
+if os.environ.get("SECRETS_RSTUF_SSL_CERT"):
+    bind = ["0.0.0.0:443"]
+    certfile = os.environ["SECRETS_RSTUF_SSL_CERT"]
+    keyfile = os.environ.get("SECRETS_RSTUF_SSL_KEY")
+else:
+    bind = ["0.0.0.0:80"]
+
+# The Prometheus metrics of all the workers are aggregated using a directory
+# shared by the workers. It must be set before the app is loaded.
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+        prefix="rstuf-api-metrics-"
+    )
+for metrics_file in glob.glob(
+    os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")
+):
+    os.remove(metrics_file)
+
+
+def post_fork(server, worker):
+    from repository_service_tuf_api import after_fork
+
+    after_fork()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,14 +3,63 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
 import logging
-from dataclasses import dataclass
-from typing import Optional
+import time
+from contextlib import nullcontext
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from celery import Celery
 from dynaconf import Dynaconf
-from dynaconf.loaders import redis_loader
+from dynaconf.utils.parse_conf import parse_conf_data
+from kombu import pools
+from redis import StrictRedis
+from redis.asyncio import StrictRedis as AsyncStrictRedis
+
+from repository_service_tuf_api.bootstrap_lock import BootstrapLock
+from repository_service_tuf_api.broker import RSTUFAMQP, TaskPublisher
+from repository_service_tuf_api.caches import ExpiringCache, VersionedCache
+from repository_service_tuf_api.metrics import (
+    BOOTSTRAP_STATE_DURATION,
+    SETTINGS_RELOAD_DURATION,
+    timed,
+)
+from repository_service_tuf_api.redis_modes import (
+    RedisConnections,
+    parse_nodes,
+    reset_async_client,
+)
+from repository_service_tuf_api.replicas import (
+    AsyncReadReplicas,
+    ReadReplicas,
+    ReplicasState,
+    parse_replica_urls,
+)
+from repository_service_tuf_api.settings_changes import (
+    notify_settings_change,
+    on_settings_change,
+)
+from repository_service_tuf_api.settings_changes import (
+    start_settings_listener as _start_settings_listener,
+)
+from repository_service_tuf_api.settings_snapshot import (
+    BootstrapState,
+    RepositorySettings,
+    parse_bootstrap_state,
+    parse_setting,
+)
+from repository_service_tuf_api.shared_settings import (
+    SharedSettingsFile,
+    SharedSettingsRefresher,
+)
+from repository_service_tuf_api.topology import (
+    TOPOLOGY_SETTINGS,
+    RepositoryTopology,
+    parse_topology,
+)
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -24,78 +73,493 @@ logging.basicConfig(
 )
 
 
-@dataclass
-class BootstrapState:
-    bootstrap: bool
-    state: Optional[str] = None
-    task_id: Optional[str] = None
-
-
 settings = Dynaconf(envvar_prefix="RSTUF")
 
-settings_repository = Dynaconf(
-    redis_enabled=True,
-    redis={
-        "host": settings.REDIS_SERVER.split("redis://")[1],
-        "port": settings.get("REDIS_SERVER_PORT", 6379),
-        "db": settings.get("REDIS_SERVER_DB_REPO_SETTINGS", 1),
-        "decode_responses": True,
-    },
+# The repository settings are loaded from Redis on first use (not on import)
+REDIS_REPO_SETTINGS = {
+    "host": settings.REDIS_SERVER.split("redis://")[1],
+    "port": settings.get("REDIS_SERVER_PORT", 6379),
+    "db": settings.get("REDIS_SERVER_DB_REPO_SETTINGS", 1),
+    "decode_responses": True,
+}
+settings_repository = Dynaconf(redis_enabled=True, redis=REDIS_REPO_SETTINGS)
+# Redis deployment mode (see ``RedisConnections``): `standalone` (the
+# `REDIS_SERVER`), `sentinel` or `cluster`. It applies to the repository
+# settings and the Result Backend.
+REDIS_MODE = settings.get("REDIS_MODE", "standalone").lower()
+redis_connections = RedisConnections(
+    REDIS_MODE,
+    REDIS_REPO_SETTINGS["host"],
+    REDIS_REPO_SETTINGS["port"],
+    sentinels=parse_nodes(settings.get("REDIS_SENTINELS"), 26379),
+    sentinel_master=settings.get("REDIS_SENTINEL_MASTER", "mymaster"),
+    cluster_nodes=parse_nodes(
+        settings.get("REDIS_CLUSTER_NODES"), REDIS_REPO_SETTINGS["port"]
+    ),
 )
+REDIS_SERVER_DB_RESULT = int(settings.get("REDIS_SERVER_DB_RESULT", 0))
 secrets_settings = Dynaconf(
     envvar_prefix="SECRETS_RSTUF",
     environments=True,
 )
 
+# Broker producer pool. The pool is sized (bounded number of connections per
+# API process), the pooled connections idle for more than
+# `BROKER_POOL_MAX_IDLE` seconds are reopened before publishing, and each
+# pooled connection reuses its (default) channel. With AMQP, the publishing
+# waits for the broker confirmation (confirm mode).
+BROKER_POOL_LIMIT = int(settings.get("BROKER_POOL_LIMIT", 10))
+BROKER_POOL_TIMEOUT = float(settings.get("BROKER_POOL_TIMEOUT", 10))
+BROKER_POOL_MAX_IDLE = float(settings.get("BROKER_POOL_MAX_IDLE", 60))
+BROKER_CONFIRM_PUBLISH = bool(settings.get("BROKER_CONFIRM_PUBLISH", True))
+
+
 # Celery setup
-celery = Celery(__name__)
+celery = Celery(__name__, amqp=RSTUFAMQP)
 celery.conf.broker_url = settings.BROKER_SERVER
-celery.conf.result_backend = (
-    f"{settings.REDIS_SERVER}"
-    f":{settings.get('REDIS_SERVER_PORT', 6379)}"
-    f"/{settings.get('REDIS_SERVER_DB_RESULT', 0)}"
+_result_backend_url, _result_backend_options = (
+    redis_connections.result_backend(REDIS_SERVER_DB_RESULT)
 )
+celery.conf.result_backend = _result_backend_url
+celery.conf.result_backend_transport_options = _result_backend_options
 celery.conf.accept_content = ["json", "application/json"]
 celery.conf.task_serializer = "json"
 celery.conf.result_serializer = "json"
 celery.conf.task_track_started = True
-celery.conf.broker_heartbeat = 0
+celery.conf.broker_heartbeat = int(settings.get("BROKER_HEARTBEAT", 0))
 celery.conf.result_persistent = True
 celery.conf.task_acks_late = True
-celery.conf.broker_pool_limit = None
+celery.conf.broker_pool_limit = BROKER_POOL_LIMIT
+celery.conf.broker_pool_timeout = BROKER_POOL_TIMEOUT
+celery.conf.broker_pool_max_idle = BROKER_POOL_MAX_IDLE
+# Limit of the broker connection pools (kombu), used by the producer pool
+pools.set_limit(BROKER_POOL_LIMIT)
+celery.conf.broker_transport_options = {
+    "confirm_publish": BROKER_CONFIRM_PUBLISH
+}
 # celery.conf.broker_use_ssl
 # https://github.com/repository-service-tuf/repository-service-tuf-api/issues/91
 
+# Version of the repository settings, increased on every change by the
+# workers (`update_settings`) and by the API (bootstrap lock). It is a key in
+# the repository settings Redis DB, out of the Dynaconf settings (see
+# ``settings_key``).
+SETTINGS_VERSION_KEY = "rstuf-settings-version"
+settings_redis = redis_connections.client(
+    REDIS_REPO_SETTINGS["db"], decode_responses=True
+)
+
+# Bootstrap lock (see ``BootstrapLock``)
+_bootstrap_lock = BootstrapLock(settings_redis)
+
+# Async Redis clients used by the async (non-blocking) request path
+settings_redis_async = redis_connections.async_client(
+    REDIS_REPO_SETTINGS["db"], decode_responses=True
+)
+result_backend_async = redis_connections.async_client(REDIS_SERVER_DB_RESULT)
+
+# Redis read replicas, used by the read-only paths that accept data up to
+# `REDIS_REPLICA_MAX_STALENESS` seconds old (see ``ReplicasState``). The
+# writes and the reads requiring consistency (bootstrap lock, tasks wait and
+# stream) use the primary. Disabled without replicas, and in Redis Cluster
+# mode (the cluster replicas are managed by the cluster).
+REDIS_REPLICA_SERVERS = parse_replica_urls(
+    settings.get("REDIS_REPLICA_SERVERS")
+)
+if REDIS_REPLICA_SERVERS and redis_connections.cluster:
+    logging.warning("Redis read replicas are ignored in Redis Cluster mode")
+    REDIS_REPLICA_SERVERS = []
+REDIS_REPLICA_MAX_STALENESS = float(
+    settings.get("REDIS_REPLICA_MAX_STALENESS", 5)
+)
+REDIS_REPLICA_CHECK_INTERVAL = float(
+    settings.get("REDIS_REPLICA_CHECK_INTERVAL", 1)
+)
+replicas_state: Optional[ReplicasState] = None
+settings_redis_replicas: Optional[ReadReplicas] = None
+settings_redis_async_replicas: Optional[AsyncReadReplicas] = None
+result_backend_replicas: Optional[AsyncReadReplicas] = None
+if REDIS_REPLICA_SERVERS:
+    _repo_settings_db = REDIS_REPO_SETTINGS["db"]
+    _settings_replicas = [
+        StrictRedis.from_url(url, db=_repo_settings_db, decode_responses=True)
+        for url in REDIS_REPLICA_SERVERS
+    ]
+    replicas_state = ReplicasState(
+        _settings_replicas, REDIS_REPLICA_MAX_STALENESS
+    )
+    settings_redis_replicas = ReadReplicas(
+        settings_redis, _settings_replicas, replicas_state
+    )
+    settings_redis_async_replicas = AsyncReadReplicas(
+        settings_redis_async,
+        [
+            AsyncStrictRedis.from_url(
+                url, db=_repo_settings_db, decode_responses=True
+            )
+            for url in REDIS_REPLICA_SERVERS
+        ],
+        replicas_state,
+    )
+    result_backend_replicas = AsyncReadReplicas(
+        result_backend_async,
+        [
+            AsyncStrictRedis.from_url(url, db=REDIS_SERVER_DB_RESULT)
+            for url in REDIS_REPLICA_SERVERS
+        ],
+        replicas_state,
+    )
+
+# Publishing to the broker is blocking (kombu), it runs in worker threads
+# limited by the publish concurrency. The requests waiting to publish don't
+# hold a thread.
+BROKER_PUBLISH_CONCURRENCY = int(
+    settings.get("BROKER_PUBLISH_CONCURRENCY", 64)
+)
+publish_task = TaskPublisher(BROKER_PUBLISH_CONCURRENCY).publish
+
+# Bootstrap state cache. Only a finished bootstrap is cached, as intermediate
+# states (`pre`, `signing`) are expected to change. `0` disables the cache.
+BOOTSTRAP_STATE_CACHE_TTL = int(settings.get("BOOTSTRAP_STATE_CACHE_TTL", 0))
+_bootstrap_state_cache = ExpiringCache()
+
+# Repository settings snapshot reuse, by repository settings version. `0`
+# reads a new snapshot on every use.
+SETTINGS_SNAPSHOT_TTL = int(settings.get("SETTINGS_SNAPSHOT_TTL", 0))
+# Current snapshot, replaced as a whole (never modified), so it is read
+# without locking
+_settings_snapshot: Optional[RepositorySettings] = None
+
+# Repository settings snapshot shared by the API processes in a memory mapped
+# file (see ``SharedSettingsFile``), refreshed by one of the processes every
+# `SHARED_SETTINGS_REFRESH_INTERVAL` seconds. Disabled without file.
+SHARED_SETTINGS_FILE = settings.get("SHARED_SETTINGS_FILE")
+SHARED_SETTINGS_SIZE = int(settings.get("SHARED_SETTINGS_SIZE", 8388608))
+SHARED_SETTINGS_REFRESH_INTERVAL = float(
+    settings.get("SHARED_SETTINGS_REFRESH_INTERVAL", 1)
+)
+# A snapshot not refreshed for longer (i.e. no refresher running) isn't used
+SHARED_SETTINGS_MAX_AGE = 3 * SHARED_SETTINGS_REFRESH_INTERVAL
+# Time in seconds after which the refresher reads all the settings even if
+# the settings version didn't change, as not all the settings changes
+# increase it (i.e. the workers writing `BOOTSTRAP`)
+SHARED_SETTINGS_RELOAD_INTERVAL = float(
+    settings.get("SHARED_SETTINGS_RELOAD_INTERVAL", 10)
+)
+shared_settings_file: Optional[SharedSettingsFile] = (
+    SharedSettingsFile(SHARED_SETTINGS_FILE, SHARED_SETTINGS_SIZE)
+    if SHARED_SETTINGS_FILE
+    else None
+)
+# Shared snapshot parsed by this process, by snapshot sequence
+_shared_settings_snapshot: Optional[Tuple[int, RepositorySettings]] = None
+
+# Repository topology cache, by repository settings version. `0` disables
+# the cache.
+TOPOLOGY_CACHE_TTL = int(settings.get("TOPOLOGY_CACHE_TTL", 0))
+_topology_cache = VersionedCache()
+
+
+def invalidate_bootstrap_state_cache():
+    _bootstrap_state_cache.clear()
+
 
-def pre_lock_bootstrap(task_id):
+on_settings_change(invalidate_bootstrap_state_cache)
+
+
+def invalidate_settings_snapshot():
+    global _settings_snapshot
+    _settings_snapshot = None
+
+
+on_settings_change(invalidate_settings_snapshot)
+
+
+def invalidate_topology_cache():
+    _topology_cache.clear()
+
+
+on_settings_change(invalidate_topology_cache)
+
+
+def settings_holder() -> str:
+    """Redis key (hash) used by Dynaconf to store the repository settings."""
+    prefix = settings_repository.get("ENVVAR_PREFIX_FOR_DYNACONF")
+    return f"{prefix}_{settings_repository.current_env}".upper()
+
+
+def settings_key(name: str) -> str:
+    """
+    Redis key of the repository settings DB, out of the Dynaconf settings.
+
+    In Redis Cluster mode, the key is hash tagged with the repository
+    settings key (``settings_holder``), so both are in the same slot, as
+    required by the commands using both (i.e. the bootstrap lock scripts).
+    """
+    return redis_connections.hash_tagged(name, settings_holder())
+
+
+def start_settings_listener():
+    """
+    Start the repository settings listener (see ``settings_listener``) as a
+    daemon thread.
+    """
+    _start_settings_listener(
+        redis_connections, REDIS_REPO_SETTINGS["db"], settings_holder()
+    )
+
+
+def start_replicas_monitor():
+    """Start the read replicas monitor as a daemon thread."""
+    replicas_state.start_monitor(settings_redis, REDIS_REPLICA_CHECK_INTERVAL)
+
+
+def settings_version() -> Optional[str]:
+    """The repository settings version (``None`` if never changed)."""
+    return (settings_redis_replicas or settings_redis).get(
+        settings_key(SETTINGS_VERSION_KEY)
+    )
+
+
+def pinned_settings_reads():
+    """
+    Context reading the repository settings from a single Redis server, so
+    the settings version and the settings read in the context aren't read
+    from different read replicas (see ``ReadReplicas.pinned``).
+    """
+    if settings_redis_replicas is None:
+        return nullcontext()
+
+    return settings_redis_replicas.pinned()
+
+
+def bump_settings_version():
+    """Increase the repository settings version."""
+    settings_redis.incr(settings_key(SETTINGS_VERSION_KEY))
+
+
+def shared_repository_settings() -> Optional[RepositorySettings]:
+    """
+    Repository settings snapshot shared by the API processes.
+
+    The snapshot is read lock-free from the shared settings file, and parsed
+    once by process and snapshot.
+
+    Returns:
+        The snapshot, or ``None`` if the shared settings are disabled, the
+        snapshot is invalidated or it isn't refreshed (no refresher).
+    """
+    global _shared_settings_snapshot
+    if shared_settings_file is None:
+        return None
+
+    try:
+        header = shared_settings_file.header()
+        if header is None:
+            return None
+
+        sequence, heartbeat = header
+        if time.time() - heartbeat > SHARED_SETTINGS_MAX_AGE:
+            return None
+
+        cached = _shared_settings_snapshot
+        if cached is not None and cached[0] == sequence:
+            return cached[1]
+
+        entry = shared_settings_file.read()
+    except OSError as err:
+        logging.debug(f"Shared settings not available: {err}")
+        return None
+
+    if entry is None or entry[1] is None:
+        return None
+
+    sequence, payload = entry
+    published = json.loads(payload)
+    snapshot = RepositorySettings(
+        data=MappingProxyType(
+            {
+                key: parse_setting(value)
+                for key, value in published["settings"].items()
+            }
+        ),
+        version=published["version"],
+    )
+    _shared_settings_snapshot = (sequence, snapshot)
+
+    return snapshot
+
+
+def invalidate_shared_settings():
+    """
+    Invalidate the shared snapshot on a repository settings change (by this
+    API, or detected by the settings listener), so all the API processes
+    read the settings from Redis until the next refresh.
+    """
+    if shared_settings_file is None:
+        return
+
+    try:
+        shared_settings_file.invalidate()
+    except OSError as err:
+        logging.error(f"Shared settings invalidation failed: {err}")
+
+
+on_settings_change(invalidate_shared_settings)
+
+
+def pre_lock_bootstrap(task_id: str) -> BootstrapState:
     """
     Add a pre-lock to the bootstrap repository settings.
 
-    Add to the repository settings in Redis the lock as `pre-<task_id>`.
+    Add to the repository settings in Redis the lock as `pre-<task_id>`,
+    atomically, if the system is available for bootstrap (not finished, in
+    the `pre` or in the `signing` state). Only the `BOOTSTRAP` field is
+    written.
 
     Args:
         task_id: Task id generated by bootstrap
+
+    Returns:
+        The bootstrap state. The lock is acquired if the state task id is
+        the given task id.
+    """
+    bootstrap = _bootstrap_lock.acquire(
+        [settings_holder(), settings_key(SETTINGS_VERSION_KEY)],
+        f"pre-{task_id}",
+    )
+    bs_state = parse_bootstrap_state(bootstrap)
+    if bs_state.task_id == task_id:
+        notify_settings_change()
+
+    return bs_state
+
+
+def transition_bootstrap(
+    expected: List[Optional[str]], bootstrap: Optional[str]
+) -> bool:
+    """
+    Set the repository settings `BOOTSTRAP` atomically if the current value
+    is one of the expected values (compare-and-set).
+
+    Returns:
+        ``True`` if the value was set.
     """
-    settings_data = settings_repository.as_dict(
-        env=settings_repository.current_env
+    changed = _bootstrap_lock.transition(
+        [settings_holder(), settings_key(SETTINGS_VERSION_KEY)],
+        expected,
+        bootstrap,
     )
-    settings_data["BOOTSTRAP"] = f"pre-{task_id}"
-    redis_loader.write(settings_repository, settings_data)
+    if changed:
+        notify_settings_change()
 
+    return changed
 
-def release_bootstrap_lock():
+
+def release_bootstrap_lock(task_id: str) -> bool:
     """
     Remove the pre-lock from repository settings.
 
-    Move the repository settings BOOTSTRAP to None if not finished.
+    Move the repository settings BOOTSTRAP to None if it is still locked by
+    the task (`pre` or `signing` state), so a finished bootstrap or the lock
+    of another bootstrap is kept.
+
+    Returns:
+        ``True`` if the lock was released.
+    """
+    return transition_bootstrap([f"pre-{task_id}", f"signing-{task_id}"], None)
+
+
+def _read_settings_values() -> Dict[str, str]:
+    """Read all the repository settings (raw values) in a single read."""
+    with SETTINGS_RELOAD_DURATION.time():
+        return (settings_redis_replicas or settings_redis).hgetall(
+            settings_holder()
+        )
+
+
+def _load_settings_snapshot(version: Optional[str]) -> RepositorySettings:
+    values = _read_settings_values()
+
+    return RepositorySettings(
+        data=MappingProxyType(
+            {key: parse_setting(value) for key, value in values.items()}
+        ),
+        version=version,
+        expires=time.monotonic() + SETTINGS_SNAPSHOT_TTL,
+    )
+
+
+def repository_settings() -> RepositorySettings:
     """
-    settings_data = settings_repository.as_dict(
-        env=settings_repository.current_env
+    Repository settings snapshot
+
+    The settings are read from Redis in a single read (``HGETALL``) into an
+    immutable snapshot, instead of reloading the shared Dynaconf
+    ``settings_repository``, so concurrent requests don't change the
+    settings while others read them.
+
+    When ``RSTUF_SETTINGS_SNAPSHOT_TTL`` is enabled, the snapshot is reused
+    while the repository settings version doesn't change. A new snapshot
+    replaces the current one as a whole (copy-on-write).
+
+    When ``RSTUF_SHARED_SETTINGS_FILE`` is enabled, the snapshot shared by
+    the API processes is used (see ``shared_repository_settings``).
+    """
+    global _settings_snapshot
+    shared_snapshot = shared_repository_settings()
+    if shared_snapshot is not None:
+        return shared_snapshot
+
+    if SETTINGS_SNAPSHOT_TTL == 0:
+        return _load_settings_snapshot(None)
+
+    # The version is read first (from the same server), so a change while
+    # reading the settings is never reused as the current version
+    with pinned_settings_reads():
+        version = settings_version()
+        snapshot = _settings_snapshot
+        if (
+            version is not None
+            and snapshot is not None
+            and snapshot.version == version
+            and time.monotonic() < snapshot.expires
+        ):
+            return snapshot
+
+        snapshot = _load_settings_snapshot(version)
+    if version is not None:
+        _settings_snapshot = snapshot
+
+    return snapshot
+
+
+# Refresher of the shared settings snapshot (see ``SharedSettingsRefresher``),
+# started by the API processes. Disabled without shared settings file.
+shared_settings_refresher: Optional[SharedSettingsRefresher] = (
+    SharedSettingsRefresher(
+        shared_settings_file,
+        settings_version,
+        _read_settings_values,
+        pinned_settings_reads,
+        reload_interval=SHARED_SETTINGS_RELOAD_INTERVAL,
+        refresh_interval=SHARED_SETTINGS_REFRESH_INTERVAL,
     )
-    settings_data["BOOTSTRAP"] = None
-    redis_loader.write(settings_repository, settings_data)
+    if shared_settings_file is not None
+    else None
+)
+
 
+def _cache_bootstrap_state(bs_state: BootstrapState, generation: int):
+    # Only a finished bootstrap is cached, and not if the cache was
+    # invalidated while reading it
+    if bs_state and bs_state.bootstrap:
+        _bootstrap_state_cache.set(
+            replace(bs_state), BOOTSTRAP_STATE_CACHE_TTL, generation
+        )
 
+
+@timed(BOOTSTRAP_STATE_DURATION)
 def bootstrap_state() -> BootstrapState:
     """
     Bootstrap state
@@ -103,36 +567,125 @@ def bootstrap_state() -> BootstrapState:
     The bootstrap state is registered in Redis.
     Detailed definitions are available in
     https://repository-service-tuf.readthedocs.io/en/stable/devel/design.html#tuf-repository-settings  # noqa
+
+    Only the ``BOOTSTRAP`` field is read from the repository settings (or
+    from the shared settings snapshot, if enabled). A finished bootstrap is
+    cached for ``RSTUF_BOOTSTRAP_STATE_CACHE_TTL`` seconds or until the
+    settings listener detects a settings change.
+    """
+    generation = _bootstrap_state_cache.generation
+    cached_state = _bootstrap_state_cache.get()
+    if cached_state is not None:
+        return replace(cached_state)
+
+    shared_snapshot = shared_repository_settings()
+    if shared_snapshot is not None:
+        bs_state = shared_snapshot.bootstrap_state()
+    else:
+        value = (settings_redis_replicas or settings_redis).hget(
+            settings_holder(), "BOOTSTRAP"
+        )
+        bs_state = parse_bootstrap_state(parse_setting(value))
+    _cache_bootstrap_state(bs_state, generation)
+
+    return bs_state
+
+
+@timed(BOOTSTRAP_STATE_DURATION)
+async def bootstrap_state_async() -> BootstrapState:
+    """
+    Bootstrap state (async)
+
+    Same as ``bootstrap_state``, but it reads only the ``BOOTSTRAP`` field
+    from the repository settings using the async Redis client.
+    """
+    generation = _bootstrap_state_cache.generation
+    cached_state = _bootstrap_state_cache.get()
+    if cached_state is not None:
+        return replace(cached_state)
+
+    shared_snapshot = shared_repository_settings()
+    if shared_snapshot is not None:
+        bs_state = shared_snapshot.bootstrap_state()
+    else:
+        value = await (
+            settings_redis_async_replicas or settings_redis_async
+        ).hget(settings_holder(), "BOOTSTRAP")
+        bootstrap = None
+        if value is not None:
+            bootstrap = parse_conf_data(value, tomlfy=True)
+        bs_state = parse_bootstrap_state(bootstrap)
+    _cache_bootstrap_state(bs_state, generation)
+
+    return bs_state
+
+
+def _load_repository_topology() -> RepositoryTopology:
+    return parse_topology(
+        *(
+            None if value is None else parse_conf_data(value, tomlfy=True)
+            for value in (settings_redis_replicas or settings_redis).hmget(
+                settings_holder(), TOPOLOGY_SETTINGS
+            )
+        )
+    )
+
+
+def repository_topology() -> RepositoryTopology:
     """
+    Repository roles topology
 
-    # Reload the settings
-    # The reload is required because the settings object is created in the
-    # `app.py`'s initialization. The `settings_repository.get_fresh() doesn't
-    # correctly reload because of that the settings_repository.reload() do
-    # the job.
-    settings_repository.reload()
-    bootstrap = settings_repository.get_fresh("BOOTSTRAP")
+    The topology settings are read from Redis in a single read. When
+    ``RSTUF_TOPOLOGY_CACHE_TTL`` is enabled, the topology is cached by
+    repository settings version, and invalidated on settings changes.
+    When ``RSTUF_SHARED_SETTINGS_FILE`` is enabled, the topology of the
+    shared settings snapshot is used.
+    """
+    shared_snapshot = shared_repository_settings()
+    if shared_snapshot is not None:
+        return shared_snapshot.topology
 
-    bootstrap_state = BootstrapState(bootstrap=False, state=None, task_id=None)
-    if bootstrap is None:
-        return bootstrap_state
+    # The version is read first (from the same server), so a change while
+    # reading the topology is never cached as the current version
+    generation = _topology_cache.generation
+    with pinned_settings_reads():
+        version = settings_version() if TOPOLOGY_CACHE_TTL > 0 else None
+        topology = _topology_cache.get(version)
+        if topology is not None:
+            return topology
 
-    if len(bootstrap.split("-")) == 1:
-        # This is a finished bootstrap. It only contains the `<task-id>``
-        bootstrap_state.bootstrap = True
-        bootstrap_state.state = "finished"
-        bootstrap_state.task_id = bootstrap
+        topology = _load_repository_topology()
+    _topology_cache.set(version, topology, TOPOLOGY_CACHE_TTL, generation)
 
-        return bootstrap_state
+    return topology
 
-    elif len(bootstrap.split("-")) == 2:
-        # This is considered an intermediated state. It is not finished because
-        # there is a `<state>-` like 'pre-<task_id>' or 'signing-<task_id>'.
-        bootstrap_state.bootstrap = False
-        bootstrap_state.state = bootstrap.split("-")[0]
-        bootstrap_state.task_id = bootstrap.split("-")[1]
 
-        return bootstrap_state
+def after_fork():
+    """
+    Reset the connections inherited from the parent process.
+
+    It is called in each API worker process after fork by the multi-process
+    server (see ``gunicorn.conf.py``), as the parent process loads the app
+    before forking the workers. The inherited connections are dropped
+    without closing them, as closing would also close the parent sockets.
+    The sync Redis clients reset their connections after fork themselves.
+
+    All the broker connections of the API are acquired from the producer
+    pool (publishing and revoking tasks, see ``celery.producer_or_acquire``),
+    not from the Celery connection pool (``celery.pool``).
+    """
+    reset_async_client(settings_redis_async)
+    reset_async_client(result_backend_async)
+    for replicas in (settings_redis_async_replicas, result_backend_replicas):
+        if replicas is not None:
+            for replica in replicas.replicas:
+                replica.connection_pool.reset()
+    # Drops the broker connections of the kombu pools and the producer pool.
+    # ``pools.reset()`` would close them (``Connection.collect()``), shutting
+    # down the sockets shared with the parent process.
+    pools.connections.clear()
+    pools.producers.clear()
+    celery.amqp.reset_producer_pool()
 
 
 def get_task_id():
@@ -3,9 +3,12 @@
 #
 # SPDX-License-Identifier: MIT
 
-from fastapi import APIRouter, status
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Request, status
 
 from repository_service_tuf_api import artifacts
+from repository_service_tuf_api.idempotency import IDEMPOTENCY_KEY_MAX_LENGTH
 
 router = APIRouter(
     prefix="/artifacts",
@@ -13,6 +16,19 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# `Idempotency-Key` header of the task-submitting requests
+IdempotencyKey = Annotated[
+    Optional[str],
+    Header(
+        max_length=IDEMPOTENCY_KEY_MAX_LENGTH,
+        description=(
+            "Unique key of the request. A repeated request with the same "
+            "key returns the task ID of the original request, or 409 while "
+            "the original request is being submitted."
+        ),
+    ),
+]
+
 
 @router.post(
     "/",
@@ -25,9 +41,82 @@ router = APIRouter(
     response_model=artifacts.ResponsePostAdd,
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/AddPayload"}
+                }
+            },
+        },
+        "responses": {
+            "422": {
+                "description": "Validation Error",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "$ref": "#/components/schemas/HTTPValidationError"
+                        }
+                    }
+                },
+            }
+        },
+    },
+)
+async def post(
+    request: Request,
+    idempotency_key: IdempotencyKey = None,
+) -> artifacts.ResponsePostAdd:
+    # The body is validated by `artifacts.post` from the raw body
+    response = await artifacts.post(await request.body(), idempotency_key)
+
+    return response
+
+
+@router.post(
+    "/stream",
+    summary="Post tasks to add a large number of artifacts to Metadata.",
+    description=(
+        "Submit asynchronous tasks to add artifacts to Metadata from a "
+        "stream: a JSON array of artifacts (`application/json`) or one "
+        "artifact per line (`application/x-ndjson`). The artifacts are "
+        "validated as they arrive and submitted in chunks, one task per "
+        "chunk, when all the artifacts are valid. If submitting a task "
+        "fails, the response (503) has the IDs of the tasks already "
+        "submitted. "
+        "Use the task IDs to retrieve the tasks status in the endpoint "
+        "/api/v1/task."
+    ),
+    response_model=artifacts.ResponsePostStream,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Artifact"},
+                    }
+                },
+                artifacts.NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": "#/components/schemas/Artifact"}
+                },
+            },
+        }
+    },
 )
-def post(payload: artifacts.AddPayload) -> artifacts.ResponsePostAdd:
-    response = artifacts.post(payload)
+async def post_stream(
+    request: Request, params: artifacts.StreamParameters = Depends()
+) -> artifacts.ResponsePostStream:
+    content_type = request.headers.get("content-type", "")
+    response = await artifacts.post_stream(
+        request.stream(),
+        content_type.startswith(artifacts.NDJSON_MEDIA_TYPE),
+        params,
+    )
 
     return response
 
@@ -45,10 +134,11 @@ def post(payload: artifacts.AddPayload) -> artifacts.ResponsePostAdd:
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def post_delete(
+async def post_delete(
     payload: artifacts.DeletePayload,
+    idempotency_key: IdempotencyKey = None,
 ) -> artifacts.ResponsePostDelete:
-    response = artifacts.delete(payload)
+    response = await artifacts.delete(payload, idempotency_key)
 
     return response
 
@@ -66,7 +156,9 @@ def post_delete(
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def post_publish_artifacts() -> artifacts.ResponsePostPublish:
-    response = artifacts.post_publish_artifacts()
+async def post_publish_artifacts(
+    idempotency_key: IdempotencyKey = None,
+) -> artifacts.ResponsePostPublish:
+    response = await artifacts.post_publish_artifacts(idempotency_key)
 
     return response
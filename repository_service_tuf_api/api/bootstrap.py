@@ -21,8 +21,8 @@ router = APIRouter(
     response_model=bootstrap.BootstrapGetResponse,
     response_model_exclude_none=True,
 )
-def get():
-    return bootstrap.get_bootstrap()
+async def get():
+    return await bootstrap.get_bootstrap()
 
 
 @router.post(
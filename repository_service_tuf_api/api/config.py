@@ -3,7 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
 
 from repository_service_tuf_api import config
 
@@ -26,8 +26,8 @@ router = APIRouter(
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def put(payload: config.PutPayload):
-    return config.put(payload)
+async def put(payload: config.PutPayload):
+    return await config.put(payload)
 
 
 @router.get(
@@ -37,5 +37,5 @@ def put(payload: config.PutPayload):
     response_model=config.GetResponse,
     response_model_exclude_none=True,
 )
-def get():
-    return config.get()
+def get(request: Request):
+    return config.get(request)
@@ -25,8 +25,8 @@ router = APIRouter(
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def post_delegation(payload: delegations.MetadataDelegationsPayload):
-    return delegations.metadata_delegation(payload, action="add")
+async def post_delegation(payload: delegations.MetadataDelegationsPayload):
+    return await delegations.metadata_delegation(payload, action="add")
 
 
 @router.put(
@@ -41,8 +41,8 @@ def post_delegation(payload: delegations.MetadataDelegationsPayload):
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def put_delegation(payload: delegations.MetadataDelegationsPayload):
-    return delegations.metadata_delegation(payload, action="update")
+async def put_delegation(payload: delegations.MetadataDelegationsPayload):
+    return await delegations.metadata_delegation(payload, action="update")
 
 
 @router.post(
@@ -57,5 +57,7 @@ def put_delegation(payload: delegations.MetadataDelegationsPayload):
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def delete_delegation(payload: delegations.MetadataDelegationDeletePayload):
-    return delegations.metadata_delegation(payload, action="delete")
+async def delete_delegation(
+    payload: delegations.MetadataDelegationDeletePayload,
+):
+    return await delegations.metadata_delegation(payload, action="delete")
@@ -3,7 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
 
 from repository_service_tuf_api import metadata
 
@@ -27,8 +27,8 @@ router = APIRouter(
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def post(payload: metadata.MetadataPostPayload):
-    return metadata.post_metadata(payload)
+async def post(payload: metadata.MetadataPostPayload):
+    return await metadata.post_metadata(payload)
 
 
 @router.post(
@@ -65,8 +65,8 @@ def post_online(payload: metadata.MetadataOnlinePostPayload):
     response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
 )
-def get_sign():
-    return metadata.get_metadata_sign()
+def get_sign(request: Request):
+    return metadata.get_metadata_sign(request)
 
 
 @router.post(
@@ -82,8 +82,8 @@ def get_sign():
     response_model_exclude_none=True,
     status_code=status.HTTP_202_ACCEPTED,
 )
-def post_sign(payload: metadata.MetadataSignPostPayload):
-    return metadata.post_metadata_sign(payload)
+async def post_sign(payload: metadata.MetadataSignPostPayload):
+    return await metadata.post_metadata_sign(payload)
 
 
 @router.post(
@@ -3,7 +3,10 @@
 #
 # SPDX-License-Identifier: MIT
 
-from fastapi import APIRouter, Depends
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 
 from repository_service_tuf_api import tasks
 
@@ -17,9 +20,51 @@ router = APIRouter(
 @router.get(
     "/",
     summary="Get task state.",
-    description="Get RSTUF tasks information.",
+    description=(
+        "Get RSTUF tasks information. "
+        "Use `wait` to wait for a task state change (long-poll)."
+    ),
     response_model=tasks.Response,
     response_model_exclude_none=True,
 )
-def get(params: tasks.GetParameters = Depends()):
-    return tasks.get(params.task_id)
+async def get(params: tasks.GetParameters = Depends()):
+    return await tasks.get(params.task_id, params.wait)
+
+
+@router.post(
+    "/bulk",
+    summary="Get multiple tasks state.",
+    description=(
+        "Get RSTUF tasks information for multiple task IDs. "
+        f"Maximum of {tasks.TASKS_BULK_MAX_IDS} task IDs per request."
+    ),
+    response_model=tasks.BulkResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+)
+async def post_bulk(payload: tasks.BulkPayload):
+    return await tasks.get_bulk(payload)
+
+
+@router.get(
+    "/stream",
+    summary="Stream tasks state.",
+    description=(
+        "Stream the RSTUF tasks state changes as Server-Sent Events "
+        "(`text/event-stream`). A `state` event is sent with the current "
+        "task data and on every task state change. The stream sends an "
+        "`end` event when all the tasks are finished."
+    ),
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def get_stream(
+    task_id: List[str] = Query(
+        min_length=1, max_length=tasks.TASKS_BULK_MAX_IDS
+    ),
+):
+    return StreamingResponse(
+        tasks.stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
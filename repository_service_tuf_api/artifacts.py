@@ -3,18 +3,72 @@
 #
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import codecs
 import json
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException, status
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
 
 from repository_service_tuf_api import (
-    bootstrap_state,
+    bootstrap_state_async,
     get_task_id,
+    publish_task,
     repository_metadata,
+    result_backend_async,
+    settings,
 )
+from repository_service_tuf_api.common_models import example_from_file
+from repository_service_tuf_api.hash_bins import (
+    bin_numbers_for_paths,
+    number_of_delegated_bins,
+    target_roles,
+)
+from repository_service_tuf_api.idempotency import IdempotentRequest
+from repository_service_tuf_api.redis_modes import REDIS_ERRORS
+
+# Artifacts tasks coalescing. When enabled (window > 0), the add/remove
+# artifacts requests are buffered for the window time (in seconds) or until
+# the max size (number of artifacts) and submitted as a single worker task.
+ARTIFACTS_COALESCE_WINDOW = float(settings.get("ARTIFACTS_COALESCE_WINDOW", 0))
+ARTIFACTS_COALESCE_MAX_SIZE = int(
+    settings.get("ARTIFACTS_COALESCE_MAX_SIZE", 1000)
+)
+# Result Backend key prefix mapping a request task id to the submitted task id
+COALESCED_TASK_KEY_PREFIX = "rstuf-coalesced-task-"
+# Sharded artifacts task queues. When enabled (shards > 0) and hash bin
+# delegation is used, the add/remove artifacts tasks are split by hash bin
+# shard (`bin number % shards`) and published to the shard queues
+# (`metadata_repository.shard-<shard>`), so the workers consuming different
+# shards update independent delegated roles in parallel.
+ARTIFACTS_QUEUE_SHARDS = int(settings.get("ARTIFACTS_QUEUE_SHARDS", 0))
+# Hash bin delegated role of each artifact (`target_roles`) in the add
+# artifacts worker payload. It requires RSTUF Workers accepting it, so the
+# roles are only in the response by default.
+ARTIFACTS_TARGET_ROLES_PAYLOAD = bool(
+    settings.get("ARTIFACTS_TARGET_ROLES_PAYLOAD", False)
+)
+# Result Backend key prefix mapping a task id to its sub-tasks ids (JSON)
+SHARDED_TASK_KEY_PREFIX = "rstuf-sharded-task-"
+# Streaming ingest. The artifacts are validated as they arrive and staged in
+# the Result Backend in chunks, which are submitted as tasks when the whole
+# stream is valid.
+ARTIFACTS_STREAM_CHUNK_SIZE = int(
+    settings.get("ARTIFACTS_STREAM_CHUNK_SIZE", 5000)
+)
+# Maximum size (in bytes) of a single artifact in the stream
+ARTIFACTS_STREAM_MAX_ARTIFACT_SIZE = 1024 * 1024
+# Result Backend key prefix of the staged artifacts chunks
+STREAM_STAGING_KEY_PREFIX = "rstuf-artifacts-stream-"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 class ResponseData(BaseModel):
@@ -23,6 +77,16 @@ class ResponseData(BaseModel):
     last_update: datetime
 
 
+class ResponseAddData(ResponseData):
+    target_roles: Dict[str, str] | None = Field(
+        default=None,
+        description=(
+            "Hash bin delegated role of each artifact path (only with hash "
+            "bin delegation)"
+        ),
+    )
+
+
 class ResponsePostAdd(BaseModel):
     """
     Artifacts post new artifacts response
@@ -35,13 +99,17 @@ class ResponsePostAdd(BaseModel):
                     "artifacts": ["file1.tar.gz", "file2.tar.gz"],
                     "task_id": "06ee6db3cbab4b26be505352c2f2e2c3",
                     "last_update": "2022-12-01T12:10:00.578086",
+                    "target_roles": {
+                        "file1.tar.gz": "bins-1f",
+                        "file2.tar.gz": "bins-16",
+                    },
                 },
                 "message": "New Artifact(s) successfully submitted.",
             }
         }
     )
 
-    data: ResponseData | None = None
+    data: ResponseAddData | None = None
     message: str | None = None
 
 
@@ -105,17 +173,16 @@ class Artifact(BaseModel):
     path: str
 
 
-with open("tests/data_examples/artifacts/add_payload.json") as f:
-    content = f.read()
-add_payload = json.loads(content)
-
-
 class AddPayload(BaseModel):
     """
     POST method required Payload.
     """
 
-    model_config = ConfigDict(json_schema_extra={"example": add_payload})
+    model_config = ConfigDict(
+        json_schema_extra=example_from_file(
+            "tests/data_examples/artifacts/add_payload.json"
+        )
+    )
     artifacts: List[Artifact]
     add_task_id_to_custom: bool = Field(
         default=False,
@@ -126,6 +193,71 @@ class AddPayload(BaseModel):
     )
 
 
+# Worker payload types. The ``AddPayload`` body is validated from the raw
+# request body straight into the worker payload (plain dicts and lists), with
+# the same validation as the ``AddPayload`` model, without building the model
+# and dumping it again.
+class ArtifactInfoData(TypedDict):
+    length: int
+    hashes: Dict[str, str]
+    custom: NotRequired[Dict[str, Any] | None]
+
+
+class ArtifactData(TypedDict):
+    info: ArtifactInfoData
+    path: str
+
+
+class AddPayloadData(TypedDict):
+    artifacts: List[ArtifactData]
+    add_task_id_to_custom: NotRequired[bool]
+    publish_artifacts: NotRequired[bool]
+
+
+add_payload_adapter = TypeAdapter(AddPayloadData)
+
+
+class StreamParameters(BaseModel):
+    add_task_id_to_custom: bool = Field(
+        default=False,
+        description="Whether to add the id of the task in custom",
+    )
+    publish_artifacts: bool = Field(
+        default=True, description="Whether to publish the artifacts"
+    )
+
+
+class ResponseStreamData(BaseModel):
+    number_of_artifacts: int
+    task_ids: List[str]
+    last_update: datetime
+
+
+class ResponsePostStream(BaseModel):
+    """
+    Artifacts post new artifacts (stream) response
+    """
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "data": {
+                    "number_of_artifacts": 7500,
+                    "task_ids": [
+                        "06ee6db3cbab4b26be505352c2f2e2c3",
+                        "a81e6f1b3b8b4c3c8d5b0c2f4a1f9e21",
+                    ],
+                    "last_update": "2022-12-01T12:10:00.578086",
+                },
+                "message": "New Artifact(s) successfully submitted.",
+            }
+        }
+    )
+
+    data: ResponseStreamData | None = None
+    message: str | None = None
+
+
 class DeletePayload(BaseModel):
     """
     DELETE method required Payload.
@@ -148,15 +280,333 @@ class DeletePayload(BaseModel):
     )
 
 
-def post(payload: AddPayload) -> ResponsePostAdd:
+def shard_queue(shard: int) -> str:
+    return f"metadata_repository.shard-{shard}"
+
+
+async def publish_artifacts_task(
+    action: str,
+    payload: Dict[str, Any],
+    task_id: str,
+    number_of_bins: Optional[int],
+):
+    """
+    Publish an add/remove artifacts task to the broker.
+
+    With sharded queues (``ARTIFACTS_QUEUE_SHARDS``) and hash bin delegation,
+    the artifacts are split by shard and each part is published as a
+    sub-task to the shard queue. The task id is mapped to the sub-tasks ids
+    in the Result Backend (see ``repository_service_tuf_api.tasks.get``).
+    An artifacts task of a single shard is published as is to the shard
+    queue. Otherwise, the task is published to ``metadata_repository``.
+    """
+    if ARTIFACTS_QUEUE_SHARDS == 0 or number_of_bins is None:
+        await publish_task(
+            repository_metadata,
+            kwargs={"action": action, "payload": payload},
+            task_id=task_id,
+            queue="metadata_repository",
+            acks_late=True,
+        )
+        return
+
+    artifacts = payload["artifacts"]
+    paths = [
+        artifact["path"] if action == "add_artifacts" else artifact
+        for artifact in artifacts
+    ]
+    shards: Dict[int, List[int]] = defaultdict(list)
+    for i, bin_number in enumerate(
+        bin_numbers_for_paths(paths, number_of_bins)
+    ):
+        shards[bin_number % ARTIFACTS_QUEUE_SHARDS].append(i)
+
+    if len(shards) == 1:
+        (shard,) = shards
+        await publish_task(
+            repository_metadata,
+            kwargs={"action": action, "payload": payload},
+            task_id=task_id,
+            queue=shard_queue(shard),
+            acks_late=True,
+        )
+        return
+
+    sub_tasks = {shard: get_task_id() for shard in shards}
+    # The sub-tasks are mapped before publishing, so the task state is
+    # available as soon as a sub-task is finished
+    await result_backend_async.set(
+        f"{SHARDED_TASK_KEY_PREFIX}{task_id}",
+        json.dumps(list(sub_tasks.values())),
+        ex=repository_metadata.backend.expires,
+    )
+
+    async def publish_shard(shard: int, indexes: List[int]):
+        sub_payload = {
+            **payload,
+            "artifacts": [artifacts[i] for i in indexes],
+        }
+        if "target_roles" in payload:
+            sub_payload["target_roles"] = {
+                paths[i]: payload["target_roles"][paths[i]] for i in indexes
+            }
+
+        await publish_task(
+            repository_metadata,
+            kwargs={"action": action, "payload": sub_payload},
+            task_id=sub_tasks[shard],
+            queue=shard_queue(shard),
+            acks_late=True,
+        )
+
+    await asyncio.gather(
+        *(publish_shard(shard, indexes) for shard, indexes in shards.items())
+    )
+    logging.debug(
+        f"Task {task_id} split in {len(sub_tasks)} sub-task(s) by shard"
+    )
+
+
+@dataclass
+class _ArtifactsBatch:
+    action: str
+    publish_artifacts: bool
+    artifacts: List[Any] = field(default_factory=list)
+    target_roles: Dict[str, str] = field(default_factory=dict)
+    request_task_ids: List[str] = field(default_factory=list)
+    flush_task: Optional[asyncio.Task] = None
+    closed: bool = False
+    # Batch closed before, submitted before this one
+    previous: Optional["_ArtifactsBatch"] = None
+    published: asyncio.Event = field(default_factory=asyncio.Event)
+    task_id: Optional[str] = None
+    error: Optional[Exception] = None
+
+
+class ArtifactsCoalescer:
+    """
+    Coalesce artifacts requests into a single worker task.
+
+    Consecutive requests with the same action and ``publish_artifacts`` are
+    merged in a batch. The batch is submitted when the window expires, the
+    number of artifacts reaches the max size, or a request with a different
+    action or ``publish_artifacts`` arrives. The batches are submitted in
+    order, so the tasks keep the requests order (i.e. add, remove and add
+    again the same artifact). Each request keeps its own task id, which is
+    mapped in the Result Backend to the submitted task id (see
+    ``repository_service_tuf_api.tasks.get``).
+    """
+
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        # Batch accepting requests
+        self._batch: Optional[_ArtifactsBatch] = None
+        # Last closed batch, submitted before the next closed batch
+        self._last_batch: Optional[_ArtifactsBatch] = None
+
+    async def submit(
+        self,
+        action: str,
+        artifacts: List[Any],
+        publish_artifacts: bool,
+        request_task_id: str,
+        target_roles: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Add the artifacts to a batch and wait until the batch is submitted.
+
+        Returns:
+            The submitted (merged) task id.
+        """
+        batch = self._batch
+        if batch is not None and (batch.action, batch.publish_artifacts) != (
+            action,
+            publish_artifacts,
+        ):
+            # The requests of the batch are submitted first
+            self._close(batch)
+            batch.flush_task = asyncio.create_task(self._publish(batch))
+            batch = None
+
+        if batch is None:
+            batch = _ArtifactsBatch(action, publish_artifacts)
+            batch.flush_task = asyncio.create_task(self._flush_later(batch))
+            self._batch = batch
+
+        batch.artifacts.extend(artifacts)
+        if target_roles is not None:
+            batch.target_roles.update(target_roles)
+        batch.request_task_ids.append(request_task_id)
+        if len(batch.artifacts) >= self.max_size:
+            await self._flush(batch)
+
+        await batch.published.wait()
+        if batch.error is not None:
+            raise batch.error
+
+        return batch.task_id
+
+    async def _flush_later(self, batch: _ArtifactsBatch):
+        await asyncio.sleep(self.window)
+        await self._flush(batch)
+
+    async def _flush(self, batch: _ArtifactsBatch):
+        if batch.closed:
+            return
+
+        self._close(batch)
+        await self._publish(batch)
+
+    def _close(self, batch: _ArtifactsBatch):
+        """Close the batch to new requests, ordered after the last batch."""
+        batch.closed = True
+        if self._batch is batch:
+            self._batch = None
+        if asyncio.current_task() is not batch.flush_task:
+            batch.flush_task.cancel()
+        batch.previous = self._last_batch
+        self._last_batch = batch
+
+    async def _publish(self, batch: _ArtifactsBatch):
+        try:
+            if batch.previous is not None:
+                await batch.previous.published.wait()
+                batch.previous = None
+
+            task_id = get_task_id()
+            async with result_backend_async.pipeline() as pipe:
+                for request_task_id in batch.request_task_ids:
+                    pipe.set(
+                        f"{COALESCED_TASK_KEY_PREFIX}{request_task_id}",
+                        task_id,
+                        ex=repository_metadata.backend.expires,
+                    )
+                await pipe.execute()
+
+            payload = {
+                "artifacts": batch.artifacts,
+                "publish_artifacts": batch.publish_artifacts,
+            }
+            if batch.action == "add_artifacts":
+                # the task id is already added per request
+                payload["add_task_id_to_custom"] = False
+            if len(batch.target_roles) > 0:
+                payload["target_roles"] = batch.target_roles
+
+            number_of_bins = None
+            if ARTIFACTS_QUEUE_SHARDS > 0:
+                number_of_bins = await number_of_delegated_bins()
+            await publish_artifacts_task(
+                batch.action, payload, task_id, number_of_bins
+            )
+            logging.debug(
+                f"Task {task_id} submitted with {len(batch.artifacts)} "
+                f"artifact(s) from {len(batch.request_task_ids)} request(s)"
+            )
+            batch.task_id = task_id
+        except Exception as err:
+            batch.error = err
+        except asyncio.CancelledError:
+            # i.e. the event loop is stopping, the requests aren't submitted
+            batch.error = RuntimeError("Artifacts batch submission cancelled")
+            raise
+        finally:
+            batch.published.set()
+
+
+artifacts_coalescer: Optional[ArtifactsCoalescer] = None
+if ARTIFACTS_COALESCE_WINDOW > 0:
+    artifacts_coalescer = ArtifactsCoalescer(
+        ARTIFACTS_COALESCE_WINDOW, ARTIFACTS_COALESCE_MAX_SIZE
+    )
+
+
+def validate_add_payload(body: bytes) -> AddPayloadData:
+    """
+    Validate the ``AddPayload`` raw request body into the worker payload.
+
+    Raises:
+        RequestValidationError: invalid JSON or payload
+    """
+    try:
+        worker_payload = add_payload_adapter.validate_json(body)
+    except ValidationError as err:
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in err.errors(include_url=False)
+            ]
+        )
+
+    # defaults and `exclude_none` as in the ``AddPayload`` model
+    worker_payload.setdefault("add_task_id_to_custom", False)
+    worker_payload.setdefault("publish_artifacts", True)
+    for artifact in worker_payload["artifacts"]:
+        if "custom" in artifact["info"] and artifact["info"]["custom"] is None:
+            del artifact["info"]["custom"]
+
+    return worker_payload
+
+
+async def _submit_artifacts_task(
+    idempotent_request: Optional[IdempotentRequest], task_id: str, submit
+) -> str:
+    """
+    Submit the artifacts task (``submit``) unless it is a repeated request.
+
+    Returns:
+        The task id, or the task id of the original request if repeated.
+    """
+    if idempotent_request is None:
+        await submit()
+        return task_id
+
+    original_task_id = await idempotent_request.claim(task_id)
+    if original_task_id is not None:
+        logging.debug(f"Repeated request of task {original_task_id}")
+        return original_task_id
+
+    try:
+        await submit()
+    except Exception:
+        await idempotent_request.release()
+        raise
+
+    try:
+        await idempotent_request.published()
+    except REDIS_ERRORS as err:
+        # The task is submitted, the claim expires as pending
+        logging.warning(f"Failed to mark task {task_id} as published: {err}")
+
+    return task_id
+
+
+async def post(
+    body: bytes, idempotency_key: Optional[str] = None
+) -> ResponsePostAdd:
     """
     Post new artifact(s)s.
     It will send a new task with the validated payload to the
     ``metadata_repository`` broker queue.
     It generates a new task id, syncs with the Redis server, and posts the new
     task.
+
+    The body (``AddPayload``) is validated straight into the worker payload
+    (see ``validate_add_payload``).
+
+    With hash bin delegation, the delegated role of each artifact is added
+    to the response and, with ``RSTUF_ARTIFACTS_TARGET_ROLES_PAYLOAD``, to
+    the worker payload (``target_roles``).
+
+    A repeated request (``idempotency_key`` or, within the deduplication
+    window, the same payload) returns the task id of the original request
+    without submitting a new task (see ``IdempotentRequest``).
     """
-    bs_state = bootstrap_state()
+    worker_payload = validate_add_payload(body)
+    bs_state, number_of_bins = await asyncio.gather(
+        bootstrap_state_async(), number_of_delegated_bins()
+    )
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -168,53 +618,296 @@ def post(payload: AddPayload) -> ResponsePostAdd:
             },
         )
 
+    idempotent_request = IdempotentRequest.from_request(
+        "add_artifacts", worker_payload, idempotency_key
+    )
     task_id = get_task_id()
-    if payload.add_task_id_to_custom is True:
-        new_artifacts: List[Artifact] = []
-        for artifact in payload.artifacts:
-            if artifact.info.custom:
-                artifact.info.custom = {
+    paths = [artifact["path"] for artifact in worker_payload["artifacts"]]
+    artifacts_roles = target_roles(paths, number_of_bins)
+    payload_roles = artifacts_roles if ARTIFACTS_TARGET_ROLES_PAYLOAD else None
+
+    async def submit():
+        if worker_payload["add_task_id_to_custom"] is True:
+            for artifact in worker_payload["artifacts"]:
+                artifact["info"]["custom"] = {
                     "added_by_task_id": task_id,
-                    **artifact.info.custom,
+                    **artifact["info"].get("custom", {}),
                 }
-            else:
-                artifact.info.custom = {"added_by_task_id": task_id}
 
-            new_artifacts.append(artifact)
+        if payload_roles is not None:
+            worker_payload["target_roles"] = payload_roles
 
-        payload.artifacts = new_artifacts
+        if artifacts_coalescer is not None:
+            await artifacts_coalescer.submit(
+                "add_artifacts",
+                worker_payload["artifacts"],
+                worker_payload["publish_artifacts"],
+                task_id,
+                target_roles=payload_roles,
+            )
+        else:
+            await publish_artifacts_task(
+                "add_artifacts", worker_payload, task_id, number_of_bins
+            )
 
-    repository_metadata.apply_async(
-        kwargs={
-            "action": "add_artifacts",
-            "payload": payload.dict(by_alias=True, exclude_none=True),
-        },
-        task_id=task_id,
-        queue="metadata_repository",
-        acks_late=True,
-    )
+    task_id = await _submit_artifacts_task(idempotent_request, task_id, submit)
 
     message = "New Artifact(s) successfully submitted."
-    if payload.publish_artifacts is False:
+    if worker_payload["publish_artifacts"] is False:
         message += " Publishing will be skipped."
 
     data = {
-        "artifacts": [artifact.path for artifact in payload.artifacts],
+        "artifacts": paths,
         "task_id": task_id,
         "last_update": datetime.now(timezone.utc),
+        "target_roles": artifacts_roles,
     }
     return ResponsePostAdd(data=data, message=message)
 
 
-def delete(payload: DeletePayload) -> ResponsePostDelete:
+_WHITESPACE = re.compile(r"\s*")
+
+
+class JSONArrayParser:
+    """
+    Incremental JSON array parser.
+
+    The text is given in parts (``feed``), which return the array items
+    completed so far. Only the incomplete item is kept in memory.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        # next expected token: "[", "first" item or "]", "item", "," or "]"
+        # ("separator") and "end"
+        self._expect = "["
+
+    def feed(self, text: str) -> List[Any]:
+        buffer = self._buffer + text
+        items = []
+        position = 0
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+
+            char = buffer[position]
+            if self._expect == "[":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                self._expect = "first"
+                position += 1
+            elif self._expect == "first" and char == "]":
+                self._expect = "end"
+                position += 1
+            elif self._expect in ("first", "item"):
+                try:
+                    item, position = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # incomplete item, wait for more data
+                    break
+                items.append(item)
+                self._expect = "separator"
+            elif self._expect == "separator" and char in ",]":
+                self._expect = "item" if char == "," else "end"
+                position += 1
+            else:
+                raise ValueError(f"Unexpected '{char}' in the JSON array")
+
+        self._buffer = buffer[position:]
+        if len(self._buffer) > ARTIFACTS_STREAM_MAX_ARTIFACT_SIZE:
+            raise ValueError("Invalid or too large artifact")
+
+        return items
+
+    def close(self):
+        if self._expect != "end" or self._buffer.strip():
+            raise ValueError("Invalid or incomplete JSON array")
+
+
+async def _iter_artifacts(
+    stream: AsyncIterator[bytes], ndjson: bool
+) -> AsyncIterator[Artifact]:
+    """
+    Parse and validate the artifacts from the request body stream, a JSON
+    array of artifacts or NDJSON (one artifact per line).
+
+    Raises:
+        ValueError: invalid JSON or artifact
+    """
+    if ndjson:
+        buffer = b""
+        async for data in stream:
+            *lines, buffer = (buffer + data).split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield Artifact.model_validate_json(line)
+
+            if len(buffer) > ARTIFACTS_STREAM_MAX_ARTIFACT_SIZE:
+                raise ValueError("Invalid or too large artifact")
+
+        if buffer.strip():
+            yield Artifact.model_validate_json(buffer)
+
+    else:
+        decode = codecs.getincrementaldecoder("utf-8")().decode
+        parser = JSONArrayParser()
+        async for data in stream:
+            for item in parser.feed(decode(data)):
+                yield Artifact.model_validate(item)
+
+        parser.feed(decode(b"", final=True))
+        parser.close()
+
+
+async def post_stream(
+    stream: AsyncIterator[bytes], ndjson: bool, params: StreamParameters
+) -> ResponsePostStream:
+    """
+    Post new artifacts from a stream (JSON array or NDJSON).
+
+    The artifacts are validated as they arrive and staged in the Result
+    Backend in chunks of ``ARTIFACTS_STREAM_CHUNK_SIZE``, so the memory used
+    doesn't depend on the number of artifacts. When all the artifacts are
+    valid, each chunk is submitted as an ``add_artifacts`` task to the
+    ``metadata_repository`` broker queue.
+
+    If submitting a task fails, the request fails (``503``) with the ids of
+    the tasks already submitted, if any.
+    """
+    bs_state = await bootstrap_state_async()
+    if bs_state.bootstrap is False:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            detail={
+                "message": "Task not accepted.",
+                "error": (
+                    f"It requires bootstrap finished. State: {bs_state.state}"
+                ),
+            },
+        )
+
+    number_of_bins = None
+    if ARTIFACTS_QUEUE_SHARDS > 0:
+        number_of_bins = await number_of_delegated_bins()
+
+    staging_key = f"{STREAM_STAGING_KEY_PREFIX}{get_task_id()}"
+    expires = repository_metadata.backend.expires
+
+    async def stage(chunk: List[str]):
+        async with result_backend_async.pipeline() as pipe:
+            pipe.rpush(staging_key, f"[{','.join(chunk)}]")
+            pipe.expire(staging_key, expires)
+            await pipe.execute()
+
+    number_of_artifacts = 0
+    task_ids: List[str] = []
+    # The staged chunks not published (invalid stream or publishing failed)
+    # are removed. They also expire with the Result Backend expiration.
+    try:
+        chunk: List[str] = []
+        try:
+            async for artifact in _iter_artifacts(stream, ndjson):
+                chunk.append(
+                    artifact.model_dump_json(by_alias=True, exclude_none=True)
+                )
+                number_of_artifacts += 1
+                if len(chunk) == ARTIFACTS_STREAM_CHUNK_SIZE:
+                    await stage(chunk)
+                    chunk = []
+
+            if len(chunk) > 0:
+                await stage(chunk)
+        except ValueError as err:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": "Task not accepted.",
+                    "error": (
+                        f"Invalid artifact #{number_of_artifacts + 1}: {err}"
+                    ),
+                },
+            )
+
+        if number_of_artifacts == 0:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": "Task not accepted.",
+                    "error": "No artifacts",
+                },
+            )
+
+        while (
+            staged := await result_backend_async.lpop(staging_key)
+        ) is not None:
+            task_id = get_task_id()
+            artifacts = json.loads(staged)
+            if params.add_task_id_to_custom is True:
+                for artifact in artifacts:
+                    artifact["info"]["custom"] = {
+                        "added_by_task_id": task_id,
+                        **(artifact["info"].get("custom") or {}),
+                    }
+
+            try:
+                await publish_artifacts_task(
+                    "add_artifacts",
+                    {
+                        "artifacts": artifacts,
+                        "add_task_id_to_custom": params.add_task_id_to_custom,
+                        "publish_artifacts": params.publish_artifacts,
+                    },
+                    task_id,
+                    number_of_bins,
+                )
+            except Exception as err:
+                # The tasks already submitted are not reverted, they are
+                # returned so the client can follow them
+                logging.error(f"Artifacts stream publishing failed: {err}")
+                raise HTTPException(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail={
+                        "message": (
+                            "Task partially accepted."
+                            if len(task_ids) > 0
+                            else "Task not accepted."
+                        ),
+                        "error": f"Failed to submit the tasks: {err}",
+                        "task_ids": task_ids,
+                    },
+                )
+            task_ids.append(task_id)
+    finally:
+        await result_backend_async.delete(staging_key)
+
+    message = "New Artifact(s) successfully submitted."
+    if params.publish_artifacts is False:
+        message += " Publishing will be skipped."
+
+    data = {
+        "number_of_artifacts": number_of_artifacts,
+        "task_ids": task_ids,
+        "last_update": datetime.now(timezone.utc),
+    }
+    return ResponsePostStream(data=data, message=message)
+
+
+async def delete(
+    payload: DeletePayload, idempotency_key: Optional[str] = None
+) -> ResponsePostDelete:
     """
     Delete new artifacts.
     It will send a new task with the validated payload to the
     ``metadata_repository`` broker queue.
     It generates a new task id, syncs with the Redis server, and posts the new
     task.
+
+    A repeated request returns the task id of the original request (see
+    ``post``).
     """
-    bs_state = bootstrap_state()
+    bs_state = await bootstrap_state_async()
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -226,16 +919,29 @@ def delete(payload: DeletePayload) -> ResponsePostDelete:
             },
         )
 
-    task_id = get_task_id()
-    repository_metadata.apply_async(
-        kwargs={
-            "action": "remove_artifacts",
-            "payload": payload.dict(by_alias=True, exclude_none=True),
-        },
-        task_id=task_id,
-        queue="metadata_repository",
-        acks_late=True,
+    worker_payload = payload.dict(by_alias=True, exclude_none=True)
+    idempotent_request = IdempotentRequest.from_request(
+        "remove_artifacts", worker_payload, idempotency_key
     )
+    task_id = get_task_id()
+
+    async def submit():
+        if artifacts_coalescer is not None:
+            await artifacts_coalescer.submit(
+                "remove_artifacts",
+                payload.artifacts,
+                payload.publish_artifacts,
+                task_id,
+            )
+        else:
+            number_of_bins = None
+            if ARTIFACTS_QUEUE_SHARDS > 0:
+                number_of_bins = await number_of_delegated_bins()
+            await publish_artifacts_task(
+                "remove_artifacts", worker_payload, task_id, number_of_bins
+            )
+
+    task_id = await _submit_artifacts_task(idempotent_request, task_id, submit)
     data = {
         "artifacts": payload.artifacts,
         "task_id": task_id,
@@ -248,17 +954,30 @@ def delete(payload: DeletePayload) -> ResponsePostDelete:
     return ResponsePostDelete(data=data, message=message)
 
 
-def post_publish_artifacts() -> ResponsePostPublish:
+async def post_publish_artifacts(
+    idempotency_key: Optional[str] = None,
+) -> ResponsePostPublish:
+    idempotent_request = None
+    if idempotency_key is not None:
+        # without payload, it is deduplicated only by the idempotency key
+        idempotent_request = IdempotentRequest(
+            "publish_artifacts", None, idempotency_key
+        )
     task_id = get_task_id()
-    repository_metadata.apply_async(
-        kwargs={
-            "action": "publish_artifacts",
-            "payload": None,
-        },
-        task_id=task_id,
-        queue="rstuf_internals",
-        acks_late=True,
-    )
+
+    async def submit():
+        await publish_task(
+            repository_metadata,
+            kwargs={
+                "action": "publish_artifacts",
+                "payload": None,
+            },
+            task_id=task_id,
+            queue="rstuf_internals",
+            acks_late=True,
+        )
+
+    task_id = await _submit_artifacts_task(idempotent_request, task_id, submit)
 
     data = {
         "artifacts": [],
@@ -3,37 +3,64 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 import logging
 import re
 import time
+import uuid
 from datetime import datetime, timezone
-from threading import Thread
+from threading import Event, Lock, Thread
 from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from repository_service_tuf_api import (
-    bootstrap_state,
+    bootstrap_state_async,
     get_task_id,
     pre_lock_bootstrap,
     release_bootstrap_lock,
     repository_metadata,
+    settings_redis,
 )
 from repository_service_tuf_api.common_models import (
     BaseErrorResponse,
     TUFDelegations,
     TUFMetadata,
+    example_from_file,
 )
+from repository_service_tuf_api.metrics import TASK_RESULT_LOOKUP_DURATION
 
 # Pattern of allowed names to be used by custom target delegated roles
 DELEGATED_NAMES_PATTERN = "[a-zA-Z0-9_-]+"
 
-
-with open("tests/data_examples/bootstrap/payload_bins.json") as f:
-    content = f.read()
-payload_example = json.loads(content)
+# Bootstrap watchdog: pending bootstrap tasks are stored in Redis as a sorted
+# set (task id -> deadline timestamp), so the watchdog can resume them after
+# an API restart. The polling interval backs off up to the max interval.
+#
+# Each API process runs a watchdog, but only the leader (holding the
+# watchdog lock in Redis, renewed on every check) checks the pending tasks.
+# The other watchdogs retry acquiring the lock every `WATCHDOG_MAX_INTERVAL`
+# seconds, taking over the tasks when the leader stops.
+BOOTSTRAP_DEADLINES_KEY = "RSTUF_BOOTSTRAP_DEADLINES"
+BOOTSTRAP_WATCHDOG_LOCK_KEY = "RSTUF_BOOTSTRAP_WATCHDOG_LOCK"
+WATCHDOG_MIN_INTERVAL = 1
+WATCHDOG_MAX_INTERVAL = 10
+WATCHDOG_LOCK_TTL = 3 * WATCHDOG_MAX_INTERVAL
+# Acquire or renew the watchdog lock (Lua script). Returns 1 if held.
+# KEYS: watchdog lock
+# ARGV: watchdog token, lock TTL (milliseconds)
+_WATCHDOG_LOCK_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+_watchdog_lock_script = settings_redis.register_script(_WATCHDOG_LOCK_SCRIPT)
+_watchdog_wakeup = Event()
+_watchdog_lock = Lock()
+_watchdog_thread: Optional[Thread] = None
 
 
 class Role(BaseModel):
@@ -107,7 +134,11 @@ class Settings(BaseModel):
 
 
 class BootstrapPayload(BaseModel):
-    model_config = ConfigDict(json_schema_extra={"example": payload_example})
+    model_config = ConfigDict(
+        json_schema_extra=example_from_file(
+            "tests/data_examples/bootstrap/payload_bins.json"
+        )
+    )
     settings: Settings
     metadata: Dict[str, TUFMetadata]
     timeout: int | None = Field(default=300, description="Timeout in seconds")
@@ -153,27 +184,123 @@ class BootstrapGetResponse(BaseModel):
     message: str
 
 
-def _check_bootstrap_status(task_id, timeout):
-    time_timeout = time.time() + timeout
+def _check_bootstrap_status(task_id: str, deadline: float) -> bool:
+    """
+    Check the status of a pending bootstrap task.
+
+    If the task failed or the deadline has expired (the task is revoked), the
+    bootstrap lock is released.
+
+    Returns:
+        ``True`` if the task doesn't require to be watched anymore.
+    """
+    task = repository_metadata.AsyncResult(task_id)
+    with TASK_RESULT_LOOKUP_DURATION.time():
+        task_status = task.status
+    if task_status == "SUCCESS":
+        return True
+    elif task_status == "FAILURE":
+        release_bootstrap_lock(task_id)
+        return True
+    elif time.time() > deadline:
+        with repository_metadata.app.producer_or_acquire() as producer:
+            task.revoke(connection=producer.connection, terminate=True)
+        release_bootstrap_lock(task_id)
+        return True
+
+    return False
+
+
+def _acquire_watchdog_lock(token: str) -> bool:
+    """Acquire or renew the watchdog lock for the watchdog token."""
+    return bool(
+        _watchdog_lock_script(
+            keys=[BOOTSTRAP_WATCHDOG_LOCK_KEY],
+            args=[token, WATCHDOG_LOCK_TTL * 1000],
+        )
+    )
+
 
+def _bootstrap_watchdog():
+    """
+    Watch all the pending bootstrap tasks until they finish or expire.
+
+    A single thread checks all pending tasks, if it holds the watchdog lock.
+    The check interval doubles while nothing changes (up to
+    ``WATCHDOG_MAX_INTERVAL``), never sleeping beyond the next deadline, and
+    resets when a new bootstrap is watched. Any error is logged, and the
+    check is retried after ``WATCHDOG_MAX_INTERVAL``.
+    """
+    token = uuid.uuid4().hex
+    interval = WATCHDOG_MIN_INTERVAL
     while True:
-        task = repository_metadata.AsyncResult(task_id)
-        if task.status == "SUCCESS":
-            return
-        elif task.status == "FAILURE":
-            release_bootstrap_lock()
-            return
+        try:
+            deadlines = []
+            if not _acquire_watchdog_lock(token):
+                pending = []
+            else:
+                pending = settings_redis.zrange(
+                    BOOTSTRAP_DEADLINES_KEY, 0, -1, withscores=True
+                )
+            for task_id, deadline in pending:
+                if not _check_bootstrap_status(task_id, deadline):
+                    deadlines.append(deadline)
+                elif settings_redis.zrem(BOOTSTRAP_DEADLINES_KEY, task_id):
+                    logging.info(f"Bootstrap task {task_id} watch finished")
+        except Exception as err:
+            logging.error(f"Bootstrap watchdog failed: {err}")
+            wait = WATCHDOG_MAX_INTERVAL
         else:
-            if time.time() > time_timeout:
-                task.revoke(terminate=True)
-                release_bootstrap_lock()
-                return
-
-            continue
+            if len(deadlines) == 0:
+                # Nothing to watch (or not the leader). The lock is renewed
+                # and a new bootstrap (of any process) is watched on the
+                # next check.
+                wait = WATCHDOG_MAX_INTERVAL
+            else:
+                wait = max(0, min(interval, min(deadlines) - time.time()))
+
+        if _watchdog_wakeup.wait(wait):
+            interval = WATCHDOG_MIN_INTERVAL
+        else:
+            interval = min(interval * 2, WATCHDOG_MAX_INTERVAL)
+        _watchdog_wakeup.clear()
+
+
+def start_bootstrap_watchdog():
+    """
+    Start the bootstrap watchdog thread, if it is not running.
+
+    Bootstrap tasks pending from a previous API process are resumed.
+    """
+    global _watchdog_thread
+    with _watchdog_lock:
+        if _watchdog_thread is None or not _watchdog_thread.is_alive():
+            _watchdog_thread = Thread(
+                None,
+                _bootstrap_watchdog,
+                name="bootstrap-watchdog",
+                daemon=True,
+            )
+            _watchdog_thread.start()
+
+
+def watch_bootstrap(task_id: str, timeout: int):
+    """
+    Add a bootstrap task to the watchdog.
+
+    Args:
+        task_id: Bootstrap task id
+        timeout: Timeout in seconds to revoke the task and release the lock
+    """
+    settings_redis.zadd(
+        BOOTSTRAP_DEADLINES_KEY, {task_id: time.time() + timeout}
+    )
+    start_bootstrap_watchdog()
+    _watchdog_wakeup.set()
 
 
-def get_bootstrap() -> BootstrapGetResponse:
-    bs_state = bootstrap_state()
+async def get_bootstrap() -> BootstrapGetResponse:
+    bs_state = await bootstrap_state_async()
     # If bootstrap ceremony has completed, is executed in the moment ("pre")
     # or is in the process of DAS signing ("signing") we consider it as locked.
     if bs_state.bootstrap is True or bs_state.state in ["pre", "signing"]:
@@ -195,10 +322,12 @@ def get_bootstrap() -> BootstrapGetResponse:
 
 
 def post_bootstrap(payload: BootstrapPayload) -> BootstrapPostResponse:
-    bs_state = bootstrap_state()
-    # If bootstrap ceremony has completed, is executed in the moment ("pre")
-    # or is in the process of DAS signing ("signing") we consider it as locked.
-    if bs_state.bootstrap is True or bs_state.state in ["pre", "signing"]:
+    task_id = get_task_id()
+    # The lock is acquired atomically, unless the bootstrap ceremony has
+    # completed, is executed in the moment ("pre") or is in the process of DAS
+    # signing ("signing"), so concurrent requests can't both acquire it.
+    bs_state = pre_lock_bootstrap(task_id)
+    if bs_state.task_id != task_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=BaseErrorResponse(
@@ -209,8 +338,6 @@ def post_bootstrap(payload: BootstrapPayload) -> BootstrapPostResponse:
             ).dict(exclude_none=True),
         )
 
-    task_id = get_task_id()
-    pre_lock_bootstrap(task_id)
     repository_metadata.apply_async(
         kwargs={
             "action": "bootstrap",
@@ -222,16 +349,9 @@ def post_bootstrap(payload: BootstrapPayload) -> BootstrapPostResponse:
     )
     logging.info(f"Bootstrap task {task_id} sent")
 
-    # start a thread to check the bootstrap process
+    # add the bootstrap task to the watchdog
     logging.info(f"Bootstrap process timeout: {payload.timeout} seconds")
-    Thread(
-        None,
-        _check_bootstrap_status,
-        kwargs={
-            "task_id": task_id,
-            "timeout": payload.timeout,
-        },
-    ).start()
+    watch_bootstrap(task_id, payload.timeout)
 
     data = {
         "task_id": task_id,
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+from typing import Any, List, Optional
+
+from dynaconf.utils.parse_conf import parse_conf_data, unparse_conf_data
+
+# Bootstrap lock operations, atomic compare-and-set of the repository
+# settings `BOOTSTRAP` field (Lua scripts), increasing the settings version.
+# KEYS: repository settings (hash), settings version (same slot in a Redis
+# Cluster)
+#
+# Acquire the lock (`pre-<task_id>`) if the bootstrap isn't finished, in the
+# `pre` or in the `signing` state. Returns the `BOOTSTRAP` value.
+# ARGV: lock value
+BOOTSTRAP_LOCK_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'BOOTSTRAP')
+if current and current ~= '@none ' then
+    local state = string.match(current, '^([^%-]*)%-')
+    if state == nil or state == 'pre' or state == 'signing' then
+        return current
+    end
+end
+redis.call('HSET', KEYS[1], 'BOOTSTRAP', ARGV[1])
+redis.call('INCR', KEYS[2])
+return ARGV[1]
+"""
+# Set the `BOOTSTRAP` value if the current value is one of the expected
+# (an empty string is unset). Returns 1 if set, otherwise 0.
+# ARGV: new value, expected values...
+BOOTSTRAP_CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'BOOTSTRAP')
+if not current or current == '@none ' then
+    current = ''
+end
+for i = 2, #ARGV do
+    if current == ARGV[i] then
+        redis.call('HSET', KEYS[1], 'BOOTSTRAP', ARGV[1])
+        redis.call('INCR', KEYS[2])
+        return 1
+    end
+end
+return 0
+"""
+
+
+class BootstrapLock:
+    """
+    Bootstrap lock of the repository settings, written atomically (Lua
+    scripts) with the settings version increase.
+
+    The ``keys`` of the operations are the repository settings key (hash)
+    and the settings version key. The values are stored as Dynaconf does.
+    """
+
+    def __init__(self, redis: Any):
+        self._lock = redis.register_script(BOOTSTRAP_LOCK_SCRIPT)
+        self._cas = redis.register_script(BOOTSTRAP_CAS_SCRIPT)
+
+    def acquire(self, keys: List[str], value: str) -> Optional[str]:
+        """
+        Set the ``BOOTSTRAP`` value (lock) if the bootstrap isn't finished,
+        in the `pre` or in the `signing` state.
+
+        Returns:
+            The ``BOOTSTRAP`` value, the given value if the lock is acquired.
+        """
+        bootstrap = self._lock(keys=keys, args=[unparse_conf_data(value)])
+
+        return parse_conf_data(bootstrap, tomlfy=True)
+
+    def transition(
+        self,
+        keys: List[str],
+        expected: List[Optional[str]],
+        value: Optional[str],
+    ) -> bool:
+        """
+        Set the ``BOOTSTRAP`` value if the current value is one of the
+        expected values (compare-and-set).
+
+        Returns:
+            ``True`` if the value was set.
+        """
+        changed = self._cas(
+            keys=keys,
+            args=[
+                unparse_conf_data(value),
+                *(
+                    (
+                        ""
+                        if expected_value is None
+                        else (unparse_conf_data(expected_value))
+                    )
+                    for expected_value in expected
+                ),
+            ],
+        )
+
+        return bool(changed)
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import time
+from functools import partial
+from weakref import WeakKeyDictionary
+
+import anyio
+from celery.app.amqp import AMQP
+from kombu import pools
+
+from repository_service_tuf_api.metrics import (
+    BROKER_POOL_TIMEOUTS,
+    BROKER_POOL_WAIT_DURATION,
+)
+
+
+class ProducerPool(pools.ProducerPool):
+    """
+    Broker producer pool with acquire timeout, wait time metrics and health
+    check of the idle connections.
+
+    Args:
+        timeout: Time in seconds waiting for a producer (blocking acquire)
+        max_idle: Time in seconds after which an idle pooled connection is
+            reopened before use
+    """
+
+    def __init__(
+        self, *args, timeout: float = 10, max_idle: float = 60, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        # Last time each pooled connection was used (monotonic)
+        self._connections_last_used = WeakKeyDictionary()
+
+    def acquire(self, block=False, timeout=None):
+        if block and timeout is None:
+            timeout = self.timeout
+
+        started = time.monotonic()
+        try:
+            producer = super().acquire(block=block, timeout=timeout)
+        except self.LimitExceeded:
+            BROKER_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            BROKER_POOL_WAIT_DURATION.observe(time.monotonic() - started)
+
+        return producer
+
+    def prepare(self, p):
+        p = super().prepare(p)
+        # A connection idle for long could be dropped by the broker (or a
+        # load balancer) without notice. It is reopened instead of failing
+        # the publishing and retrying.
+        connection = p.connection
+        now = time.monotonic()
+        last_used = self._connections_last_used.get(connection)
+        if last_used is not None and now - last_used > self.max_idle:
+            logging.debug("Reopening idle broker connection")
+            connection.close()
+            p.revive(connection)
+
+        self._connections_last_used[connection] = now
+
+        return p
+
+
+class RSTUFAMQP(AMQP):
+    """
+    Celery AMQP with the ``ProducerPool``, configured by the app settings
+    ``broker_pool_timeout`` and ``broker_pool_max_idle``.
+    """
+
+    @property
+    def producer_pool(self):
+        if self._producer_pool is None:
+            conf = self.app.conf
+            self._producer_pool = ProducerPool(
+                pools.connections[self.app.connection_for_write()],
+                limit=conf.broker_pool_limit,
+                timeout=conf.get("broker_pool_timeout", 10),
+                max_idle=conf.get("broker_pool_max_idle", 60),
+            )
+        return self._producer_pool
+
+    def reset_producer_pool(self):
+        """Drop the producer pool, recreated on use (i.e. after fork)."""
+        self._producer_pool = None
+
+
+class TaskPublisher:
+    """
+    Publish tasks to the broker without blocking the event loop.
+
+    Publishing is blocking (kombu), it runs in worker threads limited by the
+    ``concurrency``. The requests waiting to publish don't hold a thread.
+    """
+
+    def __init__(self, concurrency: int):
+        self._limiter = anyio.CapacityLimiter(concurrency)
+
+    async def publish(self, task, **options):
+        """Publish a task (``task.apply_async(**options)``)."""
+        return await anyio.to_thread.run_sync(
+            partial(task.apply_async, **options), limiter=self._limiter
+        )
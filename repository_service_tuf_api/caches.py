@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import time
+from threading import Lock
+from typing import Any, Optional
+
+
+class _SingleValueCache:
+    """
+    Cache of a single value, valid up to a TTL and cleared on repository
+    settings changes.
+
+    The generation increases on every clear, so a value read before a clear
+    is never cached after it.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._generation = 0
+        self.clear()
+
+    @property
+    def generation(self) -> int:
+        """Number of clears, read before reading a value to cache."""
+        return self._generation
+
+    def clear(self):
+        with self._lock:
+            self._version: Optional[str] = None
+            self._value: Any = None
+            self._expires = 0.0
+            self._generation += 1
+
+    def _get(self, version: Optional[str]) -> Any:
+        with self._lock:
+            if self._version == version and time.monotonic() < self._expires:
+                return self._value
+
+        return None
+
+    def _set(
+        self,
+        version: Optional[str],
+        value: Any,
+        ttl: float,
+        generation: Optional[int],
+    ):
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._version = version
+            self._value = value
+            self._expires = time.monotonic() + ttl
+
+
+class ExpiringCache(_SingleValueCache):
+    """Cache of a single value, valid up to a TTL."""
+
+    def get(self) -> Any:
+        """The cached value, if any and not expired."""
+        return self._get(None)
+
+    def set(self, value: Any, ttl: float, generation: Optional[int] = None):
+        """
+        Cache the value for ``ttl`` seconds, unless the cache was cleared
+        since the ``generation`` was read.
+        """
+        self._set(None, value, ttl, generation)
+
+
+class VersionedCache(_SingleValueCache):
+    """
+    Cache of a single value by version (i.e. repository settings version),
+    valid up to a TTL.
+    """
+
+    def get(self, version: Optional[str]) -> Any:
+        """The cached value of the version, if any and not expired."""
+        if version is None:
+            return None
+
+        return self._get(version)
+
+    def set(
+        self,
+        version: Optional[str],
+        value: Any,
+        ttl: float,
+        generation: Optional[int] = None,
+    ):
+        """
+        Cache the value of the version (unversioned is not cached).
+
+        A value read before a clear (``generation`` changed) isn't cached:
+        the settings it was read from could have changed without a new
+        version (i.e. changed by the RSTUF Workers).
+        """
+        if version is None:
+            return
+
+        self._set(version, value, ttl, generation)
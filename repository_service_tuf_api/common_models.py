@@ -2,13 +2,31 @@
 # SPDX-FileCopyrightText: 2022-2023 VMware Inc
 #
 # SPDX-License-Identifier: MIT
-
+import json
 from enum import Enum
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
-from repository_service_tuf_api import settings_repository
+from repository_service_tuf_api import repository_topology
+
+
+def example_from_file(
+    path: str, build: Optional[Callable[[Any], Any]] = None
+) -> Callable[[Dict[str, Any]], None]:
+    """
+    Model ``json_schema_extra`` with the ``example`` loaded from a JSON file.
+
+    The file is loaded when the JSON schema (OpenAPI) is generated, not when
+    the model is defined. ``build`` builds the example from the file content.
+    """
+
+    def json_schema_extra(schema: Dict[str, Any]) -> None:
+        with open(path) as f:
+            example = json.load(f)
+        schema["example"] = build(example) if build else example
+
+    return json_schema_extra
 
 
 class Roles(Enum):
@@ -35,23 +53,7 @@ class Roles(Enum):
 
     @staticmethod
     def online_roles_values() -> List[str]:
-        online_roles: List[str] = ["snapshot", "timestamp"]
-        if settings_repository.get_fresh("TARGETS_ONLINE_KEY", True):
-            online_roles.append("targets")
-
-        delegated_roles: List[str] = settings_repository.get_fresh(
-            "DELEGATED_ROLES_NAMES"
-        )
-        # All delegated roles names should start with "bins" if we are using
-        # hash bin delegation and none of the delegated roles should start with
-        # "bins" if we are using custom target delegation.
-        bins_used = True if delegated_roles[0].startswith("bins") else False
-        if bins_used:
-            online_roles.append(Roles.BINS.value)
-        else:
-            online_roles.extend(delegated_roles)
-
-        return online_roles
+        return repository_topology().online_roles()
 
 
 class BaseErrorResponse(BaseModel):
@@ -2,21 +2,36 @@
 # SPDX-FileCopyrightText: 2022-2023 VMware Inc
 #
 # SPDX-License-Identifier: MIT
-
-import json
 from datetime import datetime, timezone
 from typing import Any, Dict
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict
+from starlette.requests import Request
+from starlette.responses import Response
 
 from repository_service_tuf_api import (
-    bootstrap_state,
+    bootstrap_state_async,
     get_task_id,
+    on_settings_change,
+    pinned_settings_reads,
+    publish_task,
     repository_metadata,
-    settings_repository,
+    repository_settings,
+    settings,
+    settings_version,
+)
+from repository_service_tuf_api.common_models import example_from_file
+from repository_service_tuf_api.http_cache import (
+    PrecompressedContent,
+    VersionedContentCache,
 )
 
+# Rendered settings (`GetResponse`) cache, by repository settings version.
+# `0` disables the cache.
+CONFIG_CACHE_TTL = int(settings.get("CONFIG_CACHE_TTL", 0))
+_config_cache = VersionedContentCache()
+
 
 class PutData(BaseModel):
     task_id: str
@@ -45,23 +60,18 @@ class Settings(BaseModel):
     expiration: Dict[str, int]
 
 
-with open("tests/data_examples/config/update_settings.json") as f:
-    content = f.read()
-put_payload = json.loads(content)
-
-
 class PutPayload(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={
-            "example": put_payload,
-        }
+        json_schema_extra=example_from_file(
+            "tests/data_examples/config/update_settings.json"
+        )
     )
 
     settings: Settings
 
 
-def put(payload: PutPayload):
-    bs_state = bootstrap_state()
+async def put(payload: PutPayload):
+    bs_state = await bootstrap_state_async()
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -73,7 +83,8 @@ def put(payload: PutPayload):
 
     task_id = get_task_id()
 
-    repository_metadata.apply_async(
+    await publish_task(
+        repository_metadata,
         kwargs={
             "action": "update_settings",
             "payload": payload.dict(by_alias=True, exclude_none=True),
@@ -91,26 +102,50 @@ def put(payload: PutPayload):
     return PutResponse(data=data, message="Settings successfully submitted.")
 
 
-with open("tests/data_examples/config/settings.json") as f:
-    content = f.read()
-example_settings = json.loads(content)
-
-
 class GetResponse(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "data": example_settings,
-                "message": "Current Settings",
-            }
-        }
+        json_schema_extra=example_from_file(
+            "tests/data_examples/config/settings.json",
+            lambda settings: {"data": settings, "message": "Current Settings"},
+        )
     )
     data: Dict[str, Any]
     message: str
 
 
-def get() -> GetResponse:
-    bs_state = bootstrap_state()
+def invalidate_config_cache():
+    _config_cache.clear()
+
+
+on_settings_change(invalidate_config_cache)
+
+
+def get(request: Request) -> Response:
+    """
+    Get the repository settings (``GetResponse``).
+
+    The response has an ETag and supports conditional requests
+    (``If-None-Match``). When ``RSTUF_CONFIG_CACHE_TTL`` is enabled, the
+    rendered response is cached (compressed) by repository settings version,
+    so a request only reads the version from Redis while the settings don't
+    change. The RSTUF Workers don't increase the version, so their changes
+    invalidate the cache only by the settings listener (Redis keyspace
+    notifications), otherwise after the TTL.
+    """
+    # The version and the cache generation are read before the settings, so
+    # a change while reading the settings is never cached
+    generation = _config_cache.generation
+    # The version and the settings are read from the same Redis server
+    with pinned_settings_reads():
+        version = settings_version() if CONFIG_CACHE_TTL > 0 else None
+        content = _config_cache.get(version)
+        if content is not None:
+            return content.response(request)
+
+        # The bootstrap state and the settings are read from the same snapshot
+        settings_snapshot = repository_settings()
+
+    bs_state = settings_snapshot.bootstrap_state()
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -120,10 +155,8 @@ def get() -> GetResponse:
             },
         )
 
-    # Forces all values to be refreshed
-    settings_repository.fresh()
     lower_case_settings = {}
-    for k, v in settings_repository.to_dict().items():
+    for k, v in settings_snapshot.to_dict().items():
         if isinstance(v, str):
             v = v.lower()
 
@@ -134,4 +167,19 @@ def get() -> GetResponse:
 
     current_settings = {**lower_case_settings}
 
-    return GetResponse(data=current_settings, message="Current Settings")
+    response = GetResponse(data=current_settings, message="Current Settings")
+    # A (shared) snapshot older than the version read isn't cached, and only
+    # a cached response is compressed
+    cached = version is not None and settings_snapshot.version in (
+        None,
+        version,
+    )
+    content = PrecompressedContent(
+        response.model_dump_json(exclude_none=True).encode(),
+        "application/json",
+        precompress=cached,
+    )
+    if cached:
+        _config_cache.set(version, content, CONFIG_CACHE_TTL, generation)
+
+    return content.response(request)
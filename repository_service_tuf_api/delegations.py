@@ -2,7 +2,6 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 from datetime import datetime, timezone
 from typing import List
 
@@ -10,15 +9,15 @@ from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict
 
 from repository_service_tuf_api import (
-    bootstrap_state,
+    bootstrap_state_async,
     get_task_id,
+    publish_task,
     repository_metadata,
 )
-from repository_service_tuf_api.common_models import TUFDelegations
-
-with open("tests/data_examples/metadata/delegation-payload.json") as f:
-    content = f.read()
-delegation_payload_example = json.loads(content)
+from repository_service_tuf_api.common_models import (
+    TUFDelegations,
+    example_from_file,
+)
 
 
 class ResponseData(BaseModel):
@@ -56,7 +55,9 @@ class DelegationsData(BaseModel):
 
 class MetadataDelegationsPayload(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={"example": delegation_payload_example}
+        json_schema_extra=example_from_file(
+            "tests/data_examples/metadata/delegation-payload.json"
+        )
     )
 
     delegations: TUFDelegations
@@ -75,11 +76,11 @@ class MetadataDelegationDeletePayload(BaseModel):
     delegations: DelegationsData
 
 
-def metadata_delegation(
+async def metadata_delegation(
     payload: MetadataDelegationsPayload | MetadataDelegationDeletePayload,
     action: str,
 ):
-    bs_state = bootstrap_state()
+    bs_state = await bootstrap_state_async()
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_200_OK,
@@ -95,7 +96,8 @@ def metadata_delegation(
     worker_payload = payload.model_dump(by_alias=True, exclude_none=True)
     worker_payload["action"] = action
 
-    repository_metadata.apply_async(
+    await publish_task(
+        repository_metadata,
         kwargs={
             "action": "metadata_delegation",
             "payload": worker_payload,
@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dynaconf.utils.parse_conf import parse_conf_data
+
+from repository_service_tuf_api import (
+    RepositoryTopology,
+    settings_holder,
+    settings_redis_async,
+    settings_redis_async_replicas,
+    shared_repository_settings,
+)
+
+# Succinct hash bin delegation (TAP 15), as configured by the workers with the
+# number of delegated bins given at bootstrap
+BINS_NAME_PREFIX = "bins"
+
+
+@lru_cache(maxsize=8)
+def bin_roles_names(number_of_bins: int) -> Tuple[str, ...]:
+    """
+    Hash bin delegated roles names (``bins-<hex bin number>``), indexed by
+    bin number.
+    """
+    bit_length = int(math.log2(number_of_bins))
+    suffix_len = len(f"{2**bit_length - 1:x}")
+
+    return tuple(
+        f"{BINS_NAME_PREFIX}-{bin_number:0{suffix_len}x}"
+        for bin_number in range(2**bit_length)
+    )
+
+
+def bin_numbers_for_paths(
+    paths: Iterable[str], number_of_bins: int
+) -> List[int]:
+    """
+    Hash bin number of each artifact path.
+
+    The bin is the SHA-256 prefix of the path (the first ``log2(bins)``
+    bits), as in the TUF succinct hash bin delegation.
+    """
+    bit_length = int(math.log2(number_of_bins))
+    prefix_len = math.ceil(bit_length / 8)
+    shift = prefix_len * 8 - bit_length
+    sha256 = hashlib.sha256
+    from_bytes = int.from_bytes
+
+    return [
+        from_bytes(sha256(path.encode()).digest()[:prefix_len], "big") >> shift
+        for path in paths
+    ]
+
+
+def bin_roles_for_paths(
+    paths: Iterable[str], number_of_bins: int
+) -> List[str]:
+    """
+    Hash bin delegated role of each artifact path.
+
+    The mapping is computed for all paths at once with the roles names
+    computed once by number of bins, instead of building the role name for
+    each path.
+    """
+    names = bin_roles_names(number_of_bins)
+
+    return [
+        names[bin_number]
+        for bin_number in bin_numbers_for_paths(paths, number_of_bins)
+    ]
+
+
+async def number_of_delegated_bins() -> Optional[int]:
+    """
+    Number of hash bin delegated roles (``None`` if hash bin delegation isn't
+    used, i.e. the delegated roles aren't the succinct hash bins).
+    """
+    shared_snapshot = shared_repository_settings()
+    if shared_snapshot is not None:
+        number_of_bins = shared_snapshot.data.get("NUMBER_OF_DELEGATED_BINS")
+        bins_used = shared_snapshot.topology.bins_used
+    else:
+        number_of_bins, delegated_roles = (
+            None if value is None else parse_conf_data(value, tomlfy=True)
+            for value in await (
+                settings_redis_async_replicas or settings_redis_async
+            ).hmget(
+                settings_holder(),
+                ["NUMBER_OF_DELEGATED_BINS", "DELEGATED_ROLES_NAMES"],
+            )
+        )
+        bins_used = RepositoryTopology(
+            True, tuple(delegated_roles or ())
+        ).bins_used
+
+    if not bins_used:
+        return None
+    if not isinstance(number_of_bins, int) or number_of_bins < 2:
+        return None
+
+    return number_of_bins
+
+
+def target_roles(
+    paths: Iterable[str], number_of_bins: Optional[int]
+) -> Optional[Dict[str, str]]:
+    """
+    Hash bin delegated role by artifact path (``None`` without hash bin
+    delegation).
+    """
+    if number_of_bins is None:
+        return None
+
+    paths = list(paths)
+    return dict(zip(paths, bin_roles_for_paths(paths, number_of_bins)))
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import gzip
+import hashlib
+from typing import Dict
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from repository_service_tuf_api.caches import VersionedCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover -- brotli is optional
+    brotli = None
+
+
+def make_etag(content: bytes) -> str:
+    """Strong ETag of the content."""
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request ``If-None-Match`` header matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # The weak comparison is used for `If-None-Match` (RFC 9110)
+    return etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )
+
+
+def accepted_encodings(request: Request) -> Dict[str, float]:
+    """Content encodings accepted by the request, by quality value."""
+    encodings: Dict[str, float] = {}
+    for value in request.headers.get("accept-encoding", "").split(","):
+        encoding, _, params = value.partition(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        param, _, param_value = params.partition("=")
+        if param.strip() == "q":
+            try:
+                quality = float(param_value)
+            except ValueError:
+                quality = 0.0
+        encodings[encoding] = quality
+
+    return encodings
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    """Compress the content with the content encoding (``br`` or ``gzip``)."""
+    if encoding == "br":
+        return brotli.compress(content)
+
+    return gzip.compress(content, mtime=0)
+
+
+class PrecompressedContent:
+    """
+    Content encoded once as bytes, and compressed (gzip and, if available,
+    brotli), served with an ETag and conditional GET support.
+
+    With ``precompress=False`` (i.e. content served once, not cached), the
+    content is served uncompressed.
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        media_type: str,
+        cache_control: str = "no-cache",
+        precompress: bool = True,
+    ):
+        self.content = content
+        self.media_type = media_type
+        self.etag = make_etag(content)
+        self.headers = {
+            "ETag": self.etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        # Preferred encodings first
+        self.encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+        self.compressed: Dict[str, bytes] = {}
+        if precompress:
+            for encoding in self.encodings:
+                self.compressed[encoding] = compress(content, encoding)
+
+    def response(self, request: Request) -> Response:
+        if etag_matches(request, self.etag):
+            return Response(
+                status_code=304, headers=self.headers, media_type=None
+            )
+
+        accepted = accepted_encodings(request)
+        for encoding, compressed in self.compressed.items():
+            if accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return Response(
+                    compressed,
+                    media_type=self.media_type,
+                    headers={**self.headers, "Content-Encoding": encoding},
+                )
+
+        return Response(
+            self.content, media_type=self.media_type, headers=self.headers
+        )
+
+
+class VersionedContentCache(VersionedCache):
+    """
+    Cache of a single ``PrecompressedContent`` by version (i.e. repository
+    settings version), valid up to a TTL.
+    """
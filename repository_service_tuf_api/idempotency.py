@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+
+from repository_service_tuf_api import result_backend_async, settings
+
+# Result Backend key prefix of the submitted requests (idempotency keys)
+IDEMPOTENCY_KEY_PREFIX = "rstuf-idempotency-"
+# Time in seconds an `Idempotency-Key` header value is kept
+IDEMPOTENCY_KEY_TTL = int(settings.get("IDEMPOTENCY_KEY_TTL", 86400))
+# Time in seconds a request is deduplicated by the payload, without an
+# `Idempotency-Key` header (0 disables it)
+DEDUPLICATION_WINDOW = int(settings.get("DEDUPLICATION_WINDOW", 0))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Time in seconds a request is claimed before its task is published, so a
+# request that never publishes (i.e. the API process stops) doesn't block the
+# key until it expires
+IDEMPOTENCY_PENDING_TTL = 60
+
+# Idempotency key operations, atomic in the Result Backend (Lua scripts).
+# The key value is `<task id> <payload digest> <state>`, with the state
+# `pending` (claimed, task not published yet) or `published`.
+# KEYS: idempotency key
+#
+# Claim the key if it doesn't exist. Returns the current value if it exists.
+# ARGV: value, TTL (seconds)
+_CLAIM_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return false
+end
+return redis.call('GET', KEYS[1])
+"""
+# Replace the value or delete it (empty new value) if the current value is
+# the expected. Returns 1 if replaced, otherwise 0.
+# ARGV: expected value, new value, TTL (seconds)
+_CAS_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    return redis.call('DEL', KEYS[1])
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+_claim = result_backend_async.register_script(_CLAIM_SCRIPT)
+_cas = result_backend_async.register_script(_CAS_SCRIPT)
+
+
+def payload_digest(payload: Any) -> str:
+    """SHA-256 of the canonical JSON payload (sorted keys, no whitespace)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotentRequest:
+    """
+    Task-submitting request deduplicated by the ``Idempotency-Key`` header
+    or, within ``DEDUPLICATION_WINDOW``, by the payload digest.
+
+    The request is claimed in the Result Backend with the task id before the
+    task is published (``claim``), and marked as published after it
+    (``published``), or released if publishing fails (``release``). A
+    repeated request gets the task id of the original request, and no task is
+    published. A request repeated while the original is not published yet is
+    rejected (``409``), as the original could still fail.
+    """
+
+    def __init__(
+        self, action: str, payload: Any, idempotency_key: Optional[str]
+    ):
+        self.digest = payload_digest(payload)
+        if idempotency_key is not None:
+            self.key = f"{IDEMPOTENCY_KEY_PREFIX}{action}:{idempotency_key}"
+            self.ttl = IDEMPOTENCY_KEY_TTL
+        else:
+            self.key = f"{IDEMPOTENCY_KEY_PREFIX}{action}:{self.digest}"
+            self.ttl = DEDUPLICATION_WINDOW
+        self.value: Optional[str] = None
+
+    @classmethod
+    def from_request(
+        cls, action: str, payload: Any, idempotency_key: Optional[str]
+    ) -> Optional["IdempotentRequest"]:
+        """The idempotent request (``None`` if deduplication isn't used)."""
+        if idempotency_key is None and DEDUPLICATION_WINDOW == 0:
+            return None
+
+        return cls(action, payload, idempotency_key)
+
+    async def claim(self, task_id: str) -> Optional[str]:
+        """
+        Claim the request for the task id.
+
+        Returns:
+            ``None`` if claimed, otherwise the task id of the original
+            request.
+
+        Raises:
+            HTTPException 422 if the idempotency key was used with a
+            different payload, or 409 if the original request is not
+            published yet.
+        """
+        value = f"{task_id} {self.digest} pending"
+        original = await _claim(
+            keys=[self.key],
+            args=[value, min(self.ttl, IDEMPOTENCY_PENDING_TTL)],
+        )
+        if original is None:
+            self.value = value
+            return None
+
+        original_task_id, _, original = original.decode().partition(" ")
+        original_digest, _, state = original.partition(" ")
+        if original_digest != self.digest:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "message": "Task not accepted.",
+                    "error": (
+                        "Idempotency-Key already used with a different "
+                        "payload"
+                    ),
+                },
+            )
+
+        if state == "pending":
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "Task not accepted.",
+                    "error": (
+                        f"The original request (task {original_task_id}) is "
+                        "still being submitted, retry later"
+                    ),
+                },
+            )
+
+        return original_task_id
+
+    async def published(self):
+        """
+        Mark the claimed request as published (task submitted), kept for the
+        idempotency TTL.
+        """
+        claimed, _, _ = self.value.rpartition(" ")
+        await _cas(
+            keys=[self.key],
+            args=[self.value, f"{claimed} published", self.ttl],
+        )
+
+    async def release(self):
+        """
+        Release the claimed request, so it can be retried (i.e. publish
+        error). A claim that expired and was claimed again isn't released.
+        """
+        await _cas(keys=[self.key], args=[self.value, "", 0])
@@ -3,37 +3,48 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Literal, Optional
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict
+from starlette.requests import Request
+from starlette.responses import Response
 
 from repository_service_tuf_api import (
     bootstrap_state,
+    bootstrap_state_async,
     get_task_id,
+    on_settings_change,
+    parse_setting,
+    pinned_settings_reads,
+    publish_task,
     repository_metadata,
-    settings_repository,
+    repository_settings,
+    repository_topology,
+    settings,
+    settings_holder,
+    settings_redis,
+    settings_redis_replicas,
+    settings_version,
+    shared_repository_settings,
 )
 from repository_service_tuf_api.common_models import (
     Roles,
     TUFDelegations,
     TUFMetadata,
     TUFSignatures,
+    example_from_file,
+)
+from repository_service_tuf_api.http_cache import (
+    PrecompressedContent,
+    VersionedContentCache,
 )
 
-with open("tests/data_examples/metadata/update-root-payload.json") as f:
-    content = f.read()
-update_payload_example = json.loads(content)
-
-with open("tests/data_examples/bootstrap/das-payload.json") as f:
-    content = f.read()
-das_payload_example = json.loads(content)
-
-with open("tests/data_examples/metadata/delegation-payload.json") as f:
-    content = f.read()
-delegation_payload_example = json.loads(content)
+# Rendered metadata pending signing (`MetadataSignGetResponse`) cache, by
+# repository settings version. `0` disables the cache.
+METADATA_SIGN_CACHE_TTL = int(settings.get("METADATA_SIGN_CACHE_TTL", 0))
+_metadata_sign_cache = VersionedContentCache()
 
 
 #
@@ -41,7 +52,9 @@ delegation_payload_example = json.loads(content)
 #
 class MetadataPostPayload(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={"example": update_payload_example}
+        json_schema_extra=example_from_file(
+            "tests/data_examples/metadata/update-root-payload.json"
+        )
     )
 
     metadata: Dict[Literal[Roles.ROOT.value], TUFMetadata]
@@ -67,8 +80,10 @@ class MetadataPostResponse(BaseModel):
     message: str
 
 
-def post_metadata(payload: MetadataPostPayload) -> MetadataPostResponse:
-    bs_state = bootstrap_state()
+async def post_metadata(
+    payload: MetadataPostPayload,
+) -> MetadataPostResponse:
+    bs_state = await bootstrap_state_async()
     if bs_state.bootstrap is False:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -82,7 +97,8 @@ def post_metadata(payload: MetadataPostPayload) -> MetadataPostResponse:
 
     task_id = get_task_id()
 
-    repository_metadata.apply_async(
+    await publish_task(
+        repository_metadata,
         kwargs={
             "action": "metadata_update",
             "payload": payload.dict(by_alias=True, exclude_none=True),
@@ -115,7 +131,9 @@ class DelegationsData(BaseModel):
 
 class MetadataDelegationsPayload(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={"example": delegation_payload_example}
+        json_schema_extra=example_from_file(
+            "tests/data_examples/metadata/delegation-payload.json"
+        )
     )
 
     delegations: TUFDelegations
@@ -178,10 +196,8 @@ def post_metadata_online(
         )
 
     roles = payload.roles
-    targets_in = "targets" in roles
-    settings_repository.reload()
-    targets_online = settings_repository.get_fresh("TARGETS_ONLINE_KEY", True)
-    if targets_in and not targets_online:
+    topology = repository_topology()
+    if "targets" in roles and not topology.is_online_role("targets"):
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
             detail={
@@ -192,12 +208,7 @@ def post_metadata_online(
             },
         )
 
-    delegated_roles = settings_repository.get_fresh("DELEGATED_ROLES_NAMES")
-    # All delegated roles names should start with "bins" if we are using
-    # hash bin delegation and none of the delegated roles should start with
-    # "bins" if we are using custom target delegation.
-    bins_used = True if delegated_roles[0].startswith("bins") else False
-    if bins_used:
+    if topology.bins_used:
         # This indicates succinct hash bins are used
         if len(roles) > 0 and any(not Roles.is_role(role) for role in roles):
             raise HTTPException(
@@ -211,7 +222,9 @@ def post_metadata_online(
                 },
             )
     else:
-        if Roles.BINS.value in roles:
+        if Roles.BINS.value in roles and not topology.is_online_role(
+            Roles.BINS.value
+        ):
             raise HTTPException(
                 status.HTTP_404_NOT_FOUND,
                 detail={
@@ -225,7 +238,7 @@ def post_metadata_online(
 
     # If no roles are provided, then bump all.
     if len(payload.roles) == 0:
-        payload.roles = Roles.online_roles_values()
+        payload.roles = topology.online_roles()
 
     task_id = get_task_id()
     repository_metadata.apply_async(
@@ -261,59 +274,141 @@ class SigningData(BaseModel):
 
 class MetadataSignGetResponse(BaseModel):
     model_config = ConfigDict(
-        json_schema_extra={
-            "example": {
-                "data": {
-                    "metadata": {
-                        "root": das_payload_example["metadata"]["root"]
-                    }
-                }
-            }
-        }
+        json_schema_extra=example_from_file(
+            "tests/data_examples/bootstrap/das-payload.json",
+            lambda das_payload: {
+                "data": {"metadata": {"root": das_payload["metadata"]["root"]}}
+            },
+        )
     )
     data: SigningData | None = None
     message: str
 
 
-def get_metadata_sign() -> MetadataSignGetResponse:
-    bs_state = bootstrap_state()
-    # Adds support only when bootstrap is signing state
-    if bs_state.bootstrap is False and bs_state.state != "signing":
-        raise HTTPException(
-            status.HTTP_404_NOT_FOUND,
-            detail={
-                "message": "No metadata pending signing available",
-                "error": (
-                    f"Requires bootstrap started. State: {bs_state.state}"
-                ),
-            },
-        )
+def invalidate_metadata_sign_cache():
+    _metadata_sign_cache.clear()
 
-    settings_repository.reload()
-    pending_signing = list(
-        filter(lambda var: "SIGNING" in var, dir(settings_repository))
+
+on_settings_change(invalidate_metadata_sign_cache)
+
+
+def pending_signing_settings() -> List[str]:
+    """
+    Names of the repository settings with metadata pending signing.
+
+    Only the settings names are read (``HKEYS``), not the values. The
+    ``<ROLE>_SIGNING`` settings are written by the RSTUF Workers, so there is
+    no index of them to read. The names are candidates: a setting could be no
+    longer pending (i.e. ``None``).
+    """
+    return sorted(
+        name
+        for name in (settings_redis_replicas or settings_redis).hkeys(
+            settings_holder()
+        )
+        if "SIGNING" in name
     )
 
-    md_response = {}
+
+def get_metadata_sign(request: Request) -> Response:
+    """
+    Get the metadata roles pending signing (``MetadataSignGetResponse``).
+
+    Only the pending signing settings (and the trusted metadata they require)
+    are read from Redis, in a single read. The response has an ETag and
+    supports conditional requests (``If-None-Match``). When
+    ``RSTUF_METADATA_SIGN_CACHE_TTL`` is enabled, the rendered response is
+    cached (compressed) by repository settings version. The RSTUF Workers
+    write the ``<ROLE>_SIGNING`` settings without increasing the version, so
+    the cache is invalidated by the settings listener (Redis keyspace
+    notifications of the settings hash), otherwise after the TTL. When
+    ``RSTUF_SHARED_SETTINGS_FILE`` is enabled, the shared settings snapshot
+    is used instead of Redis.
+    """
+    # Read before the pending signing metadata, so a change (cache cleared)
+    # while reading them is never cached
+    generation = _metadata_sign_cache.generation
+    shared_snapshot = shared_repository_settings()
+    # The version and the pending signing metadata are read from the same
+    # Redis server
+    with pinned_settings_reads():
+        version = None
+        if METADATA_SIGN_CACHE_TTL > 0:
+            # The version is read first, so a change while reading the
+            # pending signing metadata is never cached as the current version
+            version = (
+                settings_version()
+                if shared_snapshot is None
+                else shared_snapshot.version
+            )
+        content = _metadata_sign_cache.get(version)
+        if content is not None:
+            return content.response(request)
+
+        if shared_snapshot is None:
+            bs_state = bootstrap_state()
+        else:
+            bs_state = shared_snapshot.bootstrap_state()
+        # Adds support only when bootstrap is signing state
+        if bs_state.bootstrap is False and bs_state.state != "signing":
+            raise HTTPException(
+                status.HTTP_404_NOT_FOUND,
+                detail={
+                    "message": "No metadata pending signing available",
+                    "error": (
+                        f"Requires bootstrap started. State: {bs_state.state}"
+                    ),
+                },
+            )
+
+        if shared_snapshot is not None:
+            pending_signing = sorted(
+                name for name in shared_snapshot.data if "SIGNING" in name
+            )
+            values = shared_snapshot.data
+        else:
+            pending_signing = pending_signing_settings()
+            values = {}
+
+        md_response = {}
+        if len(pending_signing) > 0 and shared_snapshot is None:
+            # Root is the only pending role that isn't a targets (or
+            # delegated targets) role. The trusted metadata are read only
+            # when required.
+            trusted = []
+            if "ROOT_SIGNING" in pending_signing:
+                trusted.append("TRUSTED_ROOT")
+            if any(name != "ROOT_SIGNING" for name in pending_signing):
+                trusted.append("TRUSTED_TARGETS")
+
+            values = {
+                name: parse_setting(value)
+                for name, value in zip(
+                    pending_signing + trusted,
+                    (settings_redis_replicas or settings_redis).hmget(
+                        settings_holder(), pending_signing + trusted
+                    ),
+                )
+            }
+
     for role_setting in pending_signing:
-        signing_role_obj = settings_repository.get(role_setting)
-        if signing_role_obj is not None:
-            signing_role_dict = signing_role_obj.to_dict()
+        signing_role_dict = values.get(role_setting)
+        if signing_role_dict is not None:
             role = role_setting.split("_")[0].lower()
             md_response[role] = signing_role_dict
 
     if len(md_response) > 0:
         # Add trusted_root and trusted_targets only when they are pending.
-        trusted_root = settings_repository.get("TRUSTED_ROOT")
-        trusted_targets = settings_repository.get("TRUSTED_TARGETS")
+        trusted_root = values.get("TRUSTED_ROOT")
         if trusted_root and "root" in md_response:
-            md_response["trusted_root"] = trusted_root.to_dict()
+            md_response["trusted_root"] = trusted_root
 
-        if any(
+        trusted_targets = values.get("TRUSTED_TARGETS")
+        if trusted_targets and any(
             role["signed"]["_type"] == "targets"
             for role in md_response.values()
         ):
-            md_response["trusted_targets"] = trusted_targets.to_dict()
+            md_response["trusted_targets"] = trusted_targets
 
         data = {"metadata": md_response}
         msg = "Metadata role(s) pending signing"
@@ -321,7 +416,18 @@ def get_metadata_sign() -> MetadataSignGetResponse:
         data = None
         msg = "No metadata pending signing available"
 
-    return MetadataSignGetResponse(data=data, message=msg)
+    response = MetadataSignGetResponse(data=data, message=msg)
+    # Only a cached response is compressed
+    content = PrecompressedContent(
+        response.model_dump_json(by_alias=True, exclude_none=True).encode(),
+        "application/json",
+        precompress=version is not None,
+    )
+    _metadata_sign_cache.set(
+        version, content, METADATA_SIGN_CACHE_TTL, generation
+    )
+
+    return content.response(request)
 
 
 class MetadataSignPostResponse(BaseModel):
@@ -369,10 +475,10 @@ class MetadataSignPostPayload(BaseModel):
     signature: TUFSignatures
 
 
-def post_metadata_sign(
+async def post_metadata_sign(
     payload: MetadataSignPostPayload,
 ) -> MetadataSignPostResponse:
-    bs_state = bootstrap_state()
+    bs_state = await bootstrap_state_async()
     if bs_state.bootstrap is False and bs_state.state != "signing":
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
@@ -387,7 +493,8 @@ def post_metadata_sign(
 
     task_id = get_task_id()
 
-    repository_metadata.apply_async(
+    await publish_task(
+        repository_metadata,
         kwargs={
             "action": "sign_metadata",
             "payload": payload.model_dump(by_alias=True, exclude_none=True),
@@ -430,8 +537,7 @@ class MetadataSignDeleteResponse(BaseModel):
 
 def delete_metadata_sign(payload: MetadataSignDeletePayload):
     role = payload.role
-    settings_repository.reload()
-    signing_status = settings_repository.get_fresh(f"{role.upper()}_SIGNING")
+    signing_status = repository_settings().get(f"{role.upper()}_SIGNING")
     if signing_status is None:
         raise HTTPException(
             status.HTTP_404_NOT_FOUND,
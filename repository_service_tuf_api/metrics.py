@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from celery.signals import after_task_publish, before_task_publish
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+REQUEST_DURATION = Histogram(
+    "rstuf_api_request_duration_seconds",
+    "Time handling the requests, by method and route.",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "rstuf_api_requests",
+    "Requests handled, by method, route and HTTP status.",
+    ["method", "route", "status"],
+)
+BOOTSTRAP_STATE_DURATION = Histogram(
+    "rstuf_api_bootstrap_state_duration_seconds",
+    "Time getting the bootstrap state.",
+)
+SETTINGS_RELOAD_DURATION = Histogram(
+    "rstuf_api_settings_reload_duration_seconds",
+    "Time reloading the repository settings from Redis.",
+)
+TASK_PUBLISH_DURATION = Histogram(
+    "rstuf_api_task_publish_duration_seconds",
+    "Time publishing a task to the broker.",
+)
+TASKS_PUBLISHED = Counter(
+    "rstuf_api_tasks_published",
+    "Tasks published to the broker, by task name.",
+    ["task"],
+)
+TASK_RESULT_LOOKUP_DURATION = Histogram(
+    "rstuf_api_task_result_lookup_duration_seconds",
+    "Time reading task results from the Result Backend.",
+)
+BROKER_POOL_WAIT_DURATION = Histogram(
+    "rstuf_api_broker_pool_wait_seconds",
+    "Time waiting for a producer from the broker producer pool.",
+)
+BROKER_POOL_TIMEOUTS = Counter(
+    "rstuf_api_broker_pool_timeouts",
+    "Timeouts waiting for a producer from the broker producer pool.",
+)
+REDIS_REPLICA_ERRORS = Counter(
+    "rstuf_api_redis_replica_errors",
+    "Reads from a Redis read replica failed (read from the primary).",
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def timed(histogram: Histogram):
+    """Decorator observing the duration of a function (sync or async)."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                with histogram.time():
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return histogram.time()(func)
+
+    return decorator
+
+
+# Publishing start time, by task id. Celery has no signal for a failed
+# publish, the oldest entries are dropped above `_PUBLISHING_MAX_SIZE`
+_PUBLISHING_MAX_SIZE = 1024
+_publishing: "OrderedDict[str, float]" = OrderedDict()
+_publishing_lock = threading.Lock()
+
+
+@before_task_publish.connect
+def _before_task_publish(headers=None, **kwargs):
+    with _publishing_lock:
+        _publishing[headers["id"]] = time.perf_counter()
+        while len(_publishing) > _PUBLISHING_MAX_SIZE:
+            _publishing.popitem(last=False)
+
+
+@after_task_publish.connect
+def _after_task_publish(headers=None, body=None, **kwargs):
+    with _publishing_lock:
+        started = _publishing.pop(headers["id"], None)
+    if started is not None:
+        TASK_PUBLISH_DURATION.observe(time.perf_counter() - started)
+
+    # Protocol 2 body: (args, kwargs, embed)
+    task_name = body[1].get("action", headers["task"])
+    TASKS_PUBLISHED.labels(task=task_name).inc()
+
+
+def _route_path(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # The Starlette routes (i.e. the OpenAPI document, the metrics) don't
+        # set the route in the scope
+        router = getattr(scope.get("app"), "router", None)
+        for candidate in getattr(router, "routes", []):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware measuring the requests by route and HTTP status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_path(scope)
+            method = scope["method"]
+            REQUEST_DURATION.labels(method=method, route=route).observe(
+                time.perf_counter() - started
+            )
+            REQUESTS.labels(
+                method=method, route=route, status=str(status_code)
+            ).inc()
+
+
+def _registry() -> CollectorRegistry:
+    # Running multiple processes (e.g. uvicorn/gunicorn workers) requires the
+    # `PROMETHEUS_MULTIPROC_DIR` environment variable with a directory shared
+    # by the workers. The metrics of all the workers are aggregated.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return registry
+
+    return REGISTRY
+
+
+async def metrics(request: Request) -> Response:
+    """Prometheus metrics endpoint."""
+    return Response(
+        generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,272 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from celery.backends.redis import RedisBackend
+from redis import StrictRedis
+from redis.asyncio import StrictRedis as AsyncStrictRedis
+from redis.asyncio.cluster import ClusterNode as AsyncClusterNode
+from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+from redis.asyncio.sentinel import Sentinel as AsyncSentinel
+from redis.cluster import ClusterNode, RedisCluster
+from redis.commands.core import Script
+from redis.exceptions import RedisClusterException, RedisError
+from redis.sentinel import Sentinel
+
+REDIS_MODES = ("standalone", "sentinel", "cluster")
+# Redis Cluster client errors aren't all ``RedisError`` (i.e. the cluster
+# can't be reached on initialization)
+REDIS_ERRORS = (RedisError, RedisClusterException)
+
+
+def parse_nodes(
+    value: Optional[str], default_port: int
+) -> List[Tuple[str, int]]:
+    """Redis nodes addresses (``host[:port]``), separated by comma."""
+    if not value:
+        return []
+
+    nodes = []
+    for address in value.split(","):
+        address = address.strip().removeprefix("redis://")
+        if not address:
+            continue
+        host, _, port = address.partition(":")
+        nodes.append((host, int(port) if port else default_port))
+
+    return nodes
+
+
+def hash_tag(key: str, tag: str) -> str:
+    """
+    Key with a Redis Cluster hash tag. Only the tag is hashed to choose the
+    key slot, so the keys with the same tag (or the key named as the tag) are
+    in the same slot.
+    """
+    return f"{key}{{{tag}}}"
+
+
+class ClusterRedis(RedisCluster):
+    """
+    Redis Cluster client with ``MGET`` of keys in different slots, as one
+    ``MGET`` by slot (not atomic).
+    """
+
+    def mget(self, keys, *args):
+        return self.mget_nonatomic(keys, *args)
+
+
+class AsyncClusterRedis(AsyncRedisCluster):
+    """Async ``ClusterRedis``, with Pub/Sub."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pubsub_clients: Dict[Tuple[str, int], AsyncStrictRedis] = {}
+
+    async def mget(self, keys, *args):
+        return await self.mget_nonatomic(keys, *args)
+
+    def pubsub(self, **kwargs):
+        """
+        Pub/Sub of a cluster node. The messages published in a Redis Cluster
+        are propagated to all the nodes, so any node receives them.
+        """
+        node = self.get_default_node()
+        if node is None:
+            node = next(iter(self.nodes_manager.startup_nodes.values()))
+        address = (node.host, int(node.port))
+        if address not in self._pubsub_clients:
+            self._pubsub_clients[address] = AsyncStrictRedis(
+                host=node.host, port=node.port
+            )
+
+        return self._pubsub_clients[address].pubsub(**kwargs)
+
+    def reset_connections(self):
+        """Drop the connections without closing them (i.e. after fork)."""
+        nodes = {
+            **self.nodes_manager.startup_nodes,
+            **self.nodes_manager.nodes_cache,
+        }
+        for node in nodes.values():
+            node._connections.clear()
+            node._free.clear()
+        for client in self._pubsub_clients.values():
+            client.connection_pool.reset()
+
+
+class LazyClient:
+    """
+    Redis client created on first use, as the Redis Cluster client connects
+    to the cluster on creation.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._client = None
+        self._lock = Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+
+        return self._client
+
+    def register_script(self, script: str) -> Script:
+        # The script is encoded here, as the encoding would use the client
+        return Script(self, script.encode())
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+
+class RedisClusterBackend(RedisBackend):
+    """
+    Celery Redis Result Backend for Redis Cluster.
+
+    The cluster is discovered from the result backend transport option
+    ``startup_nodes`` (list of ``(host, port)``), or from the result backend
+    URL host.
+    """
+
+    def _create_client(self, **params):
+        nodes = self._transport_options.get("startup_nodes") or [
+            (params["host"], params["port"])
+        ]
+        return ClusterRedis(
+            startup_nodes=[ClusterNode(host, port) for host, port in nodes],
+            password=params.get("password"),
+            socket_timeout=params.get("socket_timeout"),
+            socket_connect_timeout=params.get("socket_connect_timeout"),
+        )
+
+
+class RedisConnections:
+    """
+    Redis clients for the Redis deployment mode.
+
+    - ``standalone``: a single Redis server (``host``, ``port``).
+    - ``sentinel``: the primary of the ``sentinel_master`` service, discovered
+      by the ``sentinels`` and rediscovered on failover.
+    - ``cluster``: a Redis Cluster, discovered by the ``cluster_nodes`` (by
+      default, ``host`` and ``port``). The cluster has only the DB 0, so all
+      the DBs use it. The multi-key commands require the keys in the same
+      slot (see ``hash_tagged``), except ``MGET`` (one ``MGET`` by slot).
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        host: str,
+        port: int,
+        sentinels: Sequence[Tuple[str, int]] = (),
+        sentinel_master: str = "mymaster",
+        cluster_nodes: Sequence[Tuple[str, int]] = (),
+    ):
+        if mode not in REDIS_MODES:
+            raise ValueError(
+                f"Invalid Redis mode '{mode}', use one of {REDIS_MODES}"
+            )
+        if mode == "sentinel" and len(sentinels) == 0:
+            raise ValueError("Redis Sentinel mode requires the sentinels")
+
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.sentinels = list(sentinels)
+        self.sentinel_master = sentinel_master
+        self.cluster_nodes = list(cluster_nodes) or [(host, port)]
+
+    @property
+    def cluster(self) -> bool:
+        return self.mode == "cluster"
+
+    def client(self, db: int, **kwargs) -> Any:
+        """Redis client for the DB ``db``."""
+        if self.mode == "sentinel":
+            return Sentinel(self.sentinels).master_for(
+                self.sentinel_master, db=db, **kwargs
+            )
+        elif self.cluster:
+            startup_nodes = [
+                ClusterNode(host, port) for host, port in self.cluster_nodes
+            ]
+            return LazyClient(
+                lambda: ClusterRedis(startup_nodes=startup_nodes, **kwargs)
+            )
+
+        return StrictRedis(host=self.host, port=self.port, db=db, **kwargs)
+
+    def async_client(self, db: int, **kwargs) -> Any:
+        """Async Redis client for the DB ``db``."""
+        if self.mode == "sentinel":
+            return AsyncSentinel(self.sentinels).master_for(
+                self.sentinel_master, db=db, **kwargs
+            )
+        elif self.cluster:
+            return AsyncClusterRedis(
+                startup_nodes=[
+                    AsyncClusterNode(host, port)
+                    for host, port in self.cluster_nodes
+                ],
+                **kwargs,
+            )
+
+        return AsyncStrictRedis(
+            host=self.host, port=self.port, db=db, **kwargs
+        )
+
+    def keyspace_channel(self, db: int, key: str) -> str:
+        """Channel of the keyspace notifications of the key."""
+        return f"__keyspace@{0 if self.cluster else db}__:{key}"
+
+    def keyspace_pubsub(self, db: int, key: str, **kwargs):
+        """
+        Pub/Sub for the keyspace notifications of the key. In a Redis
+        Cluster, the notifications are only published by the node of the key
+        slot, so it is connected to it.
+        """
+        client = self.client(db, **kwargs)
+        if self.cluster:
+            return client.pubsub(
+                node=client.get_node_from_key(key),
+                ignore_subscribe_messages=True,
+            )
+
+        return client.pubsub(ignore_subscribe_messages=True)
+
+    def hash_tagged(self, key: str, tag: str) -> str:
+        """
+        The key hash tagged (see ``hash_tag``) in Redis Cluster mode,
+        otherwise the key.
+        """
+        return hash_tag(key, tag) if self.cluster else key
+
+    def result_backend(self, db: int) -> Tuple[str, Dict[str, Any]]:
+        """Celery Result Backend URL and transport options."""
+        if self.mode == "sentinel":
+            url = ";".join(
+                f"sentinel://{host}:{port}/{db}"
+                for host, port in self.sentinels
+            )
+            return url, {"master_name": self.sentinel_master}
+        elif self.cluster:
+            host, port = self.cluster_nodes[0]
+            url = f"{__name__}:RedisClusterBackend+redis://{host}:{port}/0"
+            return url, {"startup_nodes": self.cluster_nodes}
+
+        return f"redis://{self.host}:{self.port}/{db}", {}
+
+
+def reset_async_client(client: Any):
+    """Drop the async client connections without closing them."""
+    if isinstance(client, AsyncClusterRedis):
+        client.reset_connections()
+    else:
+        client.connection_pool.reset()
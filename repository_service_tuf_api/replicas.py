@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock, Thread
+from typing import Any, Deque, Iterator, List, Optional, Sequence, Tuple
+
+from redis import StrictRedis
+from redis.exceptions import RedisError
+
+from repository_service_tuf_api.metrics import REDIS_REPLICA_ERRORS
+
+
+def parse_replica_urls(value: Optional[str]) -> List[str]:
+    """Read replicas URLs, separated by comma."""
+    if not value:
+        return []
+
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+class ReplicasState:
+    """
+    Replication state of the Redis read replicas.
+
+    A replica is in sync if its replication link with the primary is up and
+    its replication offset reached the primary offset of ``max_staleness``
+    seconds ago, so the data read from it is at most ``max_staleness`` (plus
+    the check interval) seconds old. The state is updated by ``check``,
+    called periodically by the replicas monitor (``monitor``).
+    """
+
+    def __init__(self, replicas: Sequence[StrictRedis], max_staleness: float):
+        self.replicas = list(replicas)
+        self.max_staleness = max_staleness
+        self._in_sync: Tuple[int, ...] = ()
+        self._counter = itertools.count()
+        self._lock = Lock()
+        # Primary replication offsets (monotonic time, offset)
+        self._primary_offsets: Deque[Tuple[float, int]] = deque()
+
+    def _required_offset(self, now: float) -> int:
+        # The latest primary offset older than the staleness bound. Without
+        # it (i.e. first checks), the oldest offset (stricter) is required.
+        while (
+            len(self._primary_offsets) > 1
+            and self._primary_offsets[1][0] <= now - self.max_staleness
+        ):
+            self._primary_offsets.popleft()
+
+        return self._primary_offsets[0][1]
+
+    def check(self, primary: StrictRedis):
+        """Check the replication state of the replicas."""
+        now = time.monotonic()
+        try:
+            primary_offset = int(
+                primary.info("replication").get("master_repl_offset", 0)
+            )
+        except RedisError as err:
+            logging.warning(f"Redis primary replication check failed: {err}")
+            self._in_sync = ()
+            return
+
+        self._primary_offsets.append((now, primary_offset))
+        required_offset = self._required_offset(now)
+        in_sync = []
+        for index, replica in enumerate(self.replicas):
+            try:
+                info = replica.info("replication")
+            except RedisError as err:
+                logging.warning(f"Redis replica check failed: {err}")
+                continue
+
+            if (
+                info.get("master_link_status") == "up"
+                and int(info.get("slave_repl_offset", -1)) >= required_offset
+            ):
+                in_sync.append(index)
+
+        self._in_sync = tuple(in_sync)
+
+    def monitor(self, primary: StrictRedis, interval: float):
+        """Check the replication state every ``interval`` seconds."""
+        while True:
+            self.check(primary)
+            time.sleep(interval)
+
+    def start_monitor(self, primary: StrictRedis, interval: float):
+        """Start the replicas monitor (``monitor``) as a daemon thread."""
+        Thread(
+            None,
+            self.monitor,
+            args=(primary, interval),
+            name="replicas-monitor",
+            daemon=True,
+        ).start()
+
+    def pick(self) -> Optional[int]:
+        """A replica in sync (round-robin), or ``None`` if none is."""
+        in_sync = self._in_sync
+        if len(in_sync) == 0:
+            return None
+
+        with self._lock:
+            return in_sync[next(self._counter) % len(in_sync)]
+
+    def mark_out_of_sync(self, index: int):
+        """Stop using the replica until the next check (i.e. on errors)."""
+        REDIS_REPLICA_ERRORS.inc()
+        self._in_sync = tuple(i for i in self._in_sync if i != index)
+
+
+# Pinned "replica" index of the primary (see ``ReadReplicas.pinned``)
+PRIMARY = -1
+
+
+class ReadReplicas:
+    """
+    Redis client for read-only commands.
+
+    The commands are sent to a replica in sync (see ``ReplicasState``), or
+    to the primary if no replica is in sync or the replica fails. The
+    commands of a ``pinned`` context are sent to the same replica.
+    """
+
+    def __init__(
+        self,
+        primary: Any,
+        replicas: Sequence[Any],
+        state: ReplicasState,
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.state = state
+        # Replica index of the current ``pinned`` context, if any
+        self._pinned: ContextVar[Optional[int]] = ContextVar(
+            f"replicas-pinned-{id(self)}", default=None
+        )
+
+    @contextmanager
+    def pinned(self) -> Iterator[None]:
+        """
+        Send all the commands of the context to the same replica (or the
+        primary), so several reads (i.e. a version and the data of that
+        version) aren't mixed from replicas at different replication
+        offsets. A nested context uses the replica of the outer context.
+        """
+        if self._pinned.get() is not None:
+            yield
+            return
+
+        index = self.state.pick()
+        token = self._pinned.set(PRIMARY if index is None else index)
+        try:
+            yield
+        finally:
+            self._pinned.reset(token)
+
+    def _pick(self) -> Optional[int]:
+        pinned = self._pinned.get()
+        if pinned is None:
+            return self.state.pick()
+
+        return None if pinned == PRIMARY else pinned
+
+    def _replica_failed(self, index: int, err: Exception):
+        logging.warning(f"Redis replica read failed: {err}")
+        self.state.mark_out_of_sync(index)
+        if self._pinned.get() is not None:
+            # The next reads of the context are from the primary, which has
+            # the same or newer data
+            self._pinned.set(PRIMARY)
+
+    def __getattr__(self, name: str):
+        def command(*args, **kwargs):
+            index = self._pick()
+            if index is not None:
+                try:
+                    return getattr(self.replicas[index], name)(*args, **kwargs)
+                except RedisError as err:
+                    self._replica_failed(index, err)
+
+            return getattr(self.primary, name)(*args, **kwargs)
+
+        return command
+
+
+class AsyncReadReplicas(ReadReplicas):
+    """``ReadReplicas`` for the async Redis clients."""
+
+    def __getattr__(self, name: str):
+        async def command(*args, **kwargs):
+            index = self._pick()
+            if index is not None:
+                try:
+                    return await getattr(self.replicas[index], name)(
+                        *args, **kwargs
+                    )
+                except RedisError as err:
+                    self._replica_failed(index, err)
+
+            return await getattr(self.primary, name)(*args, **kwargs)
+
+        return command
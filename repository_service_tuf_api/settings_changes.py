@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import logging
+import time
+from threading import Thread
+from typing import Callable, List
+
+from repository_service_tuf_api.redis_modes import (
+    REDIS_ERRORS,
+    RedisConnections,
+)
+
+# Callbacks called when the repository settings change in Redis
+_settings_change_callbacks: List[Callable[[], None]] = []
+
+
+def on_settings_change(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Register a callback to be called when the repository settings change.
+
+    The callbacks are called by the settings listener (see
+    ``start_settings_listener``) and when this API writes the settings.
+    """
+    _settings_change_callbacks.append(callback)
+    return callback
+
+
+def notify_settings_change():
+    """Call all the registered repository settings change callbacks."""
+    for callback in _settings_change_callbacks:
+        try:
+            callback()
+        except Exception as err:
+            logging.error(f"Settings change callback failed: {err}")
+
+
+def settings_listener(
+    redis_connections: RedisConnections,
+    db: int,
+    holder: str,
+    retry_interval: float = 5,
+):
+    """
+    Listen the Redis keyspace notifications for the repository settings
+    (``holder`` key of the ``db``).
+
+    It requires the Redis server configured with keyspace notifications for
+    hash commands (``notify-keyspace-events Kh`` or wider). Without it, the
+    caches rely only on their TTL.
+    """
+    channel = redis_connections.keyspace_channel(db, holder)
+    while True:
+        try:
+            pubsub = redis_connections.keyspace_pubsub(
+                db, holder, decode_responses=True
+            )
+            pubsub.subscribe(channel)
+            # Any change could be missed while (re)connecting
+            notify_settings_change()
+            for message in pubsub.listen():
+                if message["type"] == "message":
+                    notify_settings_change()
+        except REDIS_ERRORS as err:
+            logging.warning(f"Settings listener disconnected: {err}")
+            notify_settings_change()
+            time.sleep(retry_interval)
+
+
+def start_settings_listener(
+    redis_connections: RedisConnections, db: int, holder: str
+):
+    """Start the repository settings listener as a daemon thread."""
+    Thread(
+        None,
+        settings_listener,
+        args=(redis_connections, db, holder),
+        name="settings-listener",
+        daemon=True,
+    ).start()
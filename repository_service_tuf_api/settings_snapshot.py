@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2023 Repository Service for TUF Contributors
+# SPDX-FileCopyrightText: 2022-2023 VMware Inc
+#
+# SPDX-License-Identifier: MIT
+
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, Mapping, Optional
+
+from dynaconf.utils.parse_conf import parse_conf_data
+
+from repository_service_tuf_api.topology import (
+    TOPOLOGY_SETTINGS,
+    RepositoryTopology,
+    parse_topology,
+)
+
+
+@dataclass
+class BootstrapState:
+    bootstrap: bool
+    state: Optional[str] = None
+    task_id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RepositorySettings:
+    """
+    Immutable snapshot of the repository settings (see
+    ``repository_settings``).
+
+    The values are copied on read, so a request can't change the snapshot
+    shared with other requests.
+    """
+
+    data: Mapping[str, Any]
+    version: Optional[str] = None
+    expires: float = 0.0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return deepcopy(self.data.get(key.upper(), default))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return deepcopy(dict(self.data))
+
+    def bootstrap_state(self) -> BootstrapState:
+        return parse_bootstrap_state(self.data.get("BOOTSTRAP"))
+
+    @cached_property
+    def topology(self) -> RepositoryTopology:
+        return parse_topology(
+            *(self.data.get(name) for name in TOPOLOGY_SETTINGS)
+        )
+
+
+def parse_setting(value: Optional[str]) -> Any:
+    """Parse a repository setting value as stored by Dynaconf in Redis."""
+    if value is None:
+        return None
+
+    parsed_value = parse_conf_data(value, tomlfy=True)
+    if hasattr(parsed_value, "to_dict"):
+        return parsed_value.to_dict()
+    if hasattr(parsed_value, "to_list"):
+        return parsed_value.to_list()
+
+    return parsed_value
+
+
+def parse_bootstrap_state(bootstrap: Optional[str]) -> BootstrapState:
+    """Bootstrap state of the (parsed) ``BOOTSTRAP`` setting value."""
+    bootstrap_state = BootstrapState(bootstrap=False, state=None, task_id=None)
+    if bootstrap is None:
+        return bootstrap_state
+
+    if len(bootstrap.split("-")) == 1:
+        # This is a finished bootstrap. It only contains the `<task-id>``
+        bootstrap_state.bootstrap = True
+        bootstrap_state.state = "finished"
+        bootstrap_state.task_id = bootstrap
+
+        return bootstrap_state
+
+    elif len(bootstrap.split("-")) == 2:
+        # This is considered an intermediated state. It is not finished because
+        # there is a `<state>-` like 'pre-<task_id>' or 'signing-<task_id>'.
+        bootstrap_state.bootstrap = False
+        bootstrap_state.state = bootstrap.split("-")[0]
+        bootstrap_state.task_id = bootstrap.split("-")[1]
+
+        return bootstrap_state
@@ -0,0 +1,272 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from threading import Lock, Thread
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+# File header: magic, sequence, payload length and heartbeat (``time.time()``
+# of the last refresher check). The payload follows the header.
+HEADER = struct.Struct("<8sQQd")
+MAGIC = b"RSTUFSS1"
+_SEQUENCE_OFFSET = 8
+_HEARTBEAT_OFFSET = 24
+_READ_RETRIES = 8
+
+
+class SharedSettingsFile:
+    """
+    Repository settings snapshot shared by the API processes in a memory
+    mapped file (i.e. in ``/dev/shm``).
+
+    The snapshot is written by a single refresher (see ``acquire_refresher``)
+    and read lock-free by all the processes. The writes are protected by a
+    sequence lock: the sequence is odd while the payload is written, and a
+    read is valid only if the sequence is even and unchanged after reading
+    the payload.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(size, HEADER.size)
+        self._pid: Optional[int] = None
+        self._fd: Optional[int] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._refresher_pid: Optional[int] = None
+        self._write_lock = Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum payload size in bytes."""
+        return self.size - HEADER.size
+
+    def _mapped(self) -> mmap.mmap:
+        # The file is (re)opened by process, so the file lock (``flock``) of
+        # the writes isn't shared with the parent process after fork
+        if self._pid != os.getpid():
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(fd).st_size < self.size:
+                os.ftruncate(fd, self.size)
+            self._mmap = mmap.mmap(fd, self.size)
+            self._fd = fd
+            self._pid = os.getpid()
+
+        return self._mmap
+
+    def header(self) -> Optional[Tuple[int, float]]:
+        """
+        The snapshot sequence and heartbeat (``None`` if never written).
+        """
+        magic, sequence, _, heartbeat = HEADER.unpack_from(self._mapped())
+        if magic != MAGIC:
+            return None
+
+        return sequence, heartbeat
+
+    def read(self) -> Optional[Tuple[int, Optional[bytes]]]:
+        """
+        Read the snapshot.
+
+        Returns:
+            The snapshot sequence and payload (``None`` if invalidated), or
+            ``None`` if never written or being written.
+        """
+        mapped = self._mapped()
+        for _ in range(_READ_RETRIES):
+            magic, sequence, length, _ = HEADER.unpack_from(mapped)
+            if magic != MAGIC:
+                return None
+            if sequence % 2 == 1 or length > self.capacity:
+                time.sleep(0)
+                continue
+
+            # Sliced (not ``seek``/``read``), as the mapping is shared by
+            # the threads of the process
+            start, end = HEADER.size, HEADER.size + length
+            payload = mapped[start:end]
+            if HEADER.unpack_from(mapped)[1] == sequence:
+                return sequence, payload or None
+
+        return None
+
+    def _write(self, payload: bytes, expected: Optional[int]) -> Optional[int]:
+        mapped = self._mapped()
+        with self._write_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                magic, sequence, _, _ = HEADER.unpack_from(mapped)
+                if magic != MAGIC:
+                    sequence = 0
+                elif expected is not None and sequence != expected:
+                    return None
+
+                struct.pack_into("<Q", mapped, _SEQUENCE_OFFSET, sequence + 1)
+                start, end = HEADER.size, HEADER.size + len(payload)
+                mapped[start:end] = payload
+                HEADER.pack_into(
+                    mapped, 0, MAGIC, sequence + 2, len(payload), time.time()
+                )
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        return sequence + 2
+
+    def publish(
+        self, payload: bytes, expected: Optional[int]
+    ) -> Optional[int]:
+        """
+        Publish a snapshot if the current sequence is the expected one
+        (``None`` publishes unconditionally).
+
+        Returns:
+            The new sequence, or ``None`` if not published.
+
+        Raises:
+            ValueError if the payload is larger than the file capacity.
+        """
+        if len(payload) > self.capacity:
+            raise ValueError(
+                f"Settings snapshot ({len(payload)} bytes) is larger than the "
+                f"shared settings file capacity ({self.capacity} bytes)"
+            )
+
+        return self._write(payload, expected)
+
+    def invalidate(self):
+        """
+        Invalidate the snapshot, so the processes read the settings from
+        Redis until the next snapshot is published.
+        """
+        self._write(b"", None)
+
+    def heartbeat(self):
+        """Record that the refresher checked the snapshot is current."""
+        struct.pack_into("<d", self._mapped(), _HEARTBEAT_OFFSET, time.time())
+
+    def acquire_refresher(self) -> bool:
+        """
+        Acquire (without waiting) the refresher lock of the file, held until
+        the process exits, so only one process refreshes the snapshot.
+        """
+        if self._refresher_pid == os.getpid():
+            return True
+
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+
+        # The lock is released when the file is closed (process exit)
+        self._refresher_pid = os.getpid()
+
+        return True
+
+
+class SharedSettingsRefresher:
+    """
+    Refresher of the repository settings snapshot published to a shared
+    settings file.
+
+    The settings version and the settings are read (``read_version`` and
+    ``read_settings``) in a ``pinned_reads`` context, so both are read from
+    the same Redis server (i.e. the same read replica).
+
+    Args:
+        shared_file: Shared settings file the snapshot is published to
+        read_version: Read the repository settings version
+        read_settings: Read all the repository settings (raw values)
+        pinned_reads: Context pinning the reads to a single Redis server
+        reload_interval: Time in seconds after which all the settings are
+            read even if the settings version didn't change
+        refresh_interval: Time in seconds between refreshes
+    """
+
+    def __init__(
+        self,
+        shared_file: SharedSettingsFile,
+        read_version: Callable[[], Optional[str]],
+        read_settings: Callable[[], Dict[str, str]],
+        pinned_reads: Callable[[], ContextManager],
+        reload_interval: float,
+        refresh_interval: float,
+    ):
+        self.shared_file = shared_file
+        self.read_version = read_version
+        self.read_settings = read_settings
+        self.pinned_reads = pinned_reads
+        self.reload_interval = reload_interval
+        self.refresh_interval = refresh_interval
+        # Snapshot sequence, settings version and read time
+        # (``time.monotonic()``) last published by this process
+        self.published: Dict[str, Any] = {
+            "sequence": None,
+            "version": None,
+            "loaded": 0.0,
+        }
+
+    def refresh(self):
+        """
+        Publish the repository settings snapshot to the shared settings file.
+
+        The settings are read only if the settings version changed since the
+        last published snapshot, the snapshot was invalidated or it is older
+        than the reload interval. Otherwise, only the snapshot heartbeat is
+        updated.
+        """
+        header = self.shared_file.header()
+        sequence = None if header is None else header[0]
+        with self.pinned_reads():
+            version = self.read_version()
+            loaded = time.monotonic()
+            if (
+                version is not None
+                and sequence is not None
+                and sequence == self.published["sequence"]
+                and version == self.published["version"]
+                and loaded - self.published["loaded"] < self.reload_interval
+            ):
+                self.shared_file.heartbeat()
+                return
+
+            values = self.read_settings()
+
+        payload = json.dumps({"version": version, "settings": values}).encode()
+        # Not published if invalidated meanwhile, as the settings could be read
+        # before the change. It is published in the next refresh.
+        published = self.shared_file.publish(payload, sequence)
+        if published is not None:
+            self.published["sequence"] = published
+            self.published["version"] = version
+            self.published["loaded"] = loaded
+
+    def run(self):
+        """
+        Refresh the snapshot, if this process holds the refresher lock. The
+        other processes retry acquiring it, taking over when the refresher
+        process exits.
+        """
+        while True:
+            try:
+                if self.shared_file.acquire_refresher():
+                    self.refresh()
+            except (RedisError, OSError, ValueError) as err:
+                logging.warning(f"Shared settings refresh failed: {err}")
+
+            time.sleep(self.refresh_interval)
+
+    def start(self):
+        """Start the refresher as a daemon thread."""
+        Thread(
+            None, self.run, name="shared-settings-refresher", daemon=True
+        ).start()
@@ -4,13 +4,27 @@
 # SPDX-License-Identifier: MIT
 
 import enum
+import json
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from celery import states
 from pydantic import BaseModel, ConfigDict, Field
 
-from repository_service_tuf_api import repository_metadata
+from repository_service_tuf_api import (
+    repository_metadata,
+    result_backend_async,
+    result_backend_replicas,
+    settings,
+)
+from repository_service_tuf_api.artifacts import (
+    COALESCED_TASK_KEY_PREFIX,
+    SHARDED_TASK_KEY_PREFIX,
+)
+from repository_service_tuf_api.metrics import TASK_RESULT_LOOKUP_DURATION
 
 
 class TaskState(str, enum.Enum):
@@ -41,8 +55,39 @@ class TaskName(str, enum.Enum):
     DELETE_SIGN_METADATA = "delete_sign_metadata"
 
 
+# Maximum number of task ids in a bulk request
+TASKS_BULK_MAX_IDS = int(settings.get("TASKS_BULK_MAX_IDS", 500))
+# Maximum time in seconds to wait for a task state change (long-poll)
+TASKS_MAX_WAIT = int(settings.get("TASKS_MAX_WAIT", 60))
+# Interval in seconds of the keep-alive comments in the task state stream
+TASKS_STREAM_KEEPALIVE = 15
+
+
 class GetParameters(BaseModel):
     task_id: str
+    wait: int | None = Field(
+        default=None,
+        ge=0,
+        le=TASKS_MAX_WAIT,
+        description=(
+            "Time in seconds to wait for a task state change if the task is "
+            "not finished (long-poll)."
+        ),
+    )
+
+
+class BulkPayload(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "task_ids": [
+                    "33e66671dcc84cdfa2535a1eb030104c",
+                    "06ee6db3cbab4b26be505352c2f2e2c3",
+                ]
+            }
+        }
+    )
+    task_ids: List[str] = Field(min_length=1, max_length=TASKS_BULK_MAX_IDS)
 
 
 class TaskResult(BaseModel):
@@ -120,30 +165,256 @@ class Response(BaseModel):
     message: str | None = None
 
 
-def get(task_id: str) -> Response:
+class BulkResponse(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "data": [
+                    Response.model_config["json_schema_extra"]["example"][
+                        "data"
+                    ],
+                    {
+                        "task_id": "06ee6db3cbab4b26be505352c2f2e2c3",
+                        "state": TaskState.PENDING,
+                    },
+                ],
+                "message": "Tasks state.",
+            }
+        }
+    )
+    data: List[TasksData]
+    message: str | None = None
+
+
+def _merge_task_metas(metas: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Get the task details from Result Backend Server.
+    Merge the metas of the sub-tasks of a sharded task (see
+    ``repository_service_tuf_api.artifacts.publish_artifacts_task``).
 
-    Uses the Celery implementation in
-    ``repository_service_tuf_api.metadata.metadata_repository.AsyncResult`` to
-    fetch from Result Backend the task state.
+    The task is finished when all the sub-tasks are finished. A finished task
+    is ``FAILURE`` or ``REVOKED`` if any sub-task is, and the result merges
+    the sub-tasks results (the details lists are concatenated). An unfinished
+    task has the sub-tasks state if they share it, otherwise it is
+    ``STARTED``.
+    """
+    if len(metas) == 1:
+        return metas[0]
 
-    Args:
-        task_id: Task ID
+    task_states = {meta["status"] for meta in metas}
+    if not task_states <= states.READY_STATES:
+        task_state = (
+            task_states.pop() if len(task_states) == 1 else states.STARTED
+        )
+        return {"status": task_state, "result": None}
+
+    for task_state in [states.FAILURE, states.REVOKED]:
+        if task_state in task_states:
+            exceptions = [
+                meta["result"]
+                for meta in metas
+                if isinstance(meta["result"], Exception)
+            ]
+            return {
+                "status": task_state,
+                "result": exceptions[0] if exceptions else None,
+            }
+
+    results = [meta["result"] or {} for meta in metas]
+    result: Dict[str, Any] = {
+        "task": results[0].get("task"),
+        "status": all(r.get("status", False) for r in results),
+    }
+    for key in ["message", "error"]:
+        values = list(dict.fromkeys(r[key] for r in results if r.get(key)))
+        if values:
+            result[key] = "; ".join(values)
+
+    last_updates = [r["last_update"] for r in results if r.get("last_update")]
+    if last_updates:
+        result["last_update"] = max(last_updates)
+
+    details: Dict[str, Any] = {}
+    for r in results:
+        for key, value in (r.get("details") or {}).items():
+            if isinstance(value, list):
+                details[key] = details.get(key, []) + value
+            else:
+                details.setdefault(key, value)
+    if details:
+        result["details"] = details
+
+    return {"status": states.SUCCESS, "result": result}
+
+
+async def _get_task_metas(
+    task_ids: List[str],
+    resolve_coalesced: bool = True,
+    resolve_sharded: bool = True,
+    read_replica: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Get the tasks meta (status and result) from the Result Backend Server.
+
+    All the tasks are read in a single ``MGET``. A task not found in the
+    Result Backend is ``PENDING``, as with Celery's ``AsyncResult``.
+
+    If a task id is unknown (``PENDING``), it can be a task id of a request
+    coalesced in another task (see
+    ``repository_service_tuf_api.artifacts.ArtifactsCoalescer``) or a task
+    split in sub-tasks by shard (see
+    ``repository_service_tuf_api.artifacts.publish_artifacts_task``). In that
+    case, the meta of the coalesced task or the merged meta of the sub-tasks
+    is used.
+
+    With ``read_replica``, the tasks are read from a Result Backend read
+    replica, if configured (``RSTUF_REDIS_REPLICA_SERVERS``).
+    """
+    backend = repository_metadata.backend
+    redis = (read_replica and result_backend_replicas) or result_backend_async
+    with TASK_RESULT_LOOKUP_DURATION.time():
+        raw_metas = await redis.mget(
+            [backend.get_key_for_task(task_id) for task_id in task_ids]
+        )
+    metas = [
+        (
+            backend.decode_result(raw_meta)
+            if raw_meta is not None
+            else {"status": states.PENDING, "result": None}
+        )
+        for raw_meta in raw_metas
+    ]
+
+    pending = [i for i, raw_meta in enumerate(raw_metas) if raw_meta is None]
+    pending_count = len(pending)
+    if pending_count == 0 or not (resolve_coalesced or resolve_sharded):
+        return metas
+
+    prefixes = []
+    if resolve_coalesced:
+        prefixes.append(COALESCED_TASK_KEY_PREFIX)
+    if resolve_sharded:
+        prefixes.append(SHARDED_TASK_KEY_PREFIX)
+    resolved = await redis.mget(
+        [f"{prefix}{task_ids[i]}" for prefix in prefixes for i in pending]
+    )
+
+    if resolve_coalesced:
+        coalesced = [
+            (i, coalesced_task_id.decode())
+            for i, coalesced_task_id in zip(pending, resolved)
+            if coalesced_task_id is not None
+        ]
+        if len(coalesced) > 0:
+            coalesced_metas = await _get_task_metas(
+                [coalesced_task_id for _, coalesced_task_id in coalesced],
+                resolve_coalesced=False,
+                resolve_sharded=resolve_sharded,
+                read_replica=read_replica,
+            )
+            for (i, _), meta in zip(coalesced, coalesced_metas):
+                metas[i] = meta
+
+    if resolve_sharded:
+        sharded = [
+            (i, json.loads(sub_task_ids))
+            for i, sub_task_ids in zip(pending, resolved[-pending_count:])
+            if sub_task_ids is not None
+        ]
+        if len(sharded) > 0:
+            sub_metas = await _get_task_metas(
+                [sub_id for _, sub_ids in sharded for sub_id in sub_ids],
+                resolve_coalesced=False,
+                resolve_sharded=False,
+                read_replica=read_replica,
+            )
+            sub_metas_iter = iter(sub_metas)
+            for i, sub_ids in sharded:
+                metas[i] = _merge_task_metas(
+                    [next(sub_metas_iter) for _ in sub_ids]
+                )
+
+    return metas
+
+
+async def _backend_task_ids(task_ids: List[str]) -> List[List[str]]:
+    """
+    Resolve the task ids to the tasks in the Result Backend: the submitted
+    task of coalesced requests, and the sub-tasks of sharded tasks.
+    """
+    coalesced_task_ids = await result_backend_async.mget(
+        [f"{COALESCED_TASK_KEY_PREFIX}{task_id}" for task_id in task_ids]
+    )
+    resolved_task_ids = [
+        coalesced_task_id.decode() if coalesced_task_id else task_id
+        for task_id, coalesced_task_id in zip(task_ids, coalesced_task_ids)
+    ]
+    sharded_task_ids = await result_backend_async.mget(
+        [
+            f"{SHARDED_TASK_KEY_PREFIX}{task_id}"
+            for task_id in resolved_task_ids
+        ]
+    )
+
+    return [
+        json.loads(sub_task_ids) if sub_task_ids else [task_id]
+        for task_id, sub_task_ids in zip(resolved_task_ids, sharded_task_ids)
+    ]
+
+
+@asynccontextmanager
+async def _subscribe(task_ids: List[str]):
+    """
+    Subscribe to the tasks meta changes.
+
+    The Celery Redis Result Backend publishes the task meta in the task key
+    channel every time the task meta is stored.
+    """
+    backend = repository_metadata.backend
+    pubsub = result_backend_async.pubsub(ignore_subscribe_messages=True)
+    await pubsub.subscribe(
+        *dict.fromkeys(
+            backend.get_key_for_task(task_id) for task_id in task_ids
+        )
+    )
+    try:
+        yield pubsub
+    finally:
+        await pubsub.aclose()
+
+
+async def _next_task_meta(
+    pubsub, timeout: float
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Wait for the next task meta published, up to timeout seconds.
 
     Returns:
-        ``Response`` as BaseModel from pydantic
+        Tuple with task id and task meta, or ``None`` if nothing was
+        published.
     """
-    task = repository_metadata.AsyncResult(task_id)
+    message = await pubsub.get_message(timeout=timeout)
+    if message is None or message["type"] != "message":
+        return None
+
+    backend = repository_metadata.backend
+    task_id = (
+        message["channel"]
+        .decode()
+        .removeprefix(backend.task_keyprefix.decode())
+    )
+
+    return task_id, backend.decode_result(message["data"])
 
-    task_state = task.state
-    task_result = task.result
+
+def _task_data(task_id: str, task_meta: Dict[str, Any]) -> TasksData:
+    task_state = task_meta["status"]
+    task_result = task_meta["result"]
 
     # Celery FAILURE task, we include the task result (exception) as an error
     # and default message as critical failure executing the task.
-    if isinstance(task.result, Exception):
+    if isinstance(task_result, Exception):
         task_result = {
-            "message": str(task.result),
+            "message": str(task_result),
         }
 
     # If the task state is SUCCESS and the task.result.status is False we
@@ -153,7 +424,154 @@ def get(task_id: str) -> Response:
     ):
         task_state = TaskState.ERRORED
 
-    return Response(
-        data=TasksData(task_id=task_id, state=task_state, result=task_result),
-        message="Task state.",
+    return TasksData(task_id=task_id, state=task_state, result=task_result)
+
+
+async def get(task_id: str, wait: Optional[int] = None) -> Response:
+    """
+    Get the task details from Result Backend Server.
+
+    Reads the task meta with the async Redis client and decodes it with the
+    Celery backend of
+    ``repository_service_tuf_api.metadata.metadata_repository``.
+
+    Without ``wait``, the task is read from a read replica (if configured).
+    The long-poll reads from the primary, where the tasks meta changes are
+    subscribed, so no change is missed.
+
+    Args:
+        task_id: Task ID
+        wait: Time in seconds to wait for a task state change, if the task is
+            not finished (long-poll).
+
+    Returns:
+        ``Response`` as BaseModel from pydantic
+    """
+    if not wait:
+        task_metas = await _get_task_metas([task_id], read_replica=True)
+
+        return Response(
+            data=_task_data(task_id, task_metas[0]), message="Task state."
+        )
+
+    backend_task_ids = (await _backend_task_ids([task_id]))[0]
+    async with _subscribe(backend_task_ids) as pubsub:
+        task_metas = await _get_task_metas(
+            backend_task_ids, resolve_coalesced=False, resolve_sharded=False
+        )
+        sub_metas = dict(zip(backend_task_ids, task_metas))
+        task_meta = _merge_task_metas(task_metas)
+        deadline = time.monotonic() + wait
+        while task_meta["status"] not in states.READY_STATES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            published = await _next_task_meta(pubsub, remaining)
+            if published is not None:
+                sub_metas[published[0]] = published[1]
+                merged_meta = _merge_task_metas(list(sub_metas.values()))
+                # a sharded task waits for a change of the merged state
+                if merged_meta != task_meta:
+                    task_meta = merged_meta
+                    break
+
+    return Response(data=_task_data(task_id, task_meta), message="Task state.")
+
+
+async def get_bulk(payload: BulkPayload) -> BulkResponse:
+    """
+    Get the details of multiple tasks from Result Backend Server.
+
+    Args:
+        payload: ``BulkPayload`` with the task ids
+
+    Returns:
+        ``BulkResponse`` as BaseModel from pydantic, with the tasks data in
+        the same order as the given task ids.
+    """
+    task_metas = await _get_task_metas(payload.task_ids, read_replica=True)
+
+    return BulkResponse(
+        data=[
+            _task_data(task_id, task_meta)
+            for task_id, task_meta in zip(payload.task_ids, task_metas)
+        ],
+        message="Tasks state.",
     )
+
+
+def _sse_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream(task_ids: List[str]) -> AsyncIterator[str]:
+    """
+    Stream the tasks state changes as Server-Sent Events.
+
+    It sends a ``state`` event with the current ``TasksData`` of every task
+    and a new ``state`` event on every task state change, driven by the
+    Result Backend pub/sub. The stream sends an ``end`` event and finishes
+    when all tasks are finished (``SUCCESS``, ``FAILURE`` or ``REVOKED``).
+
+    Args:
+        task_ids: Task IDs
+    """
+    tasks_backend_ids = dict(zip(task_ids, await _backend_task_ids(task_ids)))
+    requests_task_ids = defaultdict(list)
+    for task_id, backend_task_ids in tasks_backend_ids.items():
+        for backend_task_id in backend_task_ids:
+            requests_task_ids[backend_task_id].append(task_id)
+
+    async with _subscribe(list(requests_task_ids)) as pubsub:
+        sub_metas = dict(
+            zip(
+                requests_task_ids,
+                await _get_task_metas(
+                    list(requests_task_ids),
+                    resolve_coalesced=False,
+                    resolve_sharded=False,
+                ),
+            )
+        )
+        tasks_state = {}
+        for task_id, backend_task_ids in tasks_backend_ids.items():
+            task_data = _task_data(
+                task_id,
+                _merge_task_metas([sub_metas[i] for i in backend_task_ids]),
+            )
+            tasks_state[task_id] = task_data.state
+            yield _sse_event(
+                "state", task_data.model_dump_json(exclude_none=True)
+            )
+        pending = {
+            backend_task_id
+            for backend_task_id, task_meta in sub_metas.items()
+            if task_meta["status"] not in states.READY_STATES
+        }
+
+        while len(pending) > 0:
+            published = await _next_task_meta(pubsub, TASKS_STREAM_KEEPALIVE)
+            if published is None:
+                yield ": keep-alive\n\n"
+                continue
+
+            backend_task_id, task_meta = published
+            sub_metas[backend_task_id] = task_meta
+            for task_id in requests_task_ids[backend_task_id]:
+                task_data = _task_data(
+                    task_id,
+                    _merge_task_metas(
+                        [sub_metas[i] for i in tasks_backend_ids[task_id]]
+                    ),
+                )
+                if task_data.state != tasks_state[task_id]:
+                    tasks_state[task_id] = task_data.state
+                    yield _sse_event(
+                        "state", task_data.model_dump_json(exclude_none=True)
+                    )
+
+            if task_meta["status"] in states.READY_STATES:
+                pending.discard(backend_task_id)
+
+    yield _sse_event("end", "{}")
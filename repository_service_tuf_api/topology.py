@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+from dataclasses import dataclass, field
+from typing import FrozenSet, List, Optional, Tuple
+
+# Repository settings of the topology (see ``parse_topology``)
+TOPOLOGY_SETTINGS = ["TARGETS_ONLINE_KEY", "DELEGATED_ROLES_NAMES"]
+
+
+@dataclass(frozen=True)
+class RepositoryTopology:
+    """
+    Repository roles topology: the targets role online state and the
+    delegated roles names (hash bins or custom target delegation).
+    """
+
+    targets_online: bool
+    delegated_roles: Tuple[str, ...]
+    bins_used: bool = field(init=False)
+    # Online roles names (``online_roles``), for O(1) membership checks
+    online_roles_set: FrozenSet[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # All delegated roles names should start with "bins" if we are using
+        # hash bin delegation and none of the delegated roles should start
+        # with "bins" if we are using custom target delegation.
+        object.__setattr__(
+            self,
+            "bins_used",
+            len(self.delegated_roles) > 0
+            and self.delegated_roles[0].startswith("bins"),
+        )
+        object.__setattr__(
+            self, "online_roles_set", frozenset(self.online_roles())
+        )
+
+    def is_online_role(self, role: str) -> bool:
+        return role in self.online_roles_set
+
+    def online_roles(self) -> List[str]:
+        """Online roles names. Hash bins delegated roles are ``bins``."""
+        online_roles: List[str] = ["snapshot", "timestamp"]
+        if self.targets_online:
+            online_roles.append("targets")
+
+        if self.bins_used:
+            online_roles.append("bins")
+        else:
+            online_roles.extend(self.delegated_roles)
+
+        return online_roles
+
+
+def parse_topology(
+    targets_online: Optional[bool], delegated_roles: Optional[List[str]]
+) -> RepositoryTopology:
+    """
+    Repository topology of the (parsed) ``TOPOLOGY_SETTINGS`` values. The
+    targets role is online if not set.
+    """
+    return RepositoryTopology(
+        targets_online=True if targets_online is None else targets_online,
+        delegated_roles=tuple(delegated_roles or ()),
+    )
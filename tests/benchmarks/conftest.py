@@ -0,0 +1,55 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+import fakeredis
+import pytest
+
+from tests.benchmarks.fake_services import fake_services
+
+
+@pytest.fixture(scope="session")
+def fake_redis_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture(scope="session")
+def rstuf_app(fake_redis_server):
+    from app import rstuf_app
+
+    monkeypatch = pytest.MonkeyPatch()
+    fake_services(monkeypatch, fake_redis_server)
+
+    yield rstuf_app
+
+    monkeypatch.undo()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    from repository_service_tuf_api import __version__
+
+    results = {}
+
+    yield results
+
+    output = request.config.getoption("--benchmark-output")
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "machine": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "version": __version__.version,
+                "datetime": datetime.now(timezone.utc).isoformat(),
+                "benchmarks": results,
+            },
+            f,
+            indent=2,
+        )
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import json
+import os
+from functools import partial
+
+import fakeredis
+
+# The benchmarks use an in-memory Celery broker, and the Redis servers
+# (repository settings and Result Backend) are replaced by fakeredis.
+os.environ["RSTUF_BROKER_SERVER"] = "memory://"
+os.environ.setdefault("RSTUF_REDIS_SERVER", "redis://fakeredis")
+os.environ.setdefault("RSTUF_BOOTSTRAP_NODE", "true")
+
+BOOTSTRAP_TASK_ID = "82281613dba54b8ea88dc86211c77d0a"
+FINISHED_TASK_ID = "5f1a5ad9e2a34c2b8a1e7c1f2c8a4b3d"
+
+
+def fake_services(monkeypatch, fake_redis_server):
+    """
+    Replace the Redis clients by fakeredis clients of ``fake_redis_server``
+    and seed the repository settings of a finished bootstrap and a finished
+    task.
+    """
+    from celery.backends.redis import RedisBackend
+    from dynaconf.loaders import redis_loader
+
+    import repository_service_tuf_api
+
+    fake_redis = partial(fakeredis.FakeStrictRedis, server=fake_redis_server)
+    monkeypatch.setattr(redis_loader, "StrictRedis", fake_redis)
+    monkeypatch.setattr(
+        RedisBackend,
+        "_create_client",
+        lambda self, **params: fake_redis(db=params.get("db", 0)),
+    )
+    settings_repository = repository_service_tuf_api.settings_repository
+    settings_redis = fake_redis(**settings_repository.REDIS_FOR_DYNACONF)
+    for module in ["", ".metadata", ".bootstrap"]:
+        monkeypatch.setattr(
+            f"repository_service_tuf_api{module}.settings_redis",
+            settings_redis,
+        )
+    settings_redis_async = fakeredis.FakeAsyncRedis(
+        server=fake_redis_server, **settings_repository.REDIS_FOR_DYNACONF
+    )
+    for module in ["", ".hash_bins"]:
+        monkeypatch.setattr(
+            f"repository_service_tuf_api{module}.settings_redis_async",
+            settings_redis_async,
+        )
+    result_backend_async = fakeredis.FakeAsyncRedis(
+        server=fake_redis_server,
+        db=repository_service_tuf_api.settings.get(
+            "REDIS_SERVER_DB_RESULT", 0
+        ),
+    )
+    for module in ["", ".tasks", ".artifacts"]:
+        monkeypatch.setattr(
+            f"repository_service_tuf_api{module}.result_backend_async",
+            result_backend_async,
+        )
+
+    # Repository settings of a finished bootstrap
+    with open("tests/data_examples/config/settings.json") as f:
+        repository_settings = {k.upper(): v for k, v in json.load(f).items()}
+    with open("tests/data_examples/bootstrap/payload_bins.json") as f:
+        root = json.load(f)["metadata"]["root"]
+    repository_settings["BOOTSTRAP"] = BOOTSTRAP_TASK_ID
+    repository_settings["DELEGATED_ROLES_NAMES"] = [
+        f"bins-{i}"
+        for i in range(repository_settings["NUMBER_OF_DELEGATED_BINS"])
+    ]
+    repository_settings["ROOT_SIGNING"] = root
+    repository_settings["TRUSTED_ROOT"] = root
+    redis_loader.write(settings_repository, repository_settings)
+    repository_service_tuf_api.bump_settings_version()
+
+    # A finished task in the Result Backend
+    repository_service_tuf_api.repository_metadata.backend.store_result(
+        FINISHED_TASK_ID,
+        {"status": True, "task": "add_artifacts", "message": "Added"},
+        "SUCCESS",
+    )
@@ -0,0 +1,17 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+
+# App served by the multi-process benchmarks, with the fake services:
+# gunicorn -c gunicorn.conf.py tests.benchmarks.server:rstuf_app
+#
+# The fake services are created before the workers are forked (preload), so
+# each worker starts with a copy of the seeded fake Redis server.
+import fakeredis
+import pytest
+
+from tests.benchmarks.fake_services import fake_services
+
+from app import rstuf_app  # noqa: F401 isort:skip
+
+fake_services(pytest.MonkeyPatch(), fakeredis.FakeServer())
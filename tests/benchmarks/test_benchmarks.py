@@ -0,0 +1,352 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import httpx
+import pytest
+
+from tests.benchmarks.fake_services import FINISHED_TASK_ID
+
+
+def artifacts_payload(number_of_artifacts):
+    return {
+        "artifacts": [
+            {
+                "info": {
+                    "length": 11342,
+                    "hashes": {"blake2b-256": f"{i:064x}"},
+                    "custom": {"key": "value"},
+                },
+                "path": f"v{i}/file-{i}.tar.gz",
+            }
+            for i in range(number_of_artifacts)
+        ]
+    }
+
+
+async def _run(
+    transport, base_url, method, url, content, requests, concurrency
+):
+    latencies = []
+    status_codes = Counter()
+    headers = {"Content-Type": "application/json"} if content else {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=60
+    ) as client:
+
+        async def send():
+            started = time.perf_counter()
+            response = await client.request(
+                method, url, content=content, headers=headers
+            )
+            latencies.append(time.perf_counter() - started)
+            status_codes[response.status_code] += 1
+
+        # warm up
+        await send()
+        latencies.clear()
+        status_codes.clear()
+
+        pending = iter(range(requests))
+
+        async def worker():
+            for _ in pending:
+                await send()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, status_codes, elapsed
+
+
+@pytest.fixture()
+def benchmark(rstuf_app, benchmark_results, request):
+    """
+    Run a benchmark: send the requests to the app (in-process ASGI client)
+    and store the latency (p50/p99) and requests per second in the results.
+    """
+
+    def run(
+        name,
+        method,
+        url,
+        payload=None,
+        requests=None,
+        expected_status=200,
+        base_url=None,
+        concurrency=None,
+    ):
+        requests = requests or request.config.getoption("--benchmark-requests")
+        concurrency = concurrency or request.config.getoption(
+            "--benchmark-concurrency"
+        )
+        if base_url is None:
+            # In-process app
+            base_url = "http://rstuf"
+            transport = httpx.ASGITransport(
+                app=rstuf_app, raise_app_exceptions=False
+            )
+        else:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=concurrency)
+            )
+        # The payload is serialized once, not measured
+        content = json.dumps(payload).encode() if payload else None
+        latencies, status_codes, elapsed = asyncio.run(
+            _run(
+                transport,
+                base_url,
+                method,
+                url,
+                content,
+                requests,
+                concurrency,
+            )
+        )
+        percentiles = statistics.quantiles(
+            latencies, n=100, method="inclusive"
+        )
+        benchmark_results[name] = {
+            "method": method,
+            "url": url,
+            "requests": requests,
+            "concurrency": concurrency,
+            "p50_ms": round(percentiles[49] * 1000, 3),
+            "p99_ms": round(percentiles[98] * 1000, 3),
+            "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+            "rps": round(requests / elapsed, 2),
+            "status_codes": {str(k): v for k, v in status_codes.items()},
+        }
+
+        assert status_codes == {expected_status: requests}
+
+    return run
+
+
+@contextmanager
+def gunicorn_server(workers, metrics_dir):
+    """
+    Run the multi-process server (``gunicorn.conf.py``) with the fake
+    services (``tests.benchmarks.server``) in a free local port.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    env = {
+        **os.environ,
+        "RSTUF_API_WORKERS": str(workers),
+        "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "tests.benchmarks.server:rstuf_app",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                # all the workers are ready when the metrics are reported
+                # by all of them
+                httpx.get(f"{base_url}/metrics").raise_for_status()
+                if len(list(metrics_dir.glob("*.db"))) >= workers:
+                    break
+            except httpx.HTTPError:
+                pass
+            assert server.poll() is None, "gunicorn failed to start"
+            assert time.monotonic() < deadline, "gunicorn start timeout"
+            time.sleep(0.05)
+
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def import_time_summary(stderr, top=20):
+    """Summary of a ``python -X importtime`` report (times in ms)."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix(
+            "import time:"
+        ).split("|")
+        imports.append(
+            {
+                "module": module.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+
+    return {
+        "import_ms": next(
+            i["cumulative_ms"] for i in imports if i["module"] == "app"
+        ),
+        "slowest_imports": sorted(
+            imports, key=lambda i: i["self_ms"], reverse=True
+        )[:top],
+    }
+
+
+class TestStartupBenchmarks:
+    def test_import_app(self, benchmark_results):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        benchmark_results["import_app"] = import_time_summary(result.stderr)
+
+    def test_cold_start(self, benchmark_results, request, tmp_path):
+        # From the server start to the first request response
+        target = request.config.getoption("--benchmark-cold-start-target")
+        started = time.perf_counter()
+        with gunicorn_server(1, tmp_path) as base_url:
+            response = httpx.get(
+                f"{base_url}/api/v1/task/?task_id={FINISHED_TASK_ID}"
+            )
+            elapsed = time.perf_counter() - started
+
+        benchmark_results["cold_start"] = {
+            "seconds": round(elapsed, 3),
+            "target_seconds": target,
+        }
+        assert response.status_code == 200
+        assert elapsed < target
+
+
+class TestBenchmarks:
+    @pytest.mark.parametrize("number_of_artifacts", [1, 100, 10000])
+    def test_post_artifacts(self, benchmark, request, number_of_artifacts):
+        requests = request.config.getoption("--benchmark-requests")
+        benchmark(
+            f"post_artifacts_{number_of_artifacts}",
+            "POST",
+            "/api/v1/artifacts/",
+            payload=artifacts_payload(number_of_artifacts),
+            # large payloads are slow, keep the run time bounded
+            requests=max(10, requests * 100 // max(100, number_of_artifacts)),
+            expected_status=202,
+        )
+
+    def test_post_artifacts_stream(self, benchmark):
+        benchmark(
+            "post_artifacts_stream_10000",
+            "POST",
+            "/api/v1/artifacts/stream",
+            payload=artifacts_payload(10000)["artifacts"],
+            requests=10,
+            expected_status=202,
+        )
+
+    def test_post_artifacts_delete(self, benchmark):
+        benchmark(
+            "post_artifacts_delete_100",
+            "POST",
+            "/api/v1/artifacts/delete",
+            payload={
+                "artifacts": [f"v{i}/file-{i}.tar.gz" for i in range(100)]
+            },
+            expected_status=202,
+        )
+
+    def test_get_task(self, benchmark):
+        benchmark(
+            "get_task",
+            "GET",
+            f"/api/v1/task/?task_id={FINISHED_TASK_ID}",
+        )
+
+    def test_post_task_bulk(self, benchmark):
+        benchmark(
+            "post_task_bulk_100",
+            "POST",
+            "/api/v1/task/bulk",
+            payload={"task_ids": [FINISHED_TASK_ID] * 100},
+        )
+
+    def test_get_openapi(self, benchmark):
+        benchmark("get_openapi", "GET", "/openapi.json")
+
+    def test_get_config(self, benchmark):
+        benchmark("get_config", "GET", "/api/v1/config/")
+
+    def test_get_config_cached(self, benchmark, monkeypatch):
+        monkeypatch.setattr(
+            "repository_service_tuf_api.config.CONFIG_CACHE_TTL", 60
+        )
+        benchmark("get_config_cached", "GET", "/api/v1/config/")
+
+    def test_get_metadata_sign(self, benchmark):
+        benchmark("get_metadata_sign", "GET", "/api/v1/metadata/sign")
+
+    def test_get_metadata_sign_cached(self, benchmark, monkeypatch):
+        monkeypatch.setattr(
+            "repository_service_tuf_api.metadata.METADATA_SIGN_CACHE_TTL", 60
+        )
+        benchmark("get_metadata_sign_cached", "GET", "/api/v1/metadata/sign")
+
+    def test_post_metadata_online(self, benchmark):
+        benchmark(
+            "post_metadata_online",
+            "POST",
+            "/api/v1/metadata/online",
+            payload={"roles": ["snapshot", "timestamp"]},
+            expected_status=202,
+        )
+
+    @pytest.mark.parametrize("workers", [1, 2, 4])
+    def test_post_artifacts_workers(
+        self, benchmark, benchmark_results, request, tmp_path, workers
+    ):
+        # Throughput of the multi-process server (HTTP), by number of workers.
+        # The scaling is the throughput relative to a single worker by worker
+        # (1.0 is linear scaling).
+        name = f"post_artifacts_100_workers_{workers}"
+        concurrency = request.config.getoption("--benchmark-concurrency")
+        with gunicorn_server(workers, tmp_path) as base_url:
+            benchmark(
+                name,
+                "POST",
+                "/api/v1/artifacts/",
+                payload=artifacts_payload(100),
+                expected_status=202,
+                base_url=base_url,
+                concurrency=max(concurrency, 4 * workers),
+            )
+
+        single_worker = benchmark_results.get("post_artifacts_100_workers_1")
+        if single_worker is not None:
+            benchmark_results[name]["workers"] = workers
+            benchmark_results[name]["scaling"] = round(
+                benchmark_results[name]["rps"]
+                / (workers * single_worker["rps"]),
+                2,
+            )
@@ -3,11 +3,53 @@
 #
 # SPDX-License-Identifier: MIT
 from datetime import datetime, timezone
+from pathlib import Path
 
 import pretend
 import pytest
 from fastapi.testclient import TestClient
 
+BENCHMARKS_PATH = Path(__file__).parent / "benchmarks"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks (tests/benchmarks)",
+    )
+    parser.addoption(
+        "--benchmark-output",
+        default="benchmark-results.json",
+        help="Benchmark results JSON file",
+    )
+    parser.addoption(
+        "--benchmark-requests",
+        type=int,
+        default=200,
+        help="Number of requests by benchmark",
+    )
+    parser.addoption(
+        "--benchmark-concurrency",
+        type=int,
+        default=1,
+        help="Number of concurrent requests by benchmark",
+    )
+    parser.addoption(
+        "--benchmark-cold-start-target",
+        type=float,
+        default=5.0,
+        help="Maximum time in seconds from the server start to the first "
+        "request response",
+    )
+
+
+def pytest_ignore_collect(collection_path, config):
+    # The benchmarks run only with `--benchmark`
+    if not config.getoption("--benchmark"):
+        return collection_path == BENCHMARKS_PATH or None
+
 
 @pytest.fixture()
 def test_client(monkeypatch):
@@ -15,11 +15,12 @@ MOCK_PATH = "repository_service_tuf_api.bootstrap"
 
 class TestGetBootstrap:
     def test_get_bootstrap_available(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None, task_id=None)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None, task_id=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         response = test_client.get(BOOTSTRAP_URL)
@@ -32,13 +33,14 @@ class TestGetBootstrap:
         assert mocked_bootstrap_state.calls == [pretend.call()]
 
     def test_get_bootstrap_not_available(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        async def fake_bootstrap_state():
+            return pretend.stub(
                 bootstrap=True, state="finished", task_id="task_id"
             )
-        )
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         response = test_client.get(BOOTSTRAP_URL)
@@ -53,13 +55,14 @@ class TestGetBootstrap:
     def test_get_bootstrap_already_bootstrap_in_pre(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        async def fake_bootstrap_state():
+            return pretend.stub(
                 bootstrap=False, state="pre", task_id="task_id"
             )
-        )
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         response = test_client.get(BOOTSTRAP_URL)
@@ -74,13 +77,14 @@ class TestGetBootstrap:
     def test_get_bootstrap_already_bootstrap_in_signing(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        async def fake_bootstrap_state():
+            return pretend.stub(
                 bootstrap=False, state="signing", task_id="task_id"
             )
-        )
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         response = test_client.get(BOOTSTRAP_URL)
@@ -97,13 +101,13 @@ class TestPostBootstrap:
     def test_post_bootstrap_bins_delegation(
         self, test_client, monkeypatch, fake_datetime
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -114,12 +118,11 @@ class TestPostBootstrap:
             f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
-        monkeypatch.setattr(f"{MOCK_PATH}.pre_lock_bootstrap", lambda *a: None)
-        mocked__check_bootstrap_status = pretend.call_recorder(lambda *a: None)
+        mocked_watch_bootstrap = pretend.call_recorder(lambda *a: None)
 
         monkeypatch.setattr(
-            f"{MOCK_PATH}._check_bootstrap_status",
-            mocked__check_bootstrap_status,
+            f"{MOCK_PATH}.watch_bootstrap",
+            mocked_watch_bootstrap,
         )
 
         monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
@@ -137,21 +140,19 @@ class TestPostBootstrap:
             "message": "Bootstrap accepted.",
             "data": {"task_id": "123", "last_update": "2019-06-16T09:05:01Z"},
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked__check_bootstrap_status.calls == [
-            pretend.call(task_id="123", timeout=300)
-        ]
+        assert mocked_pre_lock_bootstrap.calls == [pretend.call("123")]
+        assert mocked_watch_bootstrap.calls == [pretend.call("123", 300)]
 
     def test_post_bootstrap_unrecognized_field(
         self, test_client, monkeypatch, fake_datetime
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -162,11 +163,10 @@ class TestPostBootstrap:
             f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
-        monkeypatch.setattr(f"{MOCK_PATH}.pre_lock_bootstrap", lambda *a: None)
-        mocked__check_bootstrap_status = pretend.call_recorder(lambda *a: None)
+        mocked_watch_bootstrap = pretend.call_recorder(lambda *a: None)
         monkeypatch.setattr(
-            f"{MOCK_PATH}._check_bootstrap_status",
-            mocked__check_bootstrap_status,
+            f"{MOCK_PATH}.watch_bootstrap",
+            mocked_watch_bootstrap,
         )
 
         monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
@@ -184,21 +184,19 @@ class TestPostBootstrap:
             "message": "Bootstrap accepted.",
             "data": {"task_id": "123", "last_update": "2019-06-16T09:05:01Z"},
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked__check_bootstrap_status.calls == [
-            pretend.call(task_id="123", timeout=300)
-        ]
+        assert mocked_pre_lock_bootstrap.calls == [pretend.call("123")]
+        assert mocked_watch_bootstrap.calls == [pretend.call("123", 300)]
 
     def test_post_bootstrap_unrecognized_field_invalid(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -209,7 +207,6 @@ class TestPostBootstrap:
             f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
-        monkeypatch.setattr(f"{MOCK_PATH}.pre_lock_bootstrap", lambda *a: None)
 
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
@@ -228,13 +225,13 @@ class TestPostBootstrap:
     def test_post_bootstrap_unrecognized_field_must_start_with_x(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -245,7 +242,6 @@ class TestPostBootstrap:
             f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
-        monkeypatch.setattr(f"{MOCK_PATH}.pre_lock_bootstrap", lambda *a: None)
 
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
@@ -264,13 +260,13 @@ class TestPostBootstrap:
     def test_post_bootstrap_custom_timeout(
         self, test_client, monkeypatch, fake_datetime
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -281,11 +277,10 @@ class TestPostBootstrap:
             f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
-        monkeypatch.setattr(f"{MOCK_PATH}.pre_lock_bootstrap", lambda *a: None)
-        mocked__check_bootstrap_status = pretend.call_recorder(lambda *a: None)
+        mocked_watch_bootstrap = pretend.call_recorder(lambda *a: None)
         monkeypatch.setattr(
-            f"{MOCK_PATH}._check_bootstrap_status",
-            mocked__check_bootstrap_status,
+            f"{MOCK_PATH}.watch_bootstrap",
+            mocked_watch_bootstrap,
         )
 
         monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
@@ -304,19 +299,17 @@ class TestPostBootstrap:
             "message": "Bootstrap accepted.",
             "data": {"task_id": "123", "last_update": "2019-06-16T09:05:01Z"},
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked__check_bootstrap_status.calls == [
-            pretend.call(task_id="123", timeout=600)
-        ]
+        assert mocked_pre_lock_bootstrap.calls == [pretend.call("123")]
+        assert mocked_watch_bootstrap.calls == [pretend.call("123", 600)]
 
     def test_post_bootstrap_already_bootstrap(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
                 bootstrap=True, state="finished", task_id="task_id"
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
@@ -331,18 +324,18 @@ class TestPostBootstrap:
                 "error": "System already has a Metadata. State: finished"
             }
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
+        assert len(mocked_pre_lock_bootstrap.calls) == 1
 
     def test_post_bootstrap_already_bootstrap_in_pre(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
                 bootstrap=False, state="pre", task_id="task_id"
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
@@ -355,18 +348,18 @@ class TestPostBootstrap:
         assert response.json() == {
             "detail": {"error": "System already has a Metadata. State: pre"}
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
+        assert len(mocked_pre_lock_bootstrap.calls) == 1
 
     def test_post_bootstrap_already_bootstrap_in_signing(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
                 bootstrap=False, state="signing", task_id="task_id"
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
@@ -381,7 +374,7 @@ class TestPostBootstrap:
                 "error": "System already has a Metadata. State: signing"
             }
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
+        assert len(mocked_pre_lock_bootstrap.calls) == 1
 
     def test_post_bootstrap_empty_payload(self, test_client):
         response = test_client.post(BOOTSTRAP_URL, json={})
@@ -408,13 +401,13 @@ class TestPostBootstrap:
     def test_post_payload_no_bins_or_delegations(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(
-                bootstrap=False, state="finished", task_id="task_id"
+        mocked_pre_lock_bootstrap = pretend.call_recorder(
+            lambda task_id: pretend.stub(
+                bootstrap=False, state="pre", task_id=task_id
             )
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.pre_lock_bootstrap", mocked_pre_lock_bootstrap
         )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             f_data = f.read()
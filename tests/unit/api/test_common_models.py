@@ -1,79 +1,49 @@
 import pretend
 
-from repository_service_tuf_api import common_models
+from repository_service_tuf_api import RepositoryTopology, common_models
 
 COMMON_MODELS_PATH = "repository_service_tuf_api.common_models"
 
 
 class TestRoles:
     def test_online_values_all_true(self, monkeypatch):
-        def fake_get_fresh(args: str):
-            setting = args[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["bins-0", "bins-1"]
-
-        mocked_settings_repository = pretend.stub(
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{COMMON_MODELS_PATH}.settings_repository",
-            mocked_settings_repository,
+            f"{COMMON_MODELS_PATH}.repository_topology",
+            mocked_repository_topology,
         )
 
         result = common_models.Roles.online_roles_values()
         assert result == ["snapshot", "timestamp", "targets", "bins"]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
 
     def test_online_values_custom_delegations(self, monkeypatch):
-        def fake_get_fresh(args: str):
-            setting = args[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["foo", "bar"]
-
-        mocked_settings_repository = pretend.stub(
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("foo", "bar"))
         )
         monkeypatch.setattr(
-            f"{COMMON_MODELS_PATH}.settings_repository",
-            mocked_settings_repository,
+            f"{COMMON_MODELS_PATH}.repository_topology",
+            mocked_repository_topology,
         )
 
         result = common_models.Roles.online_roles_values()
         assert result == ["snapshot", "timestamp", "targets", "foo", "bar"]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
 
     def test_getting_online_values_targets_role_is_offline(self, monkeypatch):
-        def fake_get_fresh(args: str):
-            setting = args[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return False
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["bins-0", "bins-1"]
-
-        mocked_settings_repository = pretend.stub(
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(False, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{COMMON_MODELS_PATH}.settings_repository",
-            mocked_settings_repository,
+            f"{COMMON_MODELS_PATH}.repository_topology",
+            mocked_repository_topology,
         )
 
         result = common_models.Roles.online_roles_values()
         assert result == ["snapshot", "timestamp", "bins"]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
 
     def test_is_role_true_all_roles(self):
         all = ["root", "targets", "snapshot", "timestamp", "bins"]
@@ -89,3 +59,36 @@ class TestRoles:
         all_roles = [1, None, True, [], {}]
         for role in all_roles:
             assert common_models.Roles.is_role(role) is False
+
+
+class TestExampleFromFile:
+    def test_example_from_file(self, tmp_path):
+        example_file = tmp_path / "example.json"
+        example_file.write_text('{"key": "value"}')
+
+        class Model(common_models.BaseModel):
+            model_config = common_models.ConfigDict(
+                json_schema_extra=common_models.example_from_file(
+                    str(example_file)
+                )
+            )
+
+        # the file is loaded when the schema is generated
+        example_file.write_text('{"key": "new value"}')
+
+        assert Model.model_json_schema()["example"] == {"key": "new value"}
+
+    def test_example_from_file_build(self, tmp_path):
+        example_file = tmp_path / "example.json"
+        example_file.write_text('{"key": "value"}')
+
+        class Model(common_models.BaseModel):
+            model_config = common_models.ConfigDict(
+                json_schema_extra=common_models.example_from_file(
+                    str(example_file), lambda example: {"data": example}
+                )
+            )
+
+        assert Model.model_json_schema()["example"] == {
+            "data": {"key": "value"}
+        }
@@ -7,8 +7,14 @@ import json
 from datetime import timezone
 
 import pretend
+import pytest
 from fastapi import status
 
+from repository_service_tuf_api.http_cache import (
+    PrecompressedContent,
+    VersionedContentCache,
+)
+
 URL = "/api/v1/config"
 MOCK_PATH = "repository_service_tuf_api.config"
 
@@ -20,11 +26,12 @@ class TestPutSettings:
 
         payload = json.loads(f_data)
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_get_task_id = pretend.call_recorder(lambda: "task-id")
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", mocked_get_task_id)
@@ -65,11 +72,12 @@ class TestPutSettings:
 
         payload = json.loads(f_data)
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_get_task_id = pretend.call_recorder(lambda: "task-id")
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", mocked_get_task_id)
@@ -107,11 +115,13 @@ class TestPutSettings:
             f_data = f.read()
 
         payload = json.loads(f_data)
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None)
-        )
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         response = test_client.put(URL, json=payload)
         assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -128,11 +138,13 @@ class TestPutSettings:
             f_data = f.read()
 
         payload = json.loads(f_data)
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state="signing")
-        )
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state="signing")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         response = test_client.put(URL, json=payload)
         assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -153,16 +165,19 @@ class TestGetSettings:
         mocked_bootstrap_state = pretend.call_recorder(
             lambda *a: pretend.stub(bootstrap=True)
         )
-        monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
-        )
         fake_settings = pretend.stub(
-            fresh=pretend.call_recorder(lambda: None),
+            version=None,
+            bootstrap_state=mocked_bootstrap_state,
             to_dict=pretend.call_recorder(
                 lambda: {"k": "v", "j": ["v1", "v2"], "l": "none"}
             ),
         )
-        monkeypatch.setattr(f"{MOCK_PATH}.settings_repository", fake_settings)
+        mocked_repository_settings = pretend.call_recorder(
+            lambda: fake_settings
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", mocked_repository_settings
+        )
 
         test_response = test_client.get(url)
         assert test_response.status_code == status.HTTP_200_OK
@@ -170,10 +185,55 @@ class TestGetSettings:
             "data": {"k": "v", "j": ["v1", "v2"]},
             "message": "Current Settings",
         }
+        assert mocked_repository_settings.calls == [pretend.call()]
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert fake_settings.fresh.calls == [pretend.call()]
         assert fake_settings.to_dict.calls == [pretend.call()]
 
+    @pytest.mark.parametrize(
+        "cache_ttl, precompress, encoding",
+        [(0, False, None), (60, True, "gzip")],
+    )
+    def test_get_settings_precompress(
+        self, test_client, monkeypatch, cache_ttl, precompress, encoding
+    ):
+        monkeypatch.setattr(f"{MOCK_PATH}.CONFIG_CACHE_TTL", cache_ttl)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._config_cache", VersionedContentCache()
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_version", lambda: "1")
+        fake_settings = pretend.stub(
+            version=None,
+            bootstrap_state=lambda: pretend.stub(bootstrap=True),
+            to_dict=lambda: {"k": "v"},
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", lambda: fake_settings
+        )
+        mocked_precompressed_content = pretend.call_recorder(
+            PrecompressedContent
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.PrecompressedContent", mocked_precompressed_content
+        )
+
+        test_response = test_client.get(
+            URL, headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.headers.get("content-encoding") == encoding
+        assert test_response.json() == {
+            "data": {"k": "v"},
+            "message": "Current Settings",
+        }
+        assert mocked_precompressed_content.calls == [
+            pretend.call(
+                b'{"data":{"k":"v"},"message":"Current Settings"}',
+                "application/json",
+                precompress=precompress,
+            )
+        ]
+
     def test_get_settings_without_bootstrap(self, test_client, monkeypatch):
         url = "/api/v1/config"
 
@@ -181,7 +241,8 @@ class TestGetSettings:
             lambda *a: pretend.stub(bootstrap=False, state="None")
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.repository_settings",
+            lambda: pretend.stub(bootstrap_state=mocked_bootstrap_state),
         )
 
         test_response = test_client.get(url)
@@ -193,3 +254,127 @@ class TestGetSettings:
             }
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
+
+    def test_get_settings_not_modified(self, test_client, monkeypatch):
+        fake_settings = pretend.stub(
+            version=None,
+            bootstrap_state=lambda: pretend.stub(bootstrap=True),
+            to_dict=lambda: {"k": "v"},
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", lambda: fake_settings
+        )
+
+        test_response = test_client.get(URL)
+        assert test_response.status_code == status.HTTP_200_OK
+        etag = test_response.headers["etag"]
+
+        test_response = test_client.get(URL, headers={"If-None-Match": etag})
+        assert test_response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert test_response.headers["etag"] == etag
+        assert test_response.content == b""
+
+    def test_get_settings_cache(self, test_client, monkeypatch):
+        monkeypatch.setattr(f"{MOCK_PATH}.CONFIG_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._config_cache", VersionedContentCache()
+        )
+        versions = iter(["1", "1", "2"])
+        mocked_settings_version = pretend.call_recorder(lambda: next(versions))
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.settings_version", mocked_settings_version
+        )
+        mocked_bootstrap_state = pretend.call_recorder(
+            lambda: pretend.stub(bootstrap=True)
+        )
+        fake_settings = pretend.stub(
+            version=None,
+            bootstrap_state=mocked_bootstrap_state,
+            to_dict=lambda: {"k": "v"},
+        )
+        mocked_repository_settings = pretend.call_recorder(
+            lambda: fake_settings
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", mocked_repository_settings
+        )
+
+        # version 1 (loaded), version 1 (cached), version 2 (loaded)
+        responses = [test_client.get(URL) for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+        assert [r.json() for r in responses] == [
+            {"data": {"k": "v"}, "message": "Current Settings"}
+        ] * 3
+        assert len(mocked_settings_version.calls) == 3
+        assert len(mocked_bootstrap_state.calls) == 2
+        assert len(mocked_repository_settings.calls) == 2
+
+    def test_get_settings_cache_older_snapshot(self, test_client, monkeypatch):
+        monkeypatch.setattr(f"{MOCK_PATH}.CONFIG_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._config_cache", VersionedContentCache()
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_version", lambda: "2")
+        fake_settings = pretend.stub(
+            version="1",
+            bootstrap_state=lambda: pretend.stub(bootstrap=True),
+            to_dict=lambda: {"k": "v"},
+        )
+        mocked_repository_settings = pretend.call_recorder(
+            lambda: fake_settings
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", mocked_repository_settings
+        )
+
+        responses = [test_client.get(URL) for _ in range(2)]
+
+        assert [r.status_code for r in responses] == [200, 200]
+        # the (shared) snapshot is older than the version, not cached
+        assert len(mocked_repository_settings.calls) == 2
+
+    def test_get_settings_cache_invalidate(self, monkeypatch):
+        from repository_service_tuf_api import config, notify_settings_change
+
+        monkeypatch.setattr(f"{MOCK_PATH}.CONFIG_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._config_cache", VersionedContentCache()
+        )
+        content = pretend.stub()
+        config._config_cache.set("1", content, config.CONFIG_CACHE_TTL)
+        assert config._config_cache.get("1") is content
+        assert config._config_cache.get("2") is None
+
+        notify_settings_change()
+
+        assert config._config_cache.get("1") is None
+
+    def test_get_settings_cache_invalidated_while_reading(
+        self, test_client, monkeypatch
+    ):
+        from repository_service_tuf_api import config, notify_settings_change
+
+        monkeypatch.setattr(f"{MOCK_PATH}.CONFIG_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._config_cache", VersionedContentCache()
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_version", lambda: "1")
+
+        def fake_repository_settings():
+            # i.e. the settings changed by a worker while reading them
+            notify_settings_change()
+            return pretend.stub(
+                version=None,
+                bootstrap_state=lambda: pretend.stub(bootstrap=True),
+                to_dict=lambda: {"k": "v"},
+            )
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_settings", fake_repository_settings
+        )
+
+        test_response = test_client.get(URL)
+
+        assert test_response.status_code == status.HTTP_200_OK
+        assert config._config_cache.get("1") is None
@@ -6,11 +6,19 @@
 import copy
 import json
 from datetime import datetime, timezone
+from types import MappingProxyType
 
 import pretend
+import pytest
+from dynaconf.utils.parse_conf import unparse_conf_data
 from fastapi import status
 
 import repository_service_tuf_api.common_models as common_models
+from repository_service_tuf_api import RepositorySettings, RepositoryTopology
+from repository_service_tuf_api.http_cache import (
+    PrecompressedContent,
+    VersionedContentCache,
+)
 
 METADATA_URL = "/api/v1/metadata/"
 METADATA_ONLINE_URL = "/api/v1/metadata/online"
@@ -21,11 +29,12 @@ MOCK_PATH = "repository_service_tuf_api.metadata"
 
 class TestPostMetadata:
     def test_post_metadata(self, test_client, monkeypatch, fake_datetime):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_async_result = pretend.stub(state="SUCCESS")
         mocked_repository_metadata = pretend.stub(
@@ -55,11 +64,12 @@ class TestPostMetadata:
         assert mocked_bootstrap_state.calls == [pretend.call()]
 
     def test_post_metadata_without_bootstrap(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         with open(
             "tests/data_examples/metadata/update-root-payload.json"
@@ -82,11 +92,12 @@ class TestPostMetadata:
     def test_post_metadata_bootstrap_intermediate_state(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state="signing")
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state="signing")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         with open(
             "tests/data_examples/metadata/update-root-payload.json"
@@ -160,19 +171,11 @@ class TestPostMetadataOnline:
             f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
         )
 
-        def fake_get_fresh(attr: str) -> bool:
-            setting = attr[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["bins-0", "bins-1"]
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_topology", mocked_repository_topology
         )
         fake_id = "fake_id"
         fake_get_task_id = pretend.call_recorder(lambda: fake_id)
@@ -203,13 +206,7 @@ class TestPostMetadataOnline:
             "message": "Force online metadata update accepted.",
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [
-            pretend.call(),
-        ]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
         assert fake_get_task_id.calls == [pretend.call()]
         assert fake_repository_metadata.apply_async.calls == [
             pretend.call(
@@ -234,28 +231,12 @@ class TestPostMetadataOnline:
             f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
         )
 
-        def fake_get_fresh(attr: str) -> bool:
-            setting = attr[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["bins-0", "bins-1"]
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
-        )
-        fake_online_roles_return = ["snapshot", "targets", "timestamp", "bins"]
-        fake_roles = pretend.stub(
-            online_roles_values=pretend.call_recorder(
-                lambda: fake_online_roles_return
-            ),
-            BINS=pretend.stub(value="bins"),
+            f"{MOCK_PATH}.repository_topology", mocked_repository_topology
         )
-        monkeypatch.setattr(f"{MOCK_PATH}.Roles", fake_roles)
         fake_id = "fake_id"
         fake_get_task_id = pretend.call_recorder(lambda: fake_id)
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", fake_get_task_id)
@@ -282,16 +263,11 @@ class TestPostMetadataOnline:
             "message": "Force online metadata update accepted.",
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [
-            pretend.call(),
-        ]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
-        assert fake_roles.online_roles_values.calls == [pretend.call()]
+        assert mocked_repository_topology.calls == [pretend.call()]
         assert fake_get_task_id.calls == [pretend.call()]
-        expected_payload = {"roles": fake_online_roles_return}
+        expected_payload = {
+            "roles": ["snapshot", "timestamp", "targets", "bins"]
+        }
         assert fake_repository_metadata.apply_async.calls == [
             pretend.call(
                 kwargs={
@@ -335,12 +311,11 @@ class TestPostMetadataOnline:
         monkeypatch.setattr(
             f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
         )
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: False),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(False, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_topology", mocked_repository_topology
         )
         payload = {"roles": ["snapshot", "targets"]}
 
@@ -354,10 +329,7 @@ class TestPostMetadataOnline:
             },
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True)
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
 
     def test_post_metadata_online_bins_used_bad_payload(
         self, test_client, monkeypatch
@@ -369,19 +341,11 @@ class TestPostMetadataOnline:
             f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
         )
 
-        def fake_get_fresh(attr: str) -> bool:
-            setting = attr[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["bins-0", "bins-1"]
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("bins-0", "bins-1"))
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_topology", mocked_repository_topology
         )
         payload = {"roles": ["snapshot", "targets", "abcsdaw"]}
 
@@ -398,13 +362,7 @@ class TestPostMetadataOnline:
             },
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [
-            pretend.call(),
-        ]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
 
     def test_post_metadata_online_custom_delegation_used_bad_payload(
         self, test_client, monkeypatch
@@ -416,19 +374,11 @@ class TestPostMetadataOnline:
             f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
         )
 
-        def fake_get_fresh(attr: str) -> bool:
-            setting = attr[0]
-            if setting == "TARGETS_ONLINE_KEY":
-                return True
-            elif setting == "DELEGATED_ROLES_NAMES":
-                return ["foo", "bar"]
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: fake_get_fresh(a)),
+        mocked_repository_topology = pretend.call_recorder(
+            lambda: RepositoryTopology(True, ("foo", "bar"))
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_topology", mocked_repository_topology
         )
         payload = {"roles": ["snapshot", "targets", "bins"]}
 
@@ -442,44 +392,46 @@ class TestPostMetadataOnline:
             },
         }
         assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [
-            pretend.call(),
-        ]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("TARGETS_ONLINE_KEY", True),
-            pretend.call("DELEGATED_ROLES_NAMES"),
-        ]
+        assert mocked_repository_topology.calls == [pretend.call()]
+
+
+def fake_settings_redis(repository_settings):
+    """Fake repository settings Redis, with the settings values as stored."""
+    stored = {
+        name: unparse_conf_data(value)
+        for name, value in repository_settings.items()
+    }
+    return pretend.stub(
+        hkeys=pretend.call_recorder(lambda holder: list(stored)),
+        hmget=pretend.call_recorder(
+            lambda holder, names: [stored.get(name) for name in names]
+        ),
+    )
 
 
 class TestGetMetadataSign:
-    def test_get_metadata_sign(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
+    @pytest.fixture(autouse=True)
+    def signing_state(self, monkeypatch):
+        self.mocked_bootstrap_state = pretend.call_recorder(
             lambda *a: pretend.stub(bootstrap=True, state="signing")
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state", self.mocked_bootstrap_state
         )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_holder", lambda: "HOLDER")
+
+    def test_get_metadata_sign(self, test_client, monkeypatch):
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             md_content = f.read()
         metadata_data = json.loads(md_content)
-        fake_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(
-                lambda: metadata_data["metadata"]["root"]
-            )
-        )
-
-        def get_role(role_setting: str):
-            if role_setting == "ROOT_SIGNING":
-                return fake_metadata
-            return None
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get=pretend.call_recorder(lambda a: get_role(a)),
-            ROOT_SIGNING=fake_metadata,
+        mocked_settings_redis = fake_settings_redis(
+            {
+                "ROOT_SIGNING": metadata_data["metadata"]["root"],
+                "BOOTSTRAP": "signing-task_id",
+            },
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
         )
 
         response = test_client.get(SIGN_URL)
@@ -488,54 +440,31 @@ class TestGetMetadataSign:
             "data": {"metadata": {"root": metadata_data["metadata"]["root"]}},
             "message": "Metadata role(s) pending signing",
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get.calls == [
-            pretend.call("ROOT_SIGNING"),
-            pretend.call("TRUSTED_ROOT"),
-            pretend.call("TRUSTED_TARGETS"),
+        assert self.mocked_bootstrap_state.calls == [pretend.call()]
+        # only the settings names and the pending signing settings are read
+        assert mocked_settings_redis.hkeys.calls == [pretend.call("HOLDER")]
+        assert mocked_settings_redis.hmget.calls == [
+            pretend.call("HOLDER", ["ROOT_SIGNING", "TRUSTED_ROOT"])
         ]
-        assert fake_metadata.to_dict.calls == [pretend.call()]
 
     def test_get_metadata_sign_with_trusted_root(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True, state="signing")
-        )
-        monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
-        )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             md_content = f.read()
 
         metadata_data = json.loads(md_content)
-        fake_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(
-                lambda: metadata_data["metadata"]["root"]
-            )
-        )
         # Change trusted root:
         trusted_root_dict = copy.deepcopy(metadata_data["metadata"]["root"])
         trusted_root_dict["signed"]["version"] = 10
-        fake_trusted_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(lambda: trusted_root_dict)
-        )
-
-        def get_role(setting: str):
-            if setting == "ROOT_SIGNING":
-                return fake_metadata
-            elif setting == "TRUSTED_ROOT":
-                return fake_trusted_metadata
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get=pretend.call_recorder(lambda a: get_role(a)),
-            ROOT_SIGNING=fake_metadata,
-            TRUSTED_ROOT=fake_metadata,
+        mocked_settings_redis = fake_settings_redis(
+            {
+                "ROOT_SIGNING": metadata_data["metadata"]["root"],
+                "TRUSTED_ROOT": trusted_root_dict,
+            },
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
         )
 
         response = test_client.get(SIGN_URL)
@@ -549,25 +478,14 @@ class TestGetMetadataSign:
             },
             "message": "Metadata role(s) pending signing",
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get.calls == [
-            pretend.call("ROOT_SIGNING"),
-            pretend.call("TRUSTED_ROOT"),
-            pretend.call("TRUSTED_TARGETS"),
+        assert self.mocked_bootstrap_state.calls == [pretend.call()]
+        assert mocked_settings_redis.hmget.calls == [
+            pretend.call("HOLDER", ["ROOT_SIGNING", "TRUSTED_ROOT"])
         ]
-        assert fake_metadata.to_dict.calls == [pretend.call()]
-        assert fake_trusted_metadata.to_dict.calls == [pretend.call()]
 
     def test_get_metadata_sign_with_trusted_targets(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True, state="signing")
-        )
-        monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
-        )
         path = "tests/data_examples/bootstrap/payload_custom_targets.json"
         with open(path) as f:
             data = json.loads(f.read())
@@ -600,27 +518,15 @@ class TestGetMetadataSign:
         # Change trusted root:
         pending_targets_dict = copy.deepcopy(trusted_targets_dict)
         pending_targets_dict["signed"]["version"] = 10
-        fake_targets_pending_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(lambda: pending_targets_dict)
-        )
-        fake_targets_trusted_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(lambda: trusted_targets_dict)
-        )
-
-        def get_role(setting: str):
-            if setting == "TARGETS_SIGNING":
-                return fake_targets_pending_metadata
-            elif setting == "TRUSTED_TARGETS":
-                return fake_targets_trusted_metadata
-
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get=pretend.call_recorder(lambda a: get_role(a)),
-            TARGETS_SIGNING=fake_targets_pending_metadata,
-            TRUSTED_TARGETS=fake_targets_trusted_metadata,
+        mocked_settings_redis = fake_settings_redis(
+            {
+                "ROOT_SIGNING": None,
+                "TARGETS_SIGNING": pending_targets_dict,
+                "TRUSTED_TARGETS": trusted_targets_dict,
+            },
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
         )
 
         response = test_client.get(SIGN_URL)
@@ -634,40 +540,35 @@ class TestGetMetadataSign:
             },
             "message": "Metadata role(s) pending signing",
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get.calls == [
-            pretend.call("TARGETS_SIGNING"),
-            pretend.call("TRUSTED_ROOT"),
-            pretend.call("TRUSTED_TARGETS"),
+        assert self.mocked_bootstrap_state.calls == [pretend.call()]
+        assert mocked_settings_redis.hkeys.calls == [pretend.call("HOLDER")]
+        assert mocked_settings_redis.hmget.calls == [
+            pretend.call(
+                "HOLDER",
+                [
+                    "ROOT_SIGNING",
+                    "TARGETS_SIGNING",
+                    "TRUSTED_ROOT",
+                    "TRUSTED_TARGETS",
+                ],
+            )
         ]
-        assert fake_targets_pending_metadata.to_dict.calls == [pretend.call()]
-        assert fake_targets_trusted_metadata.to_dict.calls == [pretend.call()]
 
     def test_get_metadata_sign_with_trusted_root_no_pending(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True, state="signing")
-        )
-        monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
-        )
         with open("tests/data_examples/bootstrap/payload_bins.json") as f:
             md_content = f.read()
 
         metadata_data = json.loads(md_content)
         trusted_root_dict = copy.deepcopy(metadata_data["metadata"]["root"])
         trusted_root_dict["signed"]["version"] = 10
-        fake_trusted_metadata = pretend.stub(
-            to_dict=pretend.call_recorder(lambda: trusted_root_dict)
-        )
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get=pretend.call_recorder(lambda a: fake_trusted_metadata),
+        # The index is ahead of the settings (no longer pending)
+        mocked_settings_redis = fake_settings_redis(
+            {"ROOT_SIGNING": None, "TRUSTED_ROOT": trusted_root_dict},
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
         )
 
         response = test_client.get(SIGN_URL)
@@ -675,35 +576,180 @@ class TestGetMetadataSign:
         assert response.json() == {
             "message": "No metadata pending signing available",
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert len(mocked_settings_repository.get.calls) == 0
+        assert self.mocked_bootstrap_state.calls == [pretend.call()]
 
     def test_get_metadata_sign_no_pending_roles(
         self, test_client, monkeypatch
     ):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True, state="signing")
+        mocked_settings_redis = fake_settings_redis(
+            {"BOOTSTRAP": "signing-task_id", "TRUSTED_ROOT": {"k": "v"}}
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
         )
 
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get=pretend.call_recorder(lambda *a: None),
+        response = test_client.get(SIGN_URL)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == {
+            "message": "No metadata pending signing available",
+        }
+        assert self.mocked_bootstrap_state.calls == [pretend.call()]
+        assert mocked_settings_redis.hmget.calls == []
+
+    def test_get_metadata_sign_not_modified(self, test_client, monkeypatch):
+        mocked_settings_redis = fake_settings_redis({})
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
+        )
+
+        response = test_client.get(SIGN_URL)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        etag = response.headers["etag"]
+
+        response = test_client.get(SIGN_URL, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_get_metadata_sign_shared_settings(self, test_client, monkeypatch):
+        root = {"signed": {"_type": "root", "version": 2}}
+        trusted_root = {"signed": {"_type": "root", "version": 1}}
+        shared_snapshot = RepositorySettings(
+            data=MappingProxyType(
+                {
+                    "BOOTSTRAP": "signing-task_id",
+                    "ROOT_SIGNING": root,
+                    "TARGETS_SIGNING": None,
+                    "TRUSTED_ROOT": trusted_root,
+                }
+            ),
+            version="1",
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.shared_repository_settings", lambda: shared_snapshot
         )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_redis", pretend.stub())
 
         response = test_client.get(SIGN_URL)
+
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.json() == {
+            "data": {"metadata": {"root": root, "trusted_root": trusted_root}},
+            "message": "Metadata role(s) pending signing",
+        }
+        # the bootstrap state is read from the shared snapshot
+        assert self.mocked_bootstrap_state.calls == []
+
+    def test_get_metadata_sign_cache(self, test_client, monkeypatch):
+        monkeypatch.setattr(f"{MOCK_PATH}.METADATA_SIGN_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._metadata_sign_cache", VersionedContentCache()
+        )
+        versions = iter(["1", "1", "2"])
+        mocked_settings_version = pretend.call_recorder(lambda: next(versions))
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.settings_version", mocked_settings_version
+        )
+        mocked_settings_redis = fake_settings_redis(
+            {"TARGETS_SIGNING": {"signed": {"_type": "targets"}}},
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.settings_redis", mocked_settings_redis
+        )
+
+        # version 1 (loaded), version 1 (cached), version 2 (loaded)
+        responses = [test_client.get(SIGN_URL) for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+        assert [r.json() for r in responses] == [
+            {
+                "data": {
+                    "metadata": {"targets": {"signed": {"_type": "targets"}}}
+                },
+                "message": "Metadata role(s) pending signing",
+            }
+        ] * 3
+        assert len(mocked_settings_version.calls) == 3
+        assert len(self.mocked_bootstrap_state.calls) == 2
+        assert len(mocked_settings_redis.hmget.calls) == 2
+
+    @pytest.mark.parametrize(
+        "cache_ttl, precompress, encoding",
+        [(0, False, None), (60, True, "gzip")],
+    )
+    def test_get_metadata_sign_precompress(
+        self, test_client, monkeypatch, cache_ttl, precompress, encoding
+    ):
+        monkeypatch.setattr(f"{MOCK_PATH}.METADATA_SIGN_CACHE_TTL", cache_ttl)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._metadata_sign_cache", VersionedContentCache()
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_version", lambda: "1")
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.settings_redis", fake_settings_redis({})
+        )
+        mocked_precompressed_content = pretend.call_recorder(
+            PrecompressedContent
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.PrecompressedContent", mocked_precompressed_content
+        )
+
+        response = test_client.get(
+            SIGN_URL, headers={"Accept-Encoding": "gzip"}
+        )
+
         assert response.status_code == status.HTTP_200_OK, response.text
+        assert response.headers.get("content-encoding") == encoding
         assert response.json() == {
             "message": "No metadata pending signing available",
         }
-        assert mocked_bootstrap_state.calls == [pretend.call()]
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
+        assert mocked_precompressed_content.calls == [
+            pretend.call(
+                b'{"message":"No metadata pending signing available"}',
+                "application/json",
+                precompress=precompress,
+            )
+        ]
+
+    def test_get_metadata_sign_cache_invalidate(self, monkeypatch):
+        from repository_service_tuf_api import metadata, notify_settings_change
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._metadata_sign_cache", VersionedContentCache()
+        )
+        content = pretend.stub()
+        metadata._metadata_sign_cache.set("1", content, 60)
+
+        notify_settings_change()
+
+        assert metadata._metadata_sign_cache.get("1") is None
+
+    def test_get_metadata_sign_cache_invalidated_while_reading(
+        self, test_client, monkeypatch
+    ):
+        from repository_service_tuf_api import metadata, notify_settings_change
+
+        monkeypatch.setattr(f"{MOCK_PATH}.METADATA_SIGN_CACHE_TTL", 60)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}._metadata_sign_cache", VersionedContentCache()
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.settings_version", lambda: "1")
+
+        def fake_pending_signing_settings():
+            # i.e. the worker writes TARGETS_SIGNING while reading it
+            notify_settings_change()
+            return []
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.pending_signing_settings",
+            fake_pending_signing_settings,
+        )
+
+        response = test_client.get(SIGN_URL)
+
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert metadata._metadata_sign_cache.get("1") is None
 
     def test_get_metadata_sign_no_bootstrap(self, test_client, monkeypatch):
         mocked_bootstrap_state = pretend.call_recorder(
@@ -744,11 +790,12 @@ class TestGetMetadataSign:
 
 class TestPostMetadataSign:
     def test_post_metadata_sign(self, test_client, monkeypatch, fake_datetime):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True, state="signing")
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True, state="signing")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "fake_id")
         fake_repository_metadata = pretend.stub(
@@ -787,11 +834,12 @@ class TestPostMetadataSign:
         ]
 
     def test_post_metadata_no_bootstrap(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         payload = {"role": "root", "signature": {"keyid": "k1", "sig": "s1"}}
 
@@ -806,11 +854,12 @@ class TestPostMetadataSign:
         assert mocked_bootstrap_state.calls == [pretend.call()]
 
     def test_post_metadata_bootstrap_finished(self, test_client, monkeypatch):
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state="finished")
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state="finished")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         payload = {"role": "root", "signature": {"keyid": "k1", "sig": "s1"}}
 
@@ -831,12 +880,11 @@ class TestPostMetadataSignDelete:
     def test_post_metadata_sign_delete(
         self, test_client, monkeypatch, fake_datetime
     ):
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: "metadata"),
+        mocked_settings = pretend.stub(
+            get=pretend.call_recorder(lambda *a: "metadata"),
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_settings", lambda: mocked_settings
         )
         fake_get_task_id = pretend.call_recorder(lambda: "123")
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", fake_get_task_id)
@@ -858,10 +906,7 @@ class TestPostMetadataSignDelete:
             "data": {"task_id": "123", "last_update": "2019-06-16T09:05:01Z"},
             "message": "Metadata sign delete accepted.",
         }
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("ROOT_SIGNING")
-        ]
+        assert mocked_settings.get.calls == [pretend.call("ROOT_SIGNING")]
         assert fake_get_task_id.calls == [pretend.call()]
         assert mocked_repository_metadata.apply_async.calls == [
             pretend.call(
@@ -878,12 +923,11 @@ class TestPostMetadataSignDelete:
     def test_metadata_sign_delete_role_not_in_signing_status(
         self, test_client, monkeypatch
     ):
-        mocked_settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: None),
+        mocked_settings = pretend.stub(
+            get=pretend.call_recorder(lambda *a: None),
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.settings_repository", mocked_settings_repository
+            f"{MOCK_PATH}.repository_settings", lambda: mocked_settings
         )
 
         payload = {"role": "root"}
@@ -896,7 +940,4 @@ class TestPostMetadataSignDelete:
                 "error": "The root role is not in a signing process.",
             }
         }
-        assert mocked_settings_repository.reload.calls == [pretend.call()]
-        assert mocked_settings_repository.get_fresh.calls == [
-            pretend.call("ROOT_SIGNING")
-        ]
+        assert mocked_settings.get.calls == [pretend.call("ROOT_SIGNING")]
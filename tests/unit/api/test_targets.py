@@ -7,26 +7,99 @@ from datetime import timezone
 from uuid import uuid4
 
 import pretend
+import pytest
 from fastapi import status
+from redis.exceptions import RedisError
 
 ARTIFACTS_URL = "/api/v1/artifacts/"
 ARTIFACTS_DELETE_URL = "/api/v1/artifacts/delete"
 ARTIFACTS_POST_URL = "/api/v1/artifacts/publish/"
+ARTIFACTS_STREAM_URL = "/api/v1/artifacts/stream"
 MOCK_PATH = "repository_service_tuf_api.artifacts"
 
 
+def fake_staging_backend():
+    """Result Backend stub for the artifacts stream staging (Redis list)"""
+    staged = []
+
+    class FakePipeline:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
+        def rpush(self, key, value):
+            staged.append(value)
+
+        def expire(self, key, seconds):
+            return None
+
+        async def execute(self):
+            return None
+
+    async def lpop(key):
+        return staged.pop(0) if staged else None
+
+    async def delete(key):
+        staged.clear()
+
+    return pretend.stub(
+        pipeline=FakePipeline,
+        lpop=lpop,
+        delete=pretend.call_recorder(delete),
+        staged=staged,
+    )
+
+
+def fake_idempotency_backend(monkeypatch):
+    """Result Backend stub for the idempotency keys (Lua scripts)"""
+    data = {}
+
+    async def claim(keys, args):
+        if keys[0] in data:
+            return data[keys[0]]
+        data[keys[0]] = args[0].encode()
+
+    async def cas(keys, args):
+        expected, new, _ = args
+        if data.get(keys[0]) != expected.encode():
+            return 0
+        if new == "":
+            del data[keys[0]]
+        else:
+            data[keys[0]] = new.encode()
+        return 1
+
+    monkeypatch.setattr("repository_service_tuf_api.idempotency._claim", claim)
+    monkeypatch.setattr("repository_service_tuf_api.idempotency._cas", cas)
+
+    return pretend.stub(data=data)
+
+
 class TestPostArtifacts:
+    @pytest.fixture(autouse=True)
+    def no_hash_bins(self, monkeypatch):
+        async def fake_number_of_delegated_bins():
+            return None
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.number_of_delegated_bins",
+            fake_number_of_delegated_bins,
+        )
+
     def test_post(self, monkeypatch, test_client, fake_datetime):
         with open("tests/data_examples/artifacts/add_payload.json") as f:
             f_data = f.read()
 
         payload = json.loads(f_data)
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_repository_metadata = pretend.stub(
             apply_async=pretend.call_recorder(lambda **kw: None)
@@ -73,11 +146,12 @@ class TestPostArtifacts:
 
         payload = json.loads(f_data)
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_repository_metadata = pretend.stub(
             apply_async=pretend.call_recorder(lambda **kw: None)
@@ -141,11 +215,12 @@ class TestPostArtifacts:
         # Disable publish_artifacts
         payload["publish_artifacts"] = False
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         fake_task_id = uuid4().hex
         monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: fake_task_id)
@@ -183,15 +258,70 @@ class TestPostArtifacts:
             )
         ]
 
-    def test_post_without_bootstrap(self, monkeypatch, test_client):
+    def test_post_coalesced(self, monkeypatch, test_client, fake_datetime):
         with open("tests/data_examples/artifacts/add_payload.json") as f:
             f_data = f.read()
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None)
+        payload = json.loads(f_data)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+
+        async def fake_submit(*a, **kw):
+            return "merged_task_id"
+
+        mocked_artifacts_coalescer = pretend.stub(
+            submit=pretend.call_recorder(fake_submit)
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.artifacts_coalescer", mocked_artifacts_coalescer
+        )
+        fake_task_id = uuid4().hex
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: fake_task_id)
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+
+        response = test_client.post(ARTIFACTS_URL, json=payload)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json() == {
+            "data": {
+                "artifacts": ["file1.tar.gz", "file2.tar.gz", "file3.tar.gz"],
+                "task_id": fake_task_id,
+                "last_update": "2019-06-16T09:05:01Z",
+            },
+            "message": "New Artifact(s) successfully submitted.",
+        }
+        assert mocked_artifacts_coalescer.submit.calls == [
+            pretend.call(
+                "add_artifacts",
+                payload["artifacts"],
+                True,
+                fake_task_id,
+                target_roles=None,
+            )
+        ]
+        assert mocked_repository_metadata.apply_async.calls == []
+
+    def test_post_without_bootstrap(self, monkeypatch, test_client):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            f_data = f.read()
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         payload = json.loads(f_data)
@@ -212,11 +342,12 @@ class TestPostArtifacts:
         with open("tests/data_examples/artifacts/add_payload.json") as f:
             f_data = f.read()
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state="signing")
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state="signing")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
 
         payload = json.loads(f_data)
@@ -245,6 +376,625 @@ class TestPostArtifacts:
 
         response = test_client.post(ARTIFACTS_URL, json=payload)
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == {
+            "detail": [
+                {
+                    "type": "missing",
+                    "loc": ["body", "artifacts", 0, "info", "hashes"],
+                    "msg": "Field required",
+                    "input": {"length": 11342, "custom": {"key": "value"}},
+                },
+                {
+                    "type": "missing",
+                    "loc": ["body", "artifacts", 0, "path"],
+                    "msg": "Field required",
+                    "input": {
+                        "info": {"length": 11342, "custom": {"key": "value"}}
+                    },
+                },
+            ]
+        }
+
+    def test_post_invalid_json(self, test_client):
+        response = test_client.post(
+            ARTIFACTS_URL,
+            content=b'{"artifacts": [',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+
+    def test_post_worker_payload(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        payload = {
+            "artifacts": [
+                {
+                    "info": {
+                        "length": "11342",
+                        "hashes": {"blake2b-256": "716f6e86"},
+                        "custom": None,
+                        "unknown": "value",
+                    },
+                    "path": "file1.tar.gz",
+                    "unknown": "value",
+                }
+            ],
+            "unknown": "value",
+        }
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        fake_task_id = uuid4().hex
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: fake_task_id)
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+
+        response = test_client.post(ARTIFACTS_URL, json=payload)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        # unknown fields and `custom: null` are not sent to the workers, and
+        # the values are coerced as by the `AddPayload` model
+        assert mocked_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": [
+                            {
+                                "info": {
+                                    "length": 11342,
+                                    "hashes": {"blake2b-256": "716f6e86"},
+                                },
+                                "path": "file1.tar.gz",
+                            }
+                        ],
+                        "add_task_id_to_custom": False,
+                        "publish_artifacts": True,
+                    },
+                },
+                task_id=fake_task_id,
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+
+    @pytest.mark.parametrize("target_roles_payload", [False, True])
+    def test_post_hash_bins(
+        self, monkeypatch, test_client, fake_datetime, target_roles_payload
+    ):
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.ARTIFACTS_TARGET_ROLES_PAYLOAD", target_roles_payload
+        )
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+
+        async def fake_number_of_delegated_bins():
+            return 32
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.number_of_delegated_bins",
+            fake_number_of_delegated_bins,
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        fake_task_id = uuid4().hex
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: fake_task_id)
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+
+        response = test_client.post(ARTIFACTS_URL, json=payload)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        expected_target_roles = {
+            "file1.tar.gz": "bins-1f",
+            "file2.tar.gz": "bins-16",
+            "file3.tar.gz": "bins-10",
+        }
+        assert response.json() == {
+            "data": {
+                "artifacts": ["file1.tar.gz", "file2.tar.gz", "file3.tar.gz"],
+                "task_id": fake_task_id,
+                "last_update": "2019-06-16T09:05:01Z",
+                "target_roles": expected_target_roles,
+            },
+            "message": "New Artifact(s) successfully submitted.",
+        }
+        worker_payload = {
+            **payload,
+            "publish_artifacts": True,
+            "add_task_id_to_custom": False,
+        }
+        if target_roles_payload:
+            worker_payload["target_roles"] = expected_target_roles
+        assert mocked_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": worker_payload,
+                },
+                task_id=fake_task_id,
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+
+    def test_post_target_roles_not_from_payload(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+
+        response = test_client.post(
+            ARTIFACTS_URL,
+            json={**payload, "target_roles": {"file1.tar.gz": "bins-00"}},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert "target_roles" not in response.json()["data"]
+        worker_payload = mocked_repository_metadata.apply_async.calls[
+            0
+        ].kwargs["kwargs"]["payload"]
+        assert "target_roles" not in worker_payload
+
+    def test_post_idempotency_key(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        task_ids = iter(["task_1", "task_2", "task_3"])
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: next(task_ids))
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+        fake_idempotency_backend(monkeypatch)
+
+        responses = [
+            test_client.post(
+                ARTIFACTS_URL, json=payload, headers={"Idempotency-Key": "k1"}
+            )
+            for _ in range(2)
+        ]
+        for response in responses:
+            assert response.status_code == status.HTTP_202_ACCEPTED
+            assert response.json()["data"]["task_id"] == "task_1"
+        # the repeated request doesn't submit a new task
+        assert len(mocked_repository_metadata.apply_async.calls) == 1
+
+        response = test_client.post(
+            ARTIFACTS_URL,
+            json={**payload, "publish_artifacts": False},
+            headers={"Idempotency-Key": "k1"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == {
+            "detail": {
+                "message": "Task not accepted.",
+                "error": (
+                    "Idempotency-Key already used with a different payload"
+                ),
+            }
+        }
+
+    def test_post_deduplication_window(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        task_ids = iter(["task_1", "task_2"])
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: next(task_ids))
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+        monkeypatch.setattr(
+            "repository_service_tuf_api.idempotency.DEDUPLICATION_WINDOW", 30
+        )
+        fake_idempotency_backend(monkeypatch)
+
+        responses = [
+            test_client.post(ARTIFACTS_URL, json=payload) for _ in range(2)
+        ]
+        assert [r.json()["data"]["task_id"] for r in responses] == [
+            "task_1",
+            "task_1",
+        ]
+        assert len(mocked_repository_metadata.apply_async.calls) == 1
+
+    def test_post_idempotency_key_publish_error(
+        self, monkeypatch, test_client
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+
+        def fake_apply_async(**kw):
+            raise ConnectionError("broker unavailable")
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata",
+            pretend.stub(apply_async=fake_apply_async),
+        )
+        fake_backend = fake_idempotency_backend(monkeypatch)
+
+        with pytest.raises(ConnectionError):
+            test_client.post(
+                ARTIFACTS_URL, json=payload, headers={"Idempotency-Key": "k1"}
+            )
+
+        # released, so the request can be retried
+        assert fake_backend.data == {}
+
+    def test_post_idempotency_key_original_pending(
+        self, monkeypatch, test_client
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "task_2")
+        fake_backend = fake_idempotency_backend(monkeypatch)
+        from repository_service_tuf_api import artifacts
+        from repository_service_tuf_api.idempotency import IdempotentRequest
+
+        # the original request is still publishing its task
+        request = IdempotentRequest.from_request(
+            "add_artifacts",
+            artifacts.validate_add_payload(json.dumps(payload).encode()),
+            "k1",
+        )
+        fake_backend.data[request.key] = (
+            f"task_1 {request.digest} pending".encode()
+        )
+
+        response = test_client.post(
+            ARTIFACTS_URL, json=payload, headers={"Idempotency-Key": "k1"}
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.json() == {
+            "detail": {
+                "message": "Task not accepted.",
+                "error": (
+                    "The original request (task task_1) is still being "
+                    "submitted, retry later"
+                ),
+            }
+        }
+        assert mocked_repository_metadata.apply_async.calls == []
+
+    def test_post_idempotency_key_published_error(
+        self, monkeypatch, test_client, caplog
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            payload = json.load(f)
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "task_1")
+        fake_idempotency_backend(monkeypatch)
+
+        async def fake_cas(keys, args):
+            raise RedisError("unavailable")
+
+        monkeypatch.setattr(
+            "repository_service_tuf_api.idempotency._cas", fake_cas
+        )
+
+        response = test_client.post(
+            ARTIFACTS_URL, json=payload, headers={"Idempotency-Key": "k1"}
+        )
+
+        # the task is submitted
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["data"]["task_id"] == "task_1"
+        assert len(mocked_repository_metadata.apply_async.calls) == 1
+        assert "Failed to mark task task_1 as published" in caplog.text
+
+
+class TestPostArtifactsStream:
+    def setup_stream(self, monkeypatch, fake_datetime, bootstrap=True):
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=bootstrap, state=None)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None),
+            backend=pretend.stub(expires=86400),
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        fake_result_backend = fake_staging_backend()
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", fake_result_backend
+        )
+        task_ids = iter(["staging", "task_1", "task_2", "task_3"])
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: next(task_ids))
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+        monkeypatch.setattr(f"{MOCK_PATH}.ARTIFACTS_STREAM_CHUNK_SIZE", 2)
+
+        return mocked_repository_metadata, fake_result_backend
+
+    def test_post_stream_json_array(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            artifacts = json.load(f)["artifacts"]
+        mocked_repository_metadata, fake_result_backend = self.setup_stream(
+            monkeypatch, fake_datetime
+        )
+
+        response = test_client.post(
+            ARTIFACTS_STREAM_URL, content=json.dumps(artifacts, indent=2)
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.text
+        assert response.json() == {
+            "data": {
+                "number_of_artifacts": 3,
+                "task_ids": ["task_1", "task_2"],
+                "last_update": "2019-06-16T09:05:01Z",
+            },
+            "message": "New Artifact(s) successfully submitted.",
+        }
+        assert mocked_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": artifacts[:2],
+                        "add_task_id_to_custom": False,
+                        "publish_artifacts": True,
+                    },
+                },
+                task_id="task_1",
+                queue="metadata_repository",
+                acks_late=True,
+            ),
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": artifacts[2:],
+                        "add_task_id_to_custom": False,
+                        "publish_artifacts": True,
+                    },
+                },
+                task_id="task_2",
+                queue="metadata_repository",
+                acks_late=True,
+            ),
+        ]
+        assert fake_result_backend.delete.calls == [
+            pretend.call("rstuf-artifacts-stream-staging")
+        ]
+
+    def test_post_stream_ndjson(self, monkeypatch, test_client, fake_datetime):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            artifacts = json.load(f)["artifacts"]
+        mocked_repository_metadata, _ = self.setup_stream(
+            monkeypatch, fake_datetime
+        )
+        content = "\n".join(json.dumps(artifact) for artifact in artifacts)
+
+        response = test_client.post(
+            f"{ARTIFACTS_STREAM_URL}?add_task_id_to_custom=true"
+            "&publish_artifacts=false",
+            content=content,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.text
+        assert response.json() == {
+            "data": {
+                "number_of_artifacts": 3,
+                "task_ids": ["task_1", "task_2"],
+                "last_update": "2019-06-16T09:05:01Z",
+            },
+            "message": (
+                "New Artifact(s) successfully submitted. "
+                "Publishing will be skipped."
+            ),
+        }
+        calls = mocked_repository_metadata.apply_async.calls
+        assert [
+            artifact["info"]["custom"]
+            for call in calls
+            for artifact in call.kwargs["kwargs"]["payload"]["artifacts"]
+        ] == [
+            {"added_by_task_id": "task_1", "key": "value"},
+            {"added_by_task_id": "task_1"},
+            {"added_by_task_id": "task_2"},
+        ]
+        assert calls[1].kwargs["kwargs"]["payload"]["publish_artifacts"] is (
+            False
+        )
+
+    def test_post_stream_invalid_artifact(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            artifacts = json.load(f)["artifacts"]
+        artifacts[2] = {"path": "file3.tar.gz"}
+        mocked_repository_metadata, fake_result_backend = self.setup_stream(
+            monkeypatch, fake_datetime
+        )
+
+        response = test_client.post(
+            ARTIFACTS_STREAM_URL, content=json.dumps(artifacts)
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"]["error"].startswith(
+            "Invalid artifact #3:"
+        )
+        assert mocked_repository_metadata.apply_async.calls == []
+        assert fake_result_backend.delete.calls == [
+            pretend.call("rstuf-artifacts-stream-staging")
+        ]
+        assert fake_result_backend.staged == []
+
+    def test_post_stream_invalid_json(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        mocked_repository_metadata, _ = self.setup_stream(
+            monkeypatch, fake_datetime
+        )
+
+        response = test_client.post(
+            ARTIFACTS_STREAM_URL, content='[{"path": "file1.tar.gz",'
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert mocked_repository_metadata.apply_async.calls == []
+
+    def test_post_stream_empty(self, monkeypatch, test_client, fake_datetime):
+        self.setup_stream(monkeypatch, fake_datetime)
+
+        response = test_client.post(ARTIFACTS_STREAM_URL, content="[]")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json() == {
+            "detail": {
+                "message": "Task not accepted.",
+                "error": "No artifacts",
+            }
+        }
+
+    @pytest.mark.parametrize(
+        "failed_publish, message, task_ids",
+        [
+            (2, "Task partially accepted.", ["task_1"]),
+            (1, "Task not accepted.", []),
+        ],
+    )
+    def test_post_stream_publish_failure(
+        self,
+        monkeypatch,
+        test_client,
+        fake_datetime,
+        failed_publish,
+        message,
+        task_ids,
+    ):
+        with open("tests/data_examples/artifacts/add_payload.json") as f:
+            artifacts = json.load(f)["artifacts"]
+        mocked_repository_metadata, fake_result_backend = self.setup_stream(
+            monkeypatch, fake_datetime
+        )
+        published = []
+
+        def fake_apply_async(**kw):
+            if len(published) + 1 == failed_publish:
+                raise ConnectionError("broker unavailable")
+            published.append(kw["task_id"])
+
+        mocked_repository_metadata.apply_async = fake_apply_async
+
+        response = test_client.post(
+            ARTIFACTS_STREAM_URL, content=json.dumps(artifacts)
+        )
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {
+            "detail": {
+                "message": message,
+                "error": "Failed to submit the tasks: broker unavailable",
+                "task_ids": task_ids,
+            }
+        }
+        assert published == task_ids
+        # the chunks not published are removed
+        assert fake_result_backend.delete.calls == [
+            pretend.call("rstuf-artifacts-stream-staging")
+        ]
+        assert fake_result_backend.staged == []
+
+    def test_post_stream_without_bootstrap(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        mocked_repository_metadata, _ = self.setup_stream(
+            monkeypatch, fake_datetime, bootstrap=False
+        )
+
+        response = test_client.post(ARTIFACTS_STREAM_URL, content="[]")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert mocked_repository_metadata.apply_async.calls == []
 
 
 class TestPostArtifactsDelete:
@@ -253,11 +1003,12 @@ class TestPostArtifactsDelete:
             "artifacts": ["file-v1.0.0_i683.tar.gz", "v0.4.1/file.tar.gz"],
         }
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_repository_metadata = pretend.stub(
             apply_async=pretend.call_recorder(lambda **kw: None)
@@ -302,11 +1053,12 @@ class TestPostArtifactsDelete:
             "publish_artifacts": False,
         }
 
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=True)
-        )
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         mocked_repository_metadata = pretend.stub(
             apply_async=pretend.call_recorder(lambda **kw: None)
@@ -346,15 +1098,56 @@ class TestPostArtifactsDelete:
             )
         ]
 
+    def test_post_delete_coalesced(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        payload = {"artifacts": ["file-v1.0.0_i683.tar.gz"]}
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+
+        async def fake_submit(*a):
+            return "merged_task_id"
+
+        mocked_artifacts_coalescer = pretend.stub(
+            submit=pretend.call_recorder(fake_submit)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.artifacts_coalescer", mocked_artifacts_coalescer
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: "123")
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+
+        response = test_client.post(ARTIFACTS_DELETE_URL, json=payload)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()["data"]["task_id"] == "123"
+        assert mocked_artifacts_coalescer.submit.calls == [
+            pretend.call("remove_artifacts", payload["artifacts"], True, "123")
+        ]
+        assert mocked_repository_metadata.apply_async.calls == []
+
     def test_post_without_bootstrap_delete(self, monkeypatch, test_client):
         payload = {
             "artifacts": ["file-v1.0.0_i683.tar.gz", "v0.4.1/file.tar.gz"]
         }
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state=None)
-        )
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state=None)
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         response = test_client.post(ARTIFACTS_DELETE_URL, json=payload)
 
@@ -373,11 +1166,13 @@ class TestPostArtifactsDelete:
         payload = {
             "artifacts": ["file-v1.0.0_i683.tar.gz", "v0.4.1/file.tar.gz"]
         }
-        mocked_bootstrap_state = pretend.call_recorder(
-            lambda *a: pretend.stub(bootstrap=False, state="signing")
-        )
+
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=False, state="signing")
+
+        mocked_bootstrap_state = pretend.call_recorder(fake_bootstrap_state)
         monkeypatch.setattr(
-            f"{MOCK_PATH}.bootstrap_state", mocked_bootstrap_state
+            f"{MOCK_PATH}.bootstrap_state_async", mocked_bootstrap_state
         )
         response = test_client.post(ARTIFACTS_DELETE_URL, json=payload)
 
@@ -389,6 +1184,41 @@ class TestPostArtifactsDelete:
             }
         }
 
+    def test_post_delete_idempotency_key(
+        self, monkeypatch, test_client, fake_datetime
+    ):
+        async def fake_bootstrap_state():
+            return pretend.stub(bootstrap=True)
+
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.bootstrap_state_async", fake_bootstrap_state
+        )
+        mocked_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: None)
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+        )
+        task_ids = iter(["task_1", "task_2"])
+        monkeypatch.setattr(f"{MOCK_PATH}.get_task_id", lambda: next(task_ids))
+        monkeypatch.setattr(f"{MOCK_PATH}.datetime", fake_datetime)
+        fake_idempotency_backend(monkeypatch)
+
+        payload = {"artifacts": ["file1.tar.gz"]}
+        responses = [
+            test_client.post(
+                ARTIFACTS_DELETE_URL,
+                json=payload,
+                headers={"Idempotency-Key": "k1"},
+            )
+            for _ in range(2)
+        ]
+        assert [r.json()["data"]["task_id"] for r in responses] == [
+            "task_1",
+            "task_1",
+        ]
+        assert len(mocked_repository_metadata.apply_async.calls) == 1
+
     def test_post_missing_required_field_delete(self, test_client):
         payload = {"paths": ["file-v1.0.0_i683.tar.gz", "v0.4.1/file.tar.gz"]}
 
@@ -3,38 +3,106 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
+
 import pretend
 from fastapi import status
 
 TASK_URL = "/api/v1/task/"
+TASK_BULK_URL = "/api/v1/task/bulk"
+TASK_STREAM_URL = "/api/v1/task/stream"
 MOCK_PATH = "repository_service_tuf_api.tasks"
 
 
+def fake_result_backend(results, published=None):
+    """
+    Result Backend stub with the task metas (``results``) as JSON and the
+    task metas ``published`` in the pub/sub as a list of (task id, meta).
+    """
+    data = {
+        key if key.startswith("rstuf") else f"celery-task-meta-{key}": (
+            value if isinstance(value, bytes) else json.dumps(value)
+        )
+        for key, value in results.items()
+    }
+
+    async def mget(keys):
+        return [
+            data.get(key.decode() if isinstance(key, bytes) else key)
+            for key in keys
+        ]
+
+    messages = [
+        {
+            "type": "message",
+            "channel": f"celery-task-meta-{task_id}".encode(),
+            "data": json.dumps(meta),
+        }
+        for task_id, meta in published or []
+    ]
+
+    async def subscribe(*channels):
+        return None
+
+    async def get_message(timeout):
+        return messages.pop(0) if messages else None
+
+    async def aclose():
+        return None
+
+    fake_pubsub = pretend.stub(
+        subscribe=pretend.call_recorder(subscribe),
+        get_message=pretend.call_recorder(get_message),
+        aclose=pretend.call_recorder(aclose),
+    )
+
+    return pretend.stub(
+        mget=pretend.call_recorder(mget),
+        pubsub=pretend.call_recorder(lambda **kw: fake_pubsub),
+        fake_pubsub=fake_pubsub,
+    )
+
+
+def sse_events(body):
+    """Parse a Server-Sent Events body in a list of (event, data)"""
+    events = []
+    for block in body.split("\n\n"):
+        lines = block.splitlines()
+        if not lines or lines[0].startswith(":"):
+            continue
+        events.append(
+            (lines[0].removeprefix("event: "), lines[1].removeprefix("data: "))
+        )
+
+    return events
+
+
 class TestGetTask:
     def test_get(self, test_client, monkeypatch):
-        mocked_task_result = pretend.stub(
-            state="SUCCESS",
-            result={
-                "status": True,
-                "task": "add_artifacts",
-                "last_update": "2023-11-17T09:54:15.762882",
-                "message": "Artifact(s) Added",
-                "details": {
-                    "added_artifacts": [
-                        "file1.tar.gz",
-                        "file2.tar.gz",
-                        "file3.tar.gz",
-                    ],
-                    "invalid_paths": [],
-                    "target_roles": ["bins-3", "bins-2"],
-                },
-            },
-        )
-        mocked_repository_metadata = pretend.stub(
-            AsyncResult=pretend.call_recorder(lambda t: mocked_task_result)
+        mocked_result_backend = fake_result_backend(
+            {
+                "test_id": {
+                    "status": "SUCCESS",
+                    "result": {
+                        "status": True,
+                        "task": "add_artifacts",
+                        "last_update": "2023-11-17T09:54:15.762882",
+                        "message": "Artifact(s) Added",
+                        "details": {
+                            "added_artifacts": [
+                                "file1.tar.gz",
+                                "file2.tar.gz",
+                                "file3.tar.gz",
+                            ],
+                            "invalid_paths": [],
+                            "target_roles": ["bins-3", "bins-2"],
+                        },
+                    },
+                }
+            }
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
 
         test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
@@ -61,19 +129,25 @@ class TestGetTask:
             },
             "message": "Task state.",
         }
-        assert mocked_repository_metadata.AsyncResult.calls == [
-            pretend.call("test_id")
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
         ]
 
     def test_get_result_is_exception(self, test_client, monkeypatch):
-        mocked_task_result = pretend.stub(
-            state="FAILURE", result=ValueError("Failed to load")
-        )
-        mocked_repository_metadata = pretend.stub(
-            AsyncResult=pretend.call_recorder(lambda t: mocked_task_result)
+        mocked_result_backend = fake_result_backend(
+            {
+                "test_id": {
+                    "status": "FAILURE",
+                    "result": {
+                        "exc_type": "ValueError",
+                        "exc_message": ["Failed to load"],
+                        "exc_module": "builtins",
+                    },
+                }
+            }
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
 
         test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
@@ -88,26 +162,27 @@ class TestGetTask:
             },
             "message": "Task state.",
         }
-        assert mocked_repository_metadata.AsyncResult.calls == [
-            pretend.call("test_id")
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
         ]
 
     def test_get_result_is_errored(self, test_client, monkeypatch):
-        mocked_task_result = pretend.stub(
-            state="SUCCESS",
-            result={
-                "status": False,
-                "task": "sign_metadata",
-                "last_update": "2023-11-17T09:54:15.762882",
-                "message": "Signature Failed",
-                "error": "No signatures pending for root",
-            },
-        )
-        mocked_repository_metadata = pretend.stub(
-            AsyncResult=pretend.call_recorder(lambda t: mocked_task_result)
+        mocked_result_backend = fake_result_backend(
+            {
+                "test_id": {
+                    "status": "SUCCESS",
+                    "result": {
+                        "status": False,
+                        "task": "sign_metadata",
+                        "last_update": "2023-11-17T09:54:15.762882",
+                        "message": "Signature Failed",
+                        "error": "No signatures pending for root",
+                    },
+                }
+            }
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
 
         test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
@@ -127,22 +202,18 @@ class TestGetTask:
             },
             "message": "Task state.",
         }
-        assert mocked_repository_metadata.AsyncResult.calls == [
-            pretend.call("test_id")
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
         ]
 
     def test_get_result_success_with_empty_result(
         self, test_client, monkeypatch
     ):
-        mocked_task_result = pretend.stub(
-            state="SUCCESS",
-            result={},
-        )
-        mocked_repository_metadata = pretend.stub(
-            AsyncResult=pretend.call_recorder(lambda t: mocked_task_result)
+        mocked_result_backend = fake_result_backend(
+            {"test_id": {"status": "SUCCESS", "result": {}}}
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
 
         test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
@@ -156,35 +227,575 @@ class TestGetTask:
             },
             "message": "Task state.",
         }
-        assert mocked_repository_metadata.AsyncResult.calls == [
-            pretend.call("test_id")
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
         ]
 
     def test_get_result_failure_with_empty_result(
         self, test_client, monkeypatch
     ):
-        mocked_task_result = pretend.stub(
-            state="FAILURE",
-            result={},
+        mocked_result_backend = fake_result_backend(
+            {"test_id": {"status": "FAILURE", "result": {}}}
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
-        mocked_repository_metadata = pretend.stub(
-            AsyncResult=pretend.call_recorder(lambda t: mocked_task_result)
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
+
+        # an empty exception result is decoded by the backend as None
+        assert test_response.json() == {
+            "data": {"task_id": "test_id", "state": "FAILURE"},
+            "message": "Task state.",
+        }
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
+        ]
+
+    def test_get_coalesced_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-coalesced-task-test_id": b"merged_id",
+                "merged_id": {
+                    "status": "SUCCESS",
+                    "result": {"status": True, "task": "add_artifacts"},
+                },
+            }
         )
         monkeypatch.setattr(
-            f"{MOCK_PATH}.repository_metadata", mocked_repository_metadata
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
         )
 
         test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
         assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json() == {
+            "data": {
+                "task_id": "test_id",
+                "state": "SUCCESS",
+                "result": {"status": True, "task": "add_artifacts"},
+            },
+            "message": "Task state.",
+        }
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"]),
+            pretend.call(
+                ["rstuf-coalesced-task-test_id", "rstuf-sharded-task-test_id"]
+            ),
+            pretend.call([b"celery-task-meta-merged_id"]),
+        ]
+
+    def test_get_sharded_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-sharded-task-test_id": json.dumps(
+                    ["sub_1", "sub_2"]
+                ).encode(),
+                "sub_1": {
+                    "status": "SUCCESS",
+                    "result": {
+                        "task": "add_artifacts",
+                        "status": True,
+                        "message": "Artifact(s) Added",
+                        "last_update": "2023-11-17T09:54:15.762882",
+                        "details": {
+                            "added_artifacts": ["file1.tar.gz"],
+                            "target_roles": ["bins-1f"],
+                        },
+                    },
+                },
+                "sub_2": {
+                    "status": "SUCCESS",
+                    "result": {
+                        "task": "add_artifacts",
+                        "status": True,
+                        "message": "Artifact(s) Added",
+                        "last_update": "2023-11-17T09:54:16.762882",
+                        "details": {
+                            "added_artifacts": ["file2.tar.gz"],
+                            "target_roles": ["bins-16"],
+                        },
+                    },
+                },
+            }
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
 
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
         assert test_response.json() == {
             "data": {
                 "task_id": "test_id",
-                "state": "FAILURE",
-                "result": {},
+                "state": "SUCCESS",
+                "result": {
+                    "task": "add_artifacts",
+                    "status": True,
+                    "message": "Artifact(s) Added",
+                    "last_update": "2023-11-17T09:54:16.762882",
+                    "details": {
+                        "added_artifacts": ["file1.tar.gz", "file2.tar.gz"],
+                        "target_roles": ["bins-1f", "bins-16"],
+                    },
+                },
+            },
+            "message": "Task state.",
+        }
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"]),
+            pretend.call(
+                ["rstuf-coalesced-task-test_id", "rstuf-sharded-task-test_id"]
+            ),
+            pretend.call(
+                [b"celery-task-meta-sub_1", b"celery-task-meta-sub_2"]
+            ),
+        ]
+
+    def test_get_sharded_task_errored(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-sharded-task-test_id": json.dumps(
+                    ["sub_1", "sub_2"]
+                ).encode(),
+                "sub_1": {
+                    "status": "SUCCESS",
+                    "result": {"task": "add_artifacts", "status": True},
+                },
+                "sub_2": {
+                    "status": "SUCCESS",
+                    "result": {
+                        "task": "add_artifacts",
+                        "status": False,
+                        "error": "Failed to update bins-16",
+                    },
+                },
+            }
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json()["data"] == {
+            "task_id": "test_id",
+            "state": "ERRORED",
+            "result": {
+                "task": "add_artifacts",
+                "status": False,
+                "error": "Failed to update bins-16",
+            },
+        }
+
+    def test_get_sharded_task_running(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-sharded-task-test_id": json.dumps(
+                    ["sub_1", "sub_2"]
+                ).encode(),
+                "sub_1": {
+                    "status": "FAILURE",
+                    "result": {
+                        "exc_type": "ValueError",
+                        "exc_message": ["Failed to load"],
+                        "exc_module": "builtins",
+                    },
+                },
+            }
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json()["data"] == {
+            "task_id": "test_id",
+            "state": "STARTED",
+        }
+
+    def test_get_pending_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend({})
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json() == {
+            "data": {"task_id": "test_id", "state": "PENDING"},
+            "message": "Task state.",
+        }
+        assert mocked_result_backend.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"]),
+            pretend.call(
+                ["rstuf-coalesced-task-test_id", "rstuf-sharded-task-test_id"]
+            ),
+        ]
+
+    def test_get_read_replica(self, test_client, monkeypatch):
+        mocked_primary = fake_result_backend({})
+        mocked_replicas = fake_result_backend(
+            {"test_id": {"status": "SUCCESS", "result": {"status": True}}}
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_primary
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_replicas", mocked_replicas
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json()["data"]["state"] == "SUCCESS"
+        assert mocked_replicas.mget.calls == [
+            pretend.call([b"celery-task-meta-test_id"])
+        ]
+        assert mocked_primary.mget.calls == []
+
+        # the long-poll reads from the primary
+        test_client.get(f"{TASK_URL}?task_id=test_id&wait=1")
+
+        assert len(mocked_replicas.mget.calls) == 1
+        assert len(mocked_primary.mget.calls) == 3
+
+
+class TestGetTaskWait:
+    def test_get_wait_state_change(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {"test_id": {"status": "PENDING", "result": None}},
+            published=[
+                (
+                    "test_id",
+                    {"status": "STARTED", "result": {"status": True}},
+                )
+            ],
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id&wait=30")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json() == {
+            "data": {
+                "task_id": "test_id",
+                "state": "STARTED",
+                "result": {"status": True},
             },
             "message": "Task state.",
         }
-        assert mocked_repository_metadata.AsyncResult.calls == [
-            pretend.call("test_id")
+        fake_pubsub = mocked_result_backend.fake_pubsub
+        assert fake_pubsub.subscribe.calls == [
+            pretend.call(b"celery-task-meta-test_id")
+        ]
+        assert len(fake_pubsub.get_message.calls) == 1
+        assert fake_pubsub.aclose.calls == [pretend.call()]
+
+    def test_get_wait_sharded_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-sharded-task-test_id": json.dumps(
+                    ["sub_1", "sub_2"]
+                ).encode(),
+                "sub_1": {"status": "STARTED", "result": None},
+                "sub_2": {"status": "SUCCESS", "result": {"status": True}},
+            },
+            published=[
+                ("sub_1", {"status": "STARTED", "result": {"status": True}}),
+                ("sub_1", {"status": "SUCCESS", "result": {"status": True}}),
+            ],
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id&wait=30")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json() == {
+            "data": {
+                "task_id": "test_id",
+                "state": "SUCCESS",
+                "result": {"status": True},
+            },
+            "message": "Task state.",
+        }
+        fake_pubsub = mocked_result_backend.fake_pubsub
+        assert fake_pubsub.subscribe.calls == [
+            pretend.call(b"celery-task-meta-sub_1", b"celery-task-meta-sub_2")
+        ]
+        # the merged state doesn't change with the first sub-task meta
+        assert len(fake_pubsub.get_message.calls) == 2
+
+    def test_get_wait_finished_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {"test_id": {"status": "SUCCESS", "result": {"status": True}}}
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id&wait=30")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json()["data"]["state"] == "SUCCESS"
+        assert mocked_result_backend.fake_pubsub.get_message.calls == []
+
+    def test_get_wait_timeout(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {"test_id": {"status": "PENDING", "result": None}}
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+        fake_time = pretend.stub(
+            monotonic=pretend.call_recorder(
+                lambda: len(fake_time.monotonic.calls) * 10
+            )
+        )
+        monkeypatch.setattr(f"{MOCK_PATH}.time", fake_time)
+
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id&wait=10")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json()["data"]["state"] == "PENDING"
+        assert mocked_result_backend.fake_pubsub.get_message.calls == []
+
+    def test_get_wait_too_long(self, test_client):
+        test_response = test_client.get(f"{TASK_URL}?task_id=test_id&wait=61")
+        assert (
+            test_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+
+class TestGetTaskStream:
+    def test_get_stream(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "id_1": {"status": "SUCCESS", "result": {"status": True}},
+                "id_2": {"status": "PENDING", "result": None},
+                "rstuf-coalesced-task-id_3": b"id_2",
+            },
+            published=[
+                ("id_2", {"status": "STARTED", "result": None}),
+                ("id_2", {"status": "STARTED", "result": None}),
+                ("id_2", {"status": "SUCCESS", "result": {"status": False}}),
+            ],
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(
+            f"{TASK_STREAM_URL}?task_id=id_1&task_id=id_2&task_id=id_3"
+        )
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.headers["content-type"].startswith(
+            "text/event-stream"
+        )
+        events = [
+            (event, json.loads(data))
+            for event, data in sse_events(test_response.text)
+        ]
+        assert events == [
+            (
+                "state",
+                {
+                    "task_id": "id_1",
+                    "state": "SUCCESS",
+                    "result": {"status": True},
+                },
+            ),
+            ("state", {"task_id": "id_2", "state": "PENDING"}),
+            ("state", {"task_id": "id_3", "state": "PENDING"}),
+            ("state", {"task_id": "id_2", "state": "STARTED"}),
+            ("state", {"task_id": "id_3", "state": "STARTED"}),
+            (
+                "state",
+                {
+                    "task_id": "id_2",
+                    "state": "ERRORED",
+                    "result": {"status": False},
+                },
+            ),
+            (
+                "state",
+                {
+                    "task_id": "id_3",
+                    "state": "ERRORED",
+                    "result": {"status": False},
+                },
+            ),
+            ("end", {}),
+        ]
+        fake_pubsub = mocked_result_backend.fake_pubsub
+        assert fake_pubsub.aclose.calls == [pretend.call()]
+
+    def test_get_stream_sharded_task(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "rstuf-sharded-task-id_1": json.dumps(
+                    ["sub_1", "sub_2"]
+                ).encode(),
+                "sub_1": {"status": "PENDING", "result": None},
+                "sub_2": {"status": "PENDING", "result": None},
+            },
+            published=[
+                ("sub_1", {"status": "SUCCESS", "result": {"status": True}}),
+                ("sub_2", {"status": "SUCCESS", "result": {"status": True}}),
+            ],
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_STREAM_URL}?task_id=id_1")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert [
+            (event, json.loads(data))
+            for event, data in sse_events(test_response.text)
+        ] == [
+            ("state", {"task_id": "id_1", "state": "PENDING"}),
+            ("state", {"task_id": "id_1", "state": "STARTED"}),
+            (
+                "state",
+                {
+                    "task_id": "id_1",
+                    "state": "SUCCESS",
+                    "result": {"status": True},
+                },
+            ),
+            ("end", {}),
+        ]
+
+    def test_get_stream_keep_alive(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {"id_1": {"status": "PENDING", "result": None}}
+        )
+        fake_pubsub = mocked_result_backend.fake_pubsub
+        published = [
+            None,
+            {
+                "type": "message",
+                "channel": b"celery-task-meta-id_1",
+                "data": json.dumps({"status": "REVOKED", "result": None}),
+            },
+        ]
+
+        async def get_message(timeout):
+            return published.pop(0)
+
+        fake_pubsub.get_message = pretend.call_recorder(get_message)
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+
+        test_response = test_client.get(f"{TASK_STREAM_URL}?task_id=id_1")
+        assert test_response.status_code == status.HTTP_200_OK
+        assert ": keep-alive" in test_response.text
+        assert sse_events(test_response.text) == [
+            ("state", '{"task_id":"id_1","state":"PENDING"}'),
+            ("state", '{"task_id":"id_1","state":"REVOKED"}'),
+            ("end", "{}"),
+        ]
+        assert fake_pubsub.get_message.calls == [
+            pretend.call(timeout=15),
+            pretend.call(timeout=15),
+        ]
+
+    def test_get_stream_missing_task_id(self, test_client):
+        test_response = test_client.get(TASK_STREAM_URL)
+        assert (
+            test_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+
+class TestPostTaskBulk:
+    def test_post_bulk(self, test_client, monkeypatch):
+        mocked_result_backend = fake_result_backend(
+            {
+                "id_1": {
+                    "status": "SUCCESS",
+                    "result": {"status": True, "task": "add_artifacts"},
+                },
+                "id_2": {
+                    "status": "SUCCESS",
+                    "result": {"status": False, "task": "add_artifacts"},
+                },
+                "id_3": {
+                    "status": "FAILURE",
+                    "result": {
+                        "exc_type": "ValueError",
+                        "exc_message": ["Failed to load"],
+                        "exc_module": "builtins",
+                    },
+                },
+                "rstuf-coalesced-task-id_5": b"id_1",
+            }
+        )
+        monkeypatch.setattr(
+            f"{MOCK_PATH}.result_backend_async", mocked_result_backend
+        )
+        payload = {"task_ids": ["id_1", "id_2", "id_3", "id_4", "id_5"]}
+
+        test_response = test_client.post(TASK_BULK_URL, json=payload)
+        assert test_response.status_code == status.HTTP_200_OK
+        assert test_response.json() == {
+            "data": [
+                {
+                    "task_id": "id_1",
+                    "state": "SUCCESS",
+                    "result": {"status": True, "task": "add_artifacts"},
+                },
+                {
+                    "task_id": "id_2",
+                    "state": "ERRORED",
+                    "result": {"status": False, "task": "add_artifacts"},
+                },
+                {
+                    "task_id": "id_3",
+                    "state": "FAILURE",
+                    "result": {"message": "Failed to load"},
+                },
+                {"task_id": "id_4", "state": "PENDING"},
+                {
+                    "task_id": "id_5",
+                    "state": "SUCCESS",
+                    "result": {"status": True, "task": "add_artifacts"},
+                },
+            ],
+            "message": "Tasks state.",
+        }
+        assert mocked_result_backend.mget.calls == [
+            pretend.call(
+                [
+                    b"celery-task-meta-id_1",
+                    b"celery-task-meta-id_2",
+                    b"celery-task-meta-id_3",
+                    b"celery-task-meta-id_4",
+                    b"celery-task-meta-id_5",
+                ]
+            ),
+            pretend.call(
+                [
+                    "rstuf-coalesced-task-id_4",
+                    "rstuf-coalesced-task-id_5",
+                    "rstuf-sharded-task-id_4",
+                    "rstuf-sharded-task-id_5",
+                ]
+            ),
+            pretend.call([b"celery-task-meta-id_1"]),
         ]
+
+    def test_post_bulk_empty_task_ids(self, test_client):
+        test_response = test_client.post(TASK_BULK_URL, json={"task_ids": []})
+        assert (
+            test_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+    def test_post_bulk_too_many_task_ids(self, test_client):
+        payload = {"task_ids": ["id"] * 501}
+
+        test_response = test_client.post(TASK_BULK_URL, json=payload)
+        assert (
+            test_response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
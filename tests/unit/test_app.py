@@ -2,9 +2,32 @@
 # SPDX-FileCopyrightText: 2022-2023 VMware Inc
 #
 # SPDX-License-Identifier: MIT
+import asyncio
+import json
+import os
+import subprocess
+import sys
 
+import pretend
 from fastapi import status
 
+# Records the files opened and the network connections on import
+IMPORT_AUDIT = """
+import json, sys
+
+events = []
+
+def audit(event, args):
+    if event == "open" and "data_examples" in str(args[0]):
+        events.append([event, str(args[0])])
+    elif event == "socket.connect":
+        events.append([event, str(args[1])])
+
+sys.addaudithook(audit)
+import app
+print(json.dumps(events))
+"""
+
 
 class TestAPP:
     def test_root(self, test_client):
@@ -49,3 +72,114 @@ class TestAPP:
             ),
             ("root", 20, "Disabled endpoint /api/v1/artifacts/"),
         ]
+
+    def test_import_app_without_io(self):
+        # The OpenAPI examples and the repository settings are loaded on use
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_AUDIT],
+            # a resolvable Redis host, so connections are audited
+            env={**os.environ, "RSTUF_REDIS_SERVER": "redis://127.0.0.1"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert json.loads(result.stdout.splitlines()[-1]) == []
+
+    def test_lifespan(self, monkeypatch, caplog):
+        import app
+
+        async def fake_bootstrap_state_async():
+            return pretend.stub(task_id="task_id")
+
+        monkeypatch.setattr(
+            app, "bootstrap_state_async", fake_bootstrap_state_async
+        )
+        fake_watchdog = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(app, "start_bootstrap_watchdog", fake_watchdog)
+        fake_openapi_document = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(app, "openapi_document", fake_openapi_document)
+        caplog.set_level(app.logging.INFO)
+
+        async def run_lifespan():
+            async with app.lifespan(app.rstuf_app):
+                pass
+
+        asyncio.run(run_lifespan())
+
+        assert fake_watchdog.calls == [pretend.call()]
+        assert fake_openapi_document.calls == [pretend.call()]
+        assert ("root", 20, "Bootstrap ID: task_id") in caplog.record_tuples
+
+    def test_lifespan_shared_settings(self, monkeypatch):
+        import app
+
+        async def fake_bootstrap_state_async():
+            return pretend.stub(task_id="task_id")
+
+        monkeypatch.setattr(
+            app, "bootstrap_state_async", fake_bootstrap_state_async
+        )
+        monkeypatch.setattr(app, "start_bootstrap_watchdog", lambda: None)
+        monkeypatch.setattr(app, "openapi_document", lambda: None)
+        for ttl in [
+            "BOOTSTRAP_STATE_CACHE_TTL",
+            "CONFIG_CACHE_TTL",
+            "METADATA_SIGN_CACHE_TTL",
+            "SETTINGS_SNAPSHOT_TTL",
+            "TOPOLOGY_CACHE_TTL",
+        ]:
+            monkeypatch.setattr(app, ttl, 0)
+        fake_refresher = pretend.stub(
+            start=pretend.call_recorder(lambda: None)
+        )
+        monkeypatch.setattr(app, "shared_settings_refresher", fake_refresher)
+        fake_listener = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(app, "start_settings_listener", fake_listener)
+
+        async def run_lifespan():
+            async with app.lifespan(app.rstuf_app):
+                pass
+
+        asyncio.run(run_lifespan())
+
+        # the shared snapshot is invalidated on the settings changes
+        assert fake_listener.calls == [pretend.call()]
+        assert fake_refresher.start.calls == [pretend.call()]
+
+    def test_openapi_document(self, monkeypatch):
+        import app
+
+        monkeypatch.setattr(app, "_openapi_document", None)
+        fake_openapi = pretend.call_recorder(lambda: {"openapi": "3.0.0"})
+        monkeypatch.setattr(app.rstuf_app, "openapi", fake_openapi)
+
+        document = app.openapi_document()
+
+        assert document.content == b'{"openapi":"3.0.0"}'
+        assert document.media_type == "application/json"
+        # generated once
+        assert app.openapi_document() is document
+        assert fake_openapi.calls == [pretend.call()]
+
+    def test_openapi_json(self, monkeypatch, test_client):
+        import app
+
+        document = app.PrecompressedContent(
+            b'{"openapi":"3.0.0"}', "application/json"
+        )
+        monkeypatch.setattr(app, "_openapi_document", document)
+
+        response = test_client.get("/openapi.json")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"openapi": "3.0.0"}
+        assert response.headers["content-encoding"] in ["gzip", "br"]
+        assert response.headers["etag"] == document.etag
+
+        response = test_client.get(
+            "/openapi.json", headers={"If-None-Match": document.etag}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
@@ -2,80 +2,843 @@
 # SPDX-FileCopyrightText: 2022-2023 VMware Inc
 #
 # SPDX-License-Identifier: MIT
+import asyncio
+import os
+import time
+
 import pretend
+import pytest
+from celery import Celery
+from kombu import Connection, pools
 
 import repository_service_tuf_api
+from repository_service_tuf_api.broker import ProducerPool
+from repository_service_tuf_api.redis_modes import RedisConnections
+from repository_service_tuf_api.shared_settings import (
+    SharedSettingsFile,
+    SharedSettingsRefresher,
+)
 
 
 class TestInit:
-    def test_pre_lock_bootstrap(self):
-        fake_settings = pretend.stub(
-            current_env="test", as_dict=pretend.call_recorder(lambda **kw: {})
+    def test_pre_lock_bootstrap(self, monkeypatch):
+        fake_bootstrap_lock = pretend.stub(
+            acquire=pretend.call_recorder(
+                lambda keys, value: "pre-fake_task_id"
+            )
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "_bootstrap_lock", fake_bootstrap_lock
         )
-        repository_service_tuf_api.settings_repository = fake_settings
-        repository_service_tuf_api.redis_loader.write = pretend.call_recorder(
-            lambda *a: fake_settings
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        fake_notify = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            repository_service_tuf_api, "notify_settings_change", fake_notify
         )
 
-        repository_service_tuf_api.pre_lock_bootstrap("fake_task_id")
+        result = repository_service_tuf_api.pre_lock_bootstrap("fake_task_id")
 
-        assert fake_settings.as_dict.calls == [pretend.call(env="test")]
-        assert repository_service_tuf_api.redis_loader.write.calls == [
-            pretend.call(fake_settings, {"BOOTSTRAP": "pre-fake_task_id"})
+        assert result == repository_service_tuf_api.BootstrapState(
+            bootstrap=False, state="pre", task_id="fake_task_id"
+        )
+        assert fake_bootstrap_lock.acquire.calls == [
+            pretend.call(
+                ["HOLDER", "rstuf-settings-version"], "pre-fake_task_id"
+            )
         ]
+        assert fake_notify.calls == [pretend.call()]
+
+    def test_pre_lock_bootstrap_locked(self, monkeypatch):
+        fake_bootstrap_lock = pretend.stub(
+            acquire=lambda keys, value: "signing-other_task_id"
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "_bootstrap_lock", fake_bootstrap_lock
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        fake_notify = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            repository_service_tuf_api, "notify_settings_change", fake_notify
+        )
+
+        result = repository_service_tuf_api.pre_lock_bootstrap("fake_task_id")
+
+        assert result == repository_service_tuf_api.BootstrapState(
+            bootstrap=False, state="signing", task_id="other_task_id"
+        )
+        assert fake_notify.calls == []
 
-    def test_release_bootstrap_lock(self):
-        fake_settings = pretend.stub(
-            current_env="test", as_dict=pretend.call_recorder(lambda **kw: {})
+    @pytest.mark.parametrize("changed", [True, False])
+    def test_transition_bootstrap(self, monkeypatch, changed):
+        fake_bootstrap_lock = pretend.stub(
+            transition=pretend.call_recorder(
+                lambda keys, expected, value: changed
+            )
         )
-        repository_service_tuf_api.settings_repository = fake_settings
-        repository_service_tuf_api.redis_loader.write = pretend.call_recorder(
-            lambda *a: fake_settings
+        monkeypatch.setattr(
+            repository_service_tuf_api, "_bootstrap_lock", fake_bootstrap_lock
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        fake_notify = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            repository_service_tuf_api, "notify_settings_change", fake_notify
+        )
+
+        result = repository_service_tuf_api.transition_bootstrap(
+            [None, "pre-fake_task_id"], "signing-fake_task_id"
         )
 
-        repository_service_tuf_api.release_bootstrap_lock()
+        assert result is changed
+        assert fake_bootstrap_lock.transition.calls == [
+            pretend.call(
+                ["HOLDER", "rstuf-settings-version"],
+                [None, "pre-fake_task_id"],
+                "signing-fake_task_id",
+            )
+        ]
+        assert fake_notify.calls == ([pretend.call()] if changed else [])
+
+    def test_release_bootstrap_lock(self, monkeypatch):
+        fake_transition_bootstrap = pretend.call_recorder(lambda *a: True)
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "transition_bootstrap",
+            fake_transition_bootstrap,
+        )
 
-        assert fake_settings.as_dict.calls == [pretend.call(env="test")]
-        assert repository_service_tuf_api.redis_loader.write.calls == [
-            pretend.call(fake_settings, {"BOOTSTRAP": None})
+        assert repository_service_tuf_api.release_bootstrap_lock("task_id")
+        assert fake_transition_bootstrap.calls == [
+            pretend.call(["pre-task_id", "signing-task_id"], None)
         ]
 
-    def test_bootstrap_state(self):
-        repository_service_tuf_api.settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: None),
+    def fake_bootstrap_setting(self, monkeypatch, bootstrap):
+        fake_settings_redis = pretend.stub(
+            hget=pretend.call_recorder(lambda *a: bootstrap)
         )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        return fake_settings_redis.hget
+
+    def test_bootstrap_state(self, monkeypatch):
+        self.fake_bootstrap_setting(monkeypatch, None)
         result = repository_service_tuf_api.bootstrap_state()
         assert result == repository_service_tuf_api.BootstrapState(
             False, None, None
         )
 
-    def test_bootstrap_state_pre(self):
-        repository_service_tuf_api.settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: "pre-<task_id>"),
-        )
+    def test_bootstrap_state_pre(self, monkeypatch):
+        self.fake_bootstrap_setting(monkeypatch, "pre-<task_id>")
         result = repository_service_tuf_api.bootstrap_state()
         assert result == repository_service_tuf_api.BootstrapState(
             False, "pre", "<task_id>"
         )
 
-    def test_bootstrap_state_signing(self):
-        repository_service_tuf_api.settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: "signing-<task_id>"),
+    def test_bootstrap_state_signing(self, monkeypatch):
+        self.fake_bootstrap_setting(monkeypatch, "signing-<task_id>")
+        result = repository_service_tuf_api.bootstrap_state()
+        assert result == repository_service_tuf_api.BootstrapState(
+            False, "signing", "<task_id>"
         )
+
+    def test_bootstrap_state_finished(self, monkeypatch):
+        self.fake_bootstrap_setting(monkeypatch, "<task_id>")
         result = repository_service_tuf_api.bootstrap_state()
+        assert result == repository_service_tuf_api.BootstrapState(
+            True, "finished", "<task_id>"
+        )
+
+    def test_bootstrap_state_finished_cached(self, monkeypatch):
+        fake_bootstrap_setting = self.fake_bootstrap_setting(
+            monkeypatch, "<task_id>"
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "BOOTSTRAP_STATE_CACHE_TTL", 60
+        )
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+        first = repository_service_tuf_api.bootstrap_state()
+        second = repository_service_tuf_api.bootstrap_state()
+
+        assert (
+            first
+            == second
+            == repository_service_tuf_api.BootstrapState(
+                True, "finished", "<task_id>"
+            )
+        )
+        assert first is not second
+        # Only the `BOOTSTRAP` field is read
+        assert fake_bootstrap_setting.calls == [
+            pretend.call("HOLDER", "BOOTSTRAP")
+        ]
+
+        repository_service_tuf_api.notify_settings_change()
+        repository_service_tuf_api.bootstrap_state()
+
+        assert len(fake_bootstrap_setting.calls) == 2
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+    def test_bootstrap_state_invalidated_while_reading(self, monkeypatch):
+        monkeypatch.setattr(
+            repository_service_tuf_api, "BOOTSTRAP_STATE_CACHE_TTL", 60
+        )
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+        def fake_hget(*a):
+            # the settings change while the old value is read
+            repository_service_tuf_api.notify_settings_change()
+            return "<task_id>"
+
+        fake_settings_redis = pretend.stub(
+            hget=pretend.call_recorder(fake_hget)
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        repository_service_tuf_api.bootstrap_state()
+        repository_service_tuf_api.bootstrap_state()
+
+        # the value read before the invalidation isn't cached
+        assert len(fake_settings_redis.hget.calls) == 2
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+    def test_bootstrap_state_intermediate_not_cached(self, monkeypatch):
+        fake_bootstrap_setting = self.fake_bootstrap_setting(
+            monkeypatch, "pre-<task_id>"
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "BOOTSTRAP_STATE_CACHE_TTL", 60
+        )
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+        repository_service_tuf_api.bootstrap_state()
+        repository_service_tuf_api.bootstrap_state()
+
+        assert len(fake_bootstrap_setting.calls) == 2
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, None),
+            ("@none ", None),
+            ("pre-<task_id>", "pre-<task_id>"),
+            ("@int 32", 32),
+            ("@bool true", True),
+            ('@json {"k": ["v"]}', {"k": ["v"]}),
+            ('@json ["bins-0", "bins-1"]', ["bins-0", "bins-1"]),
+        ],
+    )
+    def test_parse_setting(self, value, expected):
+        result = repository_service_tuf_api.parse_setting(value)
+
+        assert result == expected
+        assert type(result) is type(expected)
+
+    def fake_settings_redis(self, monkeypatch, values, versions=None):
+        versions = iter(versions or [])
+        fake_settings_redis = pretend.stub(
+            hgetall=pretend.call_recorder(lambda key: values),
+            get=pretend.call_recorder(lambda key: next(versions)),
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        repository_service_tuf_api.invalidate_settings_snapshot()
+
+        return fake_settings_redis
+
+    def test_repository_settings(self, monkeypatch):
+        fake_settings_redis = self.fake_settings_redis(
+            monkeypatch,
+            {"BOOTSTRAP": "<task_id>", "TRUSTED_ROOT": '@json {"k": ["v"]}'},
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "SETTINGS_SNAPSHOT_TTL", 0
+        )
+
+        snapshot = repository_service_tuf_api.repository_settings()
+
+        assert snapshot.to_dict() == {
+            "BOOTSTRAP": "<task_id>",
+            "TRUSTED_ROOT": {"k": ["v"]},
+        }
+        assert snapshot.bootstrap_state() == (
+            repository_service_tuf_api.BootstrapState(
+                True, "finished", "<task_id>"
+            )
+        )
+        # the values are copied on read
+        snapshot.get("trusted_root")["k"].append("changed")
+        assert snapshot.get("TRUSTED_ROOT") == {"k": ["v"]}
+        with pytest.raises(TypeError):
+            snapshot.data["BOOTSTRAP"] = None
+
+        # a new snapshot on every use
+        assert repository_service_tuf_api.repository_settings() is not snapshot
+        assert fake_settings_redis.hgetall.calls == [
+            pretend.call("HOLDER"),
+            pretend.call("HOLDER"),
+        ]
+        assert fake_settings_redis.get.calls == []
+
+    def test_repository_settings_reused(self, monkeypatch):
+        fake_settings_redis = self.fake_settings_redis(
+            monkeypatch, {"BOOTSTRAP": "<task_id>"}, ["1", "1", "2", "2"]
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "SETTINGS_SNAPSHOT_TTL", 60
+        )
+
+        # version 1 (loaded), version 1 (reused), version 2 (loaded)
+        snapshots = [
+            repository_service_tuf_api.repository_settings() for _ in range(3)
+        ]
+
+        assert snapshots[0] is snapshots[1]
+        assert snapshots[2] is not snapshots[1]
+        assert snapshots[2].version == "2"
+        assert len(fake_settings_redis.hgetall.calls) == 2
+
+        repository_service_tuf_api.notify_settings_change()
+        repository_service_tuf_api.repository_settings()
+
+        assert len(fake_settings_redis.hgetall.calls) == 3
+        repository_service_tuf_api.invalidate_settings_snapshot()
+
+    def test_repository_settings_read_replicas(self, monkeypatch):
+        def fake_replica(version, values):
+            return pretend.stub(
+                get=pretend.call_recorder(lambda key: version),
+                hgetall=pretend.call_recorder(lambda key: values),
+            )
+
+        # replica 1 is behind replica 0
+        replica_0 = fake_replica("2", {"BOOTSTRAP": "<task_id>"})
+        replica_1 = fake_replica("1", {"BOOTSTRAP": "pre-<task_id>"})
+        picks = iter([0, 1])
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "settings_redis_replicas",
+            repository_service_tuf_api.ReadReplicas(
+                pretend.stub(),
+                [replica_0, replica_1],
+                pretend.stub(pick=lambda: next(picks)),
+            ),
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "SETTINGS_SNAPSHOT_TTL", 60
+        )
+        repository_service_tuf_api.invalidate_settings_snapshot()
+
+        snapshot = repository_service_tuf_api.repository_settings()
+
+        # the version and the settings are read from the same replica
+        assert snapshot.version == "2"
+        assert snapshot.to_dict() == {"BOOTSTRAP": "<task_id>"}
+        assert len(replica_0.get.calls) == 1
+        assert len(replica_0.hgetall.calls) == 1
+        assert replica_1.get.calls == []
+        assert replica_1.hgetall.calls == []
+        repository_service_tuf_api.invalidate_settings_snapshot()
+
+    def test_start_settings_listener(self, monkeypatch):
+        fake_start = pretend.call_recorder(lambda *a: None)
+        monkeypatch.setattr(
+            repository_service_tuf_api, "_start_settings_listener", fake_start
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        repository_service_tuf_api.start_settings_listener()
+
+        assert fake_start.calls == [
+            pretend.call(
+                repository_service_tuf_api.redis_connections, 1, "HOLDER"
+            )
+        ]
+
+    def test_bootstrap_state_async(self, monkeypatch):
+        async def fake_hget(*a):
+            return "signing-<task_id>"
+
+        fake_settings_redis = pretend.stub(
+            hget=pretend.call_recorder(fake_hget)
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "settings_redis_async",
+            fake_settings_redis,
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        result = asyncio.run(
+            repository_service_tuf_api.bootstrap_state_async()
+        )
+
         assert result == repository_service_tuf_api.BootstrapState(
             False, "signing", "<task_id>"
         )
+        assert fake_settings_redis.hget.calls == [
+            pretend.call("HOLDER", "BOOTSTRAP")
+        ]
 
-    def test_bootstrap_state_finished(self):
-        repository_service_tuf_api.settings_repository = pretend.stub(
-            reload=pretend.call_recorder(lambda: None),
-            get_fresh=pretend.call_recorder(lambda *a: "<task_id>"),
+    def test_bootstrap_state_async_none(self, monkeypatch):
+        async def fake_hget(*a):
+            return "@none "
+
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "settings_redis_async",
+            pretend.stub(hget=fake_hget),
         )
-        result = repository_service_tuf_api.bootstrap_state()
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        result = asyncio.run(
+            repository_service_tuf_api.bootstrap_state_async()
+        )
+
         assert result == repository_service_tuf_api.BootstrapState(
+            False, None, None
+        )
+
+    def test_publish_task(self):
+        fake_task = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: "result")
+        )
+
+        result = asyncio.run(
+            repository_service_tuf_api.publish_task(
+                fake_task, kwargs={"action": "test"}, task_id="id"
+            )
+        )
+
+        assert result == "result"
+        assert fake_task.apply_async.calls == [
+            pretend.call(kwargs={"action": "test"}, task_id="id")
+        ]
+
+    def test_settings_version(self, monkeypatch):
+        fake_settings_redis = pretend.stub(
+            get=pretend.call_recorder(lambda key: "3")
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+
+        assert repository_service_tuf_api.settings_version() == "3"
+        assert fake_settings_redis.get.calls == [
+            pretend.call("rstuf-settings-version")
+        ]
+
+    def test_settings_version_redis_cluster(self, monkeypatch):
+        fake_settings_redis = pretend.stub(
+            get=pretend.call_recorder(lambda key: "3")
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "redis_connections",
+            RedisConnections("cluster", "redis", 6379),
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        assert repository_service_tuf_api.settings_version() == "3"
+        assert fake_settings_redis.get.calls == [
+            pretend.call("rstuf-settings-version{HOLDER}")
+        ]
+
+    def test_settings_version_read_replica(self, monkeypatch):
+        fake_replicas = pretend.stub(
+            get=pretend.call_recorder(lambda key: "3")
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "settings_redis_replicas",
+            fake_replicas,
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", pretend.stub()
+        )
+
+        assert repository_service_tuf_api.settings_version() == "3"
+        assert fake_replicas.get.calls == [
+            pretend.call("rstuf-settings-version")
+        ]
+
+    def test_start_replicas_monitor(self, monkeypatch):
+        fake_replicas_state = pretend.stub(
+            start_monitor=pretend.call_recorder(lambda *a: None)
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "replicas_state", fake_replicas_state
+        )
+
+        repository_service_tuf_api.start_replicas_monitor()
+
+        assert fake_replicas_state.start_monitor.calls == [
+            pretend.call(
+                repository_service_tuf_api.settings_redis,
+                repository_service_tuf_api.REDIS_REPLICA_CHECK_INTERVAL,
+            )
+        ]
+
+    def test_repository_topology(self, monkeypatch):
+        fake_settings_redis = pretend.stub(
+            hmget=pretend.call_recorder(
+                lambda holder, names: ["@bool false", '@json ["foo", "bar"]']
+            )
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        topology = repository_service_tuf_api.repository_topology()
+
+        assert topology == repository_service_tuf_api.RepositoryTopology(
+            False, ("foo", "bar")
+        )
+        assert topology.bins_used is False
+        assert topology.online_roles() == [
+            "snapshot",
+            "timestamp",
+            "foo",
+            "bar",
+        ]
+        assert topology.is_online_role("foo") is True
+        assert topology.is_online_role("targets") is False
+        assert topology.is_online_role("baz") is False
+        assert fake_settings_redis.hmget.calls == [
+            pretend.call(
+                "HOLDER", ["TARGETS_ONLINE_KEY", "DELEGATED_ROLES_NAMES"]
+            )
+        ]
+
+    def test_repository_topology_defaults(self, monkeypatch):
+        fake_settings_redis = pretend.stub(
+            hmget=pretend.call_recorder(lambda holder, names: [None, None])
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        topology = repository_service_tuf_api.repository_topology()
+
+        assert topology.targets_online is True
+        assert topology.bins_used is False
+        assert topology.online_roles() == ["snapshot", "timestamp", "targets"]
+
+    def test_repository_topology_cached(self, monkeypatch):
+        fake_settings_redis = pretend.stub(
+            hmget=pretend.call_recorder(
+                lambda holder, names: ["@bool true", '@json ["bins-0"]']
+            )
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+        versions = iter(["1", "1", "2"])
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "settings_version",
+            lambda: next(versions),
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "TOPOLOGY_CACHE_TTL", 60
+        )
+        repository_service_tuf_api.invalidate_topology_cache()
+
+        # version 1 (loaded), version 1 (cached), version 2 (loaded)
+        first = repository_service_tuf_api.repository_topology()
+        second = repository_service_tuf_api.repository_topology()
+        third = repository_service_tuf_api.repository_topology()
+
+        assert first is second
+        assert first == third
+        assert len(fake_settings_redis.hmget.calls) == 2
+
+        repository_service_tuf_api.notify_settings_change()
+
+        assert repository_service_tuf_api._topology_cache.get("2") is None
+
+    @pytest.fixture
+    def shared_file(self, monkeypatch, tmp_path):
+        shared_file = SharedSettingsFile(
+            str(tmp_path / "rstuf-api-settings"), 65536
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "shared_settings_file", shared_file
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "_shared_settings_snapshot", None
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_holder", lambda: "HOLDER"
+        )
+
+        return shared_file
+
+    def test_shared_settings_refresher(self, monkeypatch, shared_file):
+        fake_settings_redis = pretend.stub(
+            get=pretend.call_recorder(lambda key: "1"),
+            hgetall=pretend.call_recorder(
+                lambda key: {
+                    "BOOTSTRAP": "<task_id>",
+                    "TARGETS_ONLINE_KEY": "@bool false",
+                    "DELEGATED_ROLES_NAMES": '@json ["bins-0", "bins-1"]',
+                    "ROOT_SIGNING": "@none ",
+                }
+            ),
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", fake_settings_redis
+        )
+        refresher = SharedSettingsRefresher(
+            shared_file,
+            repository_service_tuf_api.settings_version,
+            repository_service_tuf_api._read_settings_values,
+            repository_service_tuf_api.pinned_settings_reads,
+            reload_interval=10,
+            refresh_interval=1,
+        )
+
+        refresher.refresh()
+        snapshot = repository_service_tuf_api.shared_repository_settings()
+
+        assert snapshot.version == "1"
+        assert snapshot.to_dict() == {
+            "BOOTSTRAP": "<task_id>",
+            "TARGETS_ONLINE_KEY": False,
+            "DELEGATED_ROLES_NAMES": ["bins-0", "bins-1"],
+            "ROOT_SIGNING": None,
+        }
+        assert (
+            snapshot.topology
+            == repository_service_tuf_api.RepositoryTopology(
+                False, ("bins-0", "bins-1")
+            )
+        )
+        # parsed once by process and snapshot
+        assert repository_service_tuf_api.shared_repository_settings() is (
+            snapshot
+        )
+        assert fake_settings_redis.get.calls == [
+            pretend.call("rstuf-settings-version")
+        ]
+        assert fake_settings_redis.hgetall.calls == [pretend.call("HOLDER")]
+
+        # the change is detected by the settings listener
+        repository_service_tuf_api.notify_settings_change()
+
+        assert repository_service_tuf_api.shared_repository_settings() is None
+
+    def test_shared_repository_settings_not_refreshed(
+        self, monkeypatch, shared_file
+    ):
+        shared_file.publish(
+            b'{"version": null, "settings": {"BOOTSTRAP": "id"}}', None
+        )
+        assert repository_service_tuf_api.shared_repository_settings()
+
+        # no refresher heartbeat
+        later = (
+            time.time()
+            + repository_service_tuf_api.SHARED_SETTINGS_MAX_AGE
+            + 1
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api.time, "time", lambda: later
+        )
+
+        assert repository_service_tuf_api.shared_repository_settings() is None
+
+    def test_shared_repository_settings_disabled(self, monkeypatch):
+        monkeypatch.setattr(
+            repository_service_tuf_api, "shared_settings_file", None
+        )
+
+        assert repository_service_tuf_api.shared_repository_settings() is None
+        # no-op
+        repository_service_tuf_api.invalidate_shared_settings()
+
+    def test_shared_repository_settings_used(self, monkeypatch, shared_file):
+        shared_file.publish(
+            b'{"version": "1", "settings": {"BOOTSTRAP": "<task_id>"}}', None
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis", pretend.stub()
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis_async", pretend.stub()
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "BOOTSTRAP_STATE_CACHE_TTL", 0
+        )
+        repository_service_tuf_api.invalidate_bootstrap_state_cache()
+
+        snapshot = repository_service_tuf_api.repository_settings()
+
+        assert snapshot.version == "1"
+        assert repository_service_tuf_api.bootstrap_state() == (
+            repository_service_tuf_api.BootstrapState(
+                True, "finished", "<task_id>"
+            )
+        )
+        assert asyncio.run(
+            repository_service_tuf_api.bootstrap_state_async()
+        ) == repository_service_tuf_api.BootstrapState(
             True, "finished", "<task_id>"
         )
+        assert repository_service_tuf_api.repository_topology() == (
+            repository_service_tuf_api.RepositoryTopology(True, ())
+        )
+
+    def test_after_fork(self, monkeypatch):
+        fake_redis = pretend.stub(
+            connection_pool=pretend.stub(
+                reset=pretend.call_recorder(lambda: None)
+            )
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "settings_redis_async", fake_redis
+        )
+        monkeypatch.setattr(
+            repository_service_tuf_api, "result_backend_async", fake_redis
+        )
+        fake_celery = pretend.stub(
+            amqp=pretend.stub(
+                reset_producer_pool=pretend.call_recorder(lambda: None)
+            )
+        )
+        monkeypatch.setattr(repository_service_tuf_api, "celery", fake_celery)
+        fake_close = pretend.call_recorder(lambda *a, **kw: None)
+        monkeypatch.setattr(Connection, "collect", fake_close)
+        monkeypatch.setattr(Connection, "_close", fake_close)
+        pools.connections[Connection("memory://")].acquire().release()
+        assert len(pools.connections) > 0
+
+        repository_service_tuf_api.after_fork()
+
+        assert fake_redis.connection_pool.reset.calls == [
+            pretend.call(),
+            pretend.call(),
+        ]
+        assert fake_celery.amqp.reset_producer_pool.calls == [pretend.call()]
+        assert len(pools.connections) == 0
+        assert len(pools.producers) == 0
+        # the connections shared with the parent process are not closed
+        assert fake_close.calls == []
+
+    def test_after_fork_new_broker_connections(self, monkeypatch):
+        app = Celery(
+            broker="memory://",
+            amqp=repository_service_tuf_api.RSTUFAMQP,
+            set_as_current=False,
+        )
+        monkeypatch.setattr(repository_service_tuf_api, "celery", app)
+        fake_redis = pretend.stub(
+            connection_pool=pretend.stub(reset=lambda: None)
+        )
+        for name in ["settings_redis_async", "result_backend_async"]:
+            monkeypatch.setattr(repository_service_tuf_api, name, fake_redis)
+        with app.producer_or_acquire() as producer:
+            parent_connection = producer.connection
+        parent_producer_pool = app.amqp.producer_pool
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover -- forked worker
+            try:
+                repository_service_tuf_api.after_fork()
+                with app.producer_or_acquire() as producer:
+                    new_connection = producer.connection is not (
+                        parent_connection
+                    )
+                new_pool = app.amqp.producer_pool is not parent_producer_pool
+                os.write(write_fd, bytes([new_connection, new_pool]))
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        result = os.read(read_fd, 2)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+
+        # the worker creates new broker connections and producer pool
+        assert result == bytes([True, True])
+        # the parent connections are kept
+        with app.producer_or_acquire() as producer:
+            assert producer.connection is parent_connection
+
+    def test_after_fork_read_replicas(self, monkeypatch):
+        fake_redis = pretend.stub(
+            connection_pool=pretend.stub(
+                reset=pretend.call_recorder(lambda: None)
+            )
+        )
+        for name in ["settings_redis_async", "result_backend_async"]:
+            monkeypatch.setattr(repository_service_tuf_api, name, fake_redis)
+        for name in [
+            "settings_redis_async_replicas",
+            "result_backend_replicas",
+        ]:
+            monkeypatch.setattr(
+                repository_service_tuf_api,
+                name,
+                pretend.stub(replicas=[fake_redis, fake_redis]),
+            )
+        monkeypatch.setattr(
+            repository_service_tuf_api,
+            "celery",
+            pretend.stub(amqp=pretend.stub(reset_producer_pool=lambda: None)),
+        )
+
+        repository_service_tuf_api.after_fork()
+
+        assert len(fake_redis.connection_pool.reset.calls) == 6
+
+    def test_celery_producer_pool(self):
+        producer_pool = repository_service_tuf_api.celery.producer_pool
+
+        assert isinstance(producer_pool, ProducerPool)
+        assert producer_pool.limit == 10
+        assert producer_pool.timeout == 10
+        assert producer_pool.max_idle == 60
@@ -0,0 +1,415 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+import pytest
+
+from repository_service_tuf_api import artifacts
+
+
+class TestArtifactsCoalescer:
+    def _fake_backends(self, monkeypatch, apply_async=None):
+        async def execute():
+            return []
+
+        fake_pipe = pretend.stub(
+            set=pretend.call_recorder(lambda *a, **kw: None),
+            execute=pretend.call_recorder(execute),
+        )
+
+        class FakePipeline:
+            async def __aenter__(self):
+                return fake_pipe
+
+            async def __aexit__(self, *a):
+                return None
+
+        monkeypatch.setattr(
+            artifacts,
+            "result_backend_async",
+            pretend.stub(pipeline=lambda: FakePipeline()),
+        )
+        fake_repository_metadata = pretend.stub(
+            apply_async=apply_async
+            or pretend.call_recorder(lambda *a, **kw: None),
+            backend=pretend.stub(expires=86400),
+        )
+        monkeypatch.setattr(
+            artifacts, "repository_metadata", fake_repository_metadata
+        )
+        monkeypatch.setattr(artifacts, "get_task_id", lambda: "merged_id")
+
+        return fake_repository_metadata, fake_pipe
+
+    def test_submit_window(self, monkeypatch):
+        fake_repository_metadata, fake_pipe = self._fake_backends(monkeypatch)
+        coalescer = artifacts.ArtifactsCoalescer(window=0.1, max_size=1000)
+
+        async def submit_requests():
+            return await asyncio.gather(
+                coalescer.submit("remove_artifacts", ["file1"], True, "id-1"),
+                coalescer.submit("remove_artifacts", ["file2"], True, "id-2"),
+            )
+
+        results = asyncio.run(submit_requests())
+
+        assert results == ["merged_id", "merged_id"]
+        assert fake_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={
+                    "action": "remove_artifacts",
+                    "payload": {
+                        "artifacts": ["file1", "file2"],
+                        "publish_artifacts": True,
+                    },
+                },
+                task_id="merged_id",
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+        assert fake_pipe.set.calls == [
+            pretend.call("rstuf-coalesced-task-id-1", "merged_id", ex=86400),
+            pretend.call("rstuf-coalesced-task-id-2", "merged_id", ex=86400),
+        ]
+        assert fake_pipe.execute.calls == [pretend.call()]
+        assert coalescer._batch is None
+
+    def test_submit_max_size(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch)
+        # the window is never reached, the max size submits the batch
+        coalescer = artifacts.ArtifactsCoalescer(window=60, max_size=2)
+        fake_artifacts = [{"path": "file1"}, {"path": "file2"}]
+
+        result = asyncio.run(
+            coalescer.submit(
+                "add_artifacts", fake_artifacts, False, "request_id"
+            )
+        )
+
+        assert result == "merged_id"
+        assert fake_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": fake_artifacts,
+                        "publish_artifacts": False,
+                        "add_task_id_to_custom": False,
+                    },
+                },
+                task_id="merged_id",
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+        assert coalescer._batch is None
+
+    def test_submit_target_roles(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch)
+        coalescer = artifacts.ArtifactsCoalescer(window=0.1, max_size=1000)
+
+        async def submit_requests():
+            return await asyncio.gather(
+                coalescer.submit(
+                    "add_artifacts",
+                    [{"path": "file1"}],
+                    True,
+                    "id-1",
+                    target_roles={"file1": "bins-1"},
+                ),
+                coalescer.submit(
+                    "add_artifacts",
+                    [{"path": "file2"}],
+                    True,
+                    "id-2",
+                    target_roles={"file2": "bins-0"},
+                ),
+            )
+
+        asyncio.run(submit_requests())
+
+        payload = fake_repository_metadata.apply_async.calls[0].kwargs[
+            "kwargs"
+        ]["payload"]
+        assert payload["target_roles"] == {
+            "file1": "bins-1",
+            "file2": "bins-0",
+        }
+
+    def test_submit_error(self, monkeypatch):
+        self._fake_backends(
+            monkeypatch,
+            apply_async=pretend.raiser(ConnectionError("broker down")),
+        )
+        coalescer = artifacts.ArtifactsCoalescer(window=60, max_size=1)
+
+        with pytest.raises(ConnectionError) as err:
+            asyncio.run(
+                coalescer.submit("remove_artifacts", ["file1"], True, "id")
+            )
+
+        assert "broker down" in str(err)
+
+    def test_submit_keeps_requests_order(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch)
+        coalescer = artifacts.ArtifactsCoalescer(window=0.1, max_size=1000)
+
+        async def submit_requests():
+            return await asyncio.gather(
+                coalescer.submit("add_artifacts", [{"path": "y"}], True, "1"),
+                coalescer.submit("remove_artifacts", ["x"], True, "2"),
+                coalescer.submit("add_artifacts", [{"path": "x"}], True, "3"),
+                coalescer.submit("add_artifacts", [{"path": "z"}], False, "4"),
+            )
+
+        asyncio.run(submit_requests())
+
+        assert [
+            (
+                call.kwargs["kwargs"]["action"],
+                call.kwargs["kwargs"]["payload"]["artifacts"],
+                call.kwargs["kwargs"]["payload"]["publish_artifacts"],
+            )
+            for call in fake_repository_metadata.apply_async.calls
+        ] == [
+            ("add_artifacts", [{"path": "y"}], True),
+            ("remove_artifacts", ["x"], True),
+            ("add_artifacts", [{"path": "x"}], True),
+            ("add_artifacts", [{"path": "z"}], False),
+        ]
+        assert coalescer._batch is None
+
+    def test_submit_flush_cancelled(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch)
+        coalescer = artifacts.ArtifactsCoalescer(window=0, max_size=1000)
+
+        async def submit_request():
+            started = asyncio.Event()
+
+            async def fake_publish_artifacts_task(*a, **kw):
+                started.set()
+                await asyncio.sleep(60)
+
+            monkeypatch.setattr(
+                artifacts,
+                "publish_artifacts_task",
+                fake_publish_artifacts_task,
+            )
+            request = asyncio.create_task(
+                coalescer.submit("remove_artifacts", ["file1"], True, "id")
+            )
+            await started.wait()
+            # i.e. the event loop is stopping while the batch is submitted
+            coalescer._last_batch.flush_task.cancel()
+
+            return await request
+
+        with pytest.raises(RuntimeError) as err:
+            asyncio.run(submit_request())
+
+        assert "cancelled" in str(err)
+        assert fake_repository_metadata.apply_async.calls == []
+
+
+class TestPublishArtifactsTask:
+    def _fake_backends(self, monkeypatch, shards):
+        async def set_(*a, **kw):
+            return None
+
+        fake_result_backend = pretend.stub(set=pretend.call_recorder(set_))
+        monkeypatch.setattr(
+            artifacts, "result_backend_async", fake_result_backend
+        )
+        fake_repository_metadata = pretend.stub(
+            apply_async=pretend.call_recorder(lambda *a, **kw: None),
+            backend=pretend.stub(expires=86400),
+        )
+        monkeypatch.setattr(
+            artifacts, "repository_metadata", fake_repository_metadata
+        )
+        task_ids = iter(["sub_1", "sub_2"])
+        monkeypatch.setattr(artifacts, "get_task_id", lambda: next(task_ids))
+        monkeypatch.setattr(artifacts, "ARTIFACTS_QUEUE_SHARDS", shards)
+
+        return fake_repository_metadata, fake_result_backend
+
+    def test_publish_not_sharded(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch, 0)
+        payload = {"artifacts": ["file1.tar.gz"], "publish_artifacts": True}
+
+        asyncio.run(
+            artifacts.publish_artifacts_task(
+                "remove_artifacts", payload, "task_id", 32
+            )
+        )
+
+        assert fake_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={"action": "remove_artifacts", "payload": payload},
+                task_id="task_id",
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+
+    def test_publish_sharded_without_hash_bins(self, monkeypatch):
+        fake_repository_metadata, _ = self._fake_backends(monkeypatch, 2)
+        payload = {"artifacts": ["file1.tar.gz"], "publish_artifacts": True}
+
+        asyncio.run(
+            artifacts.publish_artifacts_task(
+                "remove_artifacts", payload, "task_id", None
+            )
+        )
+
+        assert fake_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={"action": "remove_artifacts", "payload": payload},
+                task_id="task_id",
+                queue="metadata_repository",
+                acks_late=True,
+            )
+        ]
+
+    def test_publish_single_shard(self, monkeypatch):
+        fake_repository_metadata, fake_result_backend = self._fake_backends(
+            monkeypatch, 2
+        )
+        # bins-16 and bins-10 (shard 0)
+        payload = {
+            "artifacts": ["file2.tar.gz", "file3.tar.gz"],
+            "publish_artifacts": True,
+        }
+
+        asyncio.run(
+            artifacts.publish_artifacts_task(
+                "remove_artifacts", payload, "task_id", 32
+            )
+        )
+
+        assert fake_repository_metadata.apply_async.calls == [
+            pretend.call(
+                kwargs={"action": "remove_artifacts", "payload": payload},
+                task_id="task_id",
+                queue="metadata_repository.shard-0",
+                acks_late=True,
+            )
+        ]
+        assert fake_result_backend.set.calls == []
+
+    def test_publish_sharded(self, monkeypatch):
+        fake_repository_metadata, fake_result_backend = self._fake_backends(
+            monkeypatch, 2
+        )
+        artifact = {"info": {"length": 1, "hashes": {"blake2b-256": "h"}}}
+        payload = {
+            "artifacts": [
+                {"path": "file1.tar.gz", **artifact},
+                {"path": "file2.tar.gz", **artifact},
+                {"path": "file3.tar.gz", **artifact},
+            ],
+            "publish_artifacts": True,
+            "target_roles": {
+                "file1.tar.gz": "bins-1f",
+                "file2.tar.gz": "bins-16",
+                "file3.tar.gz": "bins-10",
+            },
+        }
+
+        asyncio.run(
+            artifacts.publish_artifacts_task(
+                "add_artifacts", payload, "task_id", 32
+            )
+        )
+
+        assert fake_result_backend.set.calls == [
+            pretend.call(
+                "rstuf-sharded-task-task_id", '["sub_1", "sub_2"]', ex=86400
+            )
+        ]
+        # the sub-tasks are published concurrently
+        assert sorted(
+            fake_repository_metadata.apply_async.calls,
+            key=lambda call: call.kwargs["task_id"],
+        ) == [
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": [{"path": "file1.tar.gz", **artifact}],
+                        "publish_artifacts": True,
+                        "target_roles": {"file1.tar.gz": "bins-1f"},
+                    },
+                },
+                task_id="sub_1",
+                queue="metadata_repository.shard-1",
+                acks_late=True,
+            ),
+            pretend.call(
+                kwargs={
+                    "action": "add_artifacts",
+                    "payload": {
+                        "artifacts": [
+                            {"path": "file2.tar.gz", **artifact},
+                            {"path": "file3.tar.gz", **artifact},
+                        ],
+                        "publish_artifacts": True,
+                        "target_roles": {
+                            "file2.tar.gz": "bins-16",
+                            "file3.tar.gz": "bins-10",
+                        },
+                    },
+                },
+                task_id="sub_2",
+                queue="metadata_repository.shard-0",
+                acks_late=True,
+            ),
+        ]
+
+
+class TestJSONArrayParser:
+    def test_feed(self):
+        parser = artifacts.JSONArrayParser()
+        text = ' [ {"a": [1, "]"]} , {"b": "{"},\n{"c": 3} ] '
+
+        items = []
+        for char in text:
+            items.extend(parser.feed(char))
+        parser.close()
+
+        assert items == [{"a": [1, "]"]}, {"b": "{"}, {"c": 3}]
+
+    def test_feed_empty_array(self):
+        parser = artifacts.JSONArrayParser()
+
+        assert parser.feed("[ ]") == []
+        parser.close()
+
+    @pytest.mark.parametrize(
+        "text", ['{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": 1}] [']
+    )
+    def test_feed_invalid(self, text):
+        parser = artifacts.JSONArrayParser()
+
+        with pytest.raises(ValueError):
+            parser.feed(text)
+
+    @pytest.mark.parametrize("text", ["", "[", '[{"a": 1}', '[{"a": 1},'])
+    def test_close_incomplete(self, text):
+        parser = artifacts.JSONArrayParser()
+        parser.feed(text)
+
+        with pytest.raises(ValueError):
+            parser.close()
+
+    def test_feed_too_large_item(self, monkeypatch):
+        monkeypatch.setattr(
+            artifacts, "ARTIFACTS_STREAM_MAX_ARTIFACT_SIZE", 10
+        )
+        parser = artifacts.JSONArrayParser()
+
+        with pytest.raises(ValueError):
+            parser.feed('[{"path": "file1.tar.gz"')
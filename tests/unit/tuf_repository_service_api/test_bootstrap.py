@@ -2,51 +2,362 @@
 # SPDX-FileCopyrightText: 2022-2023 VMware Inc
 #
 # SPDX-License-Identifier: MIT
+import time
+from contextlib import contextmanager
+
 import pretend
+import pytest
+from kombu.exceptions import OperationalError
+from redis.exceptions import RedisClusterException, RedisError
 
 from repository_service_tuf_api import bootstrap
 
 
+class StopWatchdog(Exception):
+    pass
+
+
 class TestBootstrap:
-    def test__check_bootstrap_status_SUCCESS(self):
-        bootstrap.repository_metadata.AsyncResult = pretend.call_recorder(
-            lambda *a: pretend.stub(status="SUCCESS")
+    @pytest.fixture
+    def watchdog_leader(self, monkeypatch):
+        fake_acquire_watchdog_lock = pretend.call_recorder(lambda token: True)
+        monkeypatch.setattr(
+            bootstrap, "_acquire_watchdog_lock", fake_acquire_watchdog_lock
         )
 
-        result = bootstrap._check_bootstrap_status("fake_task_id", 2)
+        return fake_acquire_watchdog_lock
+
+    def test__check_bootstrap_status_SUCCESS(self, monkeypatch):
+        fake_repository_metadata = pretend.stub(
+            AsyncResult=pretend.call_recorder(
+                lambda *a: pretend.stub(status="SUCCESS")
+            )
+        )
+        monkeypatch.setattr(
+            bootstrap, "repository_metadata", fake_repository_metadata
+        )
 
-        assert result is None
-        assert bootstrap.repository_metadata.AsyncResult.calls == [
+        result = bootstrap._check_bootstrap_status(
+            "fake_task_id", time.time() + 2
+        )
+
+        assert result is True
+        assert fake_repository_metadata.AsyncResult.calls == [
             pretend.call("fake_task_id")
         ]
 
-    def test__check_bootstrap_status_FAILURE(self):
-        bootstrap.repository_metadata.AsyncResult = pretend.call_recorder(
-            lambda *a: pretend.stub(status="FAILURE")
+    def test__check_bootstrap_status_FAILURE(self, monkeypatch):
+        fake_repository_metadata = pretend.stub(
+            AsyncResult=pretend.call_recorder(
+                lambda *a: pretend.stub(status="FAILURE")
+            )
+        )
+        monkeypatch.setattr(
+            bootstrap, "repository_metadata", fake_repository_metadata
+        )
+        fake_release_bootstrap_lock = pretend.call_recorder(lambda *a: True)
+        monkeypatch.setattr(
+            bootstrap, "release_bootstrap_lock", fake_release_bootstrap_lock
         )
-        bootstrap.release_bootstrap_lock = pretend.call_recorder(lambda: None)
 
-        result = bootstrap._check_bootstrap_status("fake_task_id", 2)
+        result = bootstrap._check_bootstrap_status(
+            "fake_task_id", time.time() + 2
+        )
 
-        assert result is None
-        assert bootstrap.repository_metadata.AsyncResult.calls == [
+        assert result is True
+        assert fake_repository_metadata.AsyncResult.calls == [
             pretend.call("fake_task_id")
         ]
-        assert bootstrap.release_bootstrap_lock.calls == [pretend.call()]
+        assert fake_release_bootstrap_lock.calls == [
+            pretend.call("fake_task_id")
+        ]
+
+    def test__check_bootstrap_status_pending(self, monkeypatch):
+        fake_task = pretend.stub(
+            status="STARTED",
+            revoke=pretend.call_recorder(lambda **kw: None),
+        )
+        monkeypatch.setattr(
+            bootstrap,
+            "repository_metadata",
+            pretend.stub(AsyncResult=lambda *a: fake_task),
+        )
+
+        result = bootstrap._check_bootstrap_status(
+            "fake_task_id", time.time() + 2
+        )
+
+        assert result is False
+        assert fake_task.revoke.calls == []
 
-    def test__check_bootstrap_status_timeout(self):
+    def test__check_bootstrap_status_timeout(self, monkeypatch):
         fake_task = pretend.stub(
             status="STARTED",
             revoke=pretend.call_recorder(lambda **kw: None),
         )
-        bootstrap.repository_metadata.AsyncResult = pretend.call_recorder(
-            lambda *a: fake_task
+        fake_producer = pretend.stub(connection="connection")
+
+        @contextmanager
+        def fake_producer_or_acquire():
+            yield fake_producer
+
+        monkeypatch.setattr(
+            bootstrap,
+            "repository_metadata",
+            pretend.stub(
+                AsyncResult=lambda *a: fake_task,
+                app=pretend.stub(producer_or_acquire=fake_producer_or_acquire),
+            ),
+        )
+        fake_release_bootstrap_lock = pretend.call_recorder(lambda *a: True)
+        monkeypatch.setattr(
+            bootstrap, "release_bootstrap_lock", fake_release_bootstrap_lock
+        )
+
+        result = bootstrap._check_bootstrap_status(
+            "fake_task_id", time.time() - 1
+        )
+
+        assert result is True
+        assert fake_task.revoke.calls == [
+            pretend.call(connection="connection", terminate=True)
+        ]
+        assert fake_release_bootstrap_lock.calls == [
+            pretend.call("fake_task_id")
+        ]
+
+    def test__bootstrap_watchdog(self, watchdog_leader, monkeypatch):
+        deadline = time.time() + 300
+        fake_redis = pretend.stub(
+            zrange=pretend.call_recorder(
+                lambda *a, **kw: [("task_1", deadline), ("task_2", deadline)]
+            ),
+            zrem=pretend.call_recorder(lambda *a: 1),
         )
-        bootstrap.release_bootstrap_lock = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        fake__check_bootstrap_status = pretend.call_recorder(
+            lambda task_id, deadline: task_id == "task_1"
+        )
+        monkeypatch.setattr(
+            bootstrap, "_check_bootstrap_status", fake__check_bootstrap_status
+        )
+        waits = []
+
+        def fake_wait(timeout):
+            waits.append(timeout)
+            if len(waits) == 3:
+                raise StopWatchdog()
+            return False
+
+        monkeypatch.setattr(
+            bootstrap,
+            "_watchdog_wakeup",
+            pretend.stub(wait=fake_wait, clear=lambda: None),
+        )
+
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
 
-        result = bootstrap._check_bootstrap_status("fake_task_id", 2)
+        assert (
+            fake_redis.zrange.calls
+            == [
+                pretend.call(
+                    bootstrap.BOOTSTRAP_DEADLINES_KEY, 0, -1, withscores=True
+                )
+            ]
+            * 3
+        )
+        assert (
+            fake_redis.zrem.calls
+            == [pretend.call(bootstrap.BOOTSTRAP_DEADLINES_KEY, "task_1")] * 3
+        )
+        assert fake__check_bootstrap_status.calls[:2] == [
+            pretend.call("task_1", deadline),
+            pretend.call("task_2", deadline),
+        ]
+        # interval backs off
+        assert waits == [1, 2, 4]
+
+    def test__bootstrap_watchdog_nothing_pending(
+        self, watchdog_leader, monkeypatch
+    ):
+        fake_redis = pretend.stub(zrange=lambda *a, **kw: [])
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        fake_wakeup = pretend.stub(
+            wait=pretend.call_recorder(pretend.raiser(StopWatchdog())),
+        )
+        monkeypatch.setattr(bootstrap, "_watchdog_wakeup", fake_wakeup)
 
-        assert result is None
-        assert len(bootstrap.repository_metadata.AsyncResult.calls) > 1
-        assert fake_task.revoke.calls == [pretend.call(terminate=True)]
-        assert bootstrap.release_bootstrap_lock.calls == [pretend.call()]
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
+
+        assert fake_wakeup.wait.calls == [
+            pretend.call(bootstrap.WATCHDOG_MAX_INTERVAL)
+        ]
+
+    @pytest.mark.parametrize(
+        "error",
+        [RedisError, RedisClusterException, OperationalError, ValueError],
+    )
+    def test__bootstrap_watchdog_redis_error(
+        self, watchdog_leader, monkeypatch, caplog, error
+    ):
+        fake_redis = pretend.stub(
+            zrange=pretend.raiser(error("connection lost"))
+        )
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        fake_wakeup = pretend.stub(
+            wait=pretend.call_recorder(pretend.raiser(StopWatchdog())),
+        )
+        monkeypatch.setattr(bootstrap, "_watchdog_wakeup", fake_wakeup)
+
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
+
+        assert fake_wakeup.wait.calls == [
+            pretend.call(bootstrap.WATCHDOG_MAX_INTERVAL)
+        ]
+        assert "Bootstrap watchdog failed: connection lost" in caplog.text
+
+    def test__bootstrap_watchdog_finished_by_other_process(
+        self, watchdog_leader, monkeypatch, caplog
+    ):
+        fake_redis = pretend.stub(
+            zrange=lambda *a, **kw: [("task_1", time.time() + 300)],
+            zrem=pretend.call_recorder(lambda *a: 0),
+        )
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        monkeypatch.setattr(
+            bootstrap, "_check_bootstrap_status", lambda *a: True
+        )
+        fake_wakeup = pretend.stub(
+            wait=pretend.call_recorder(pretend.raiser(StopWatchdog())),
+        )
+        monkeypatch.setattr(bootstrap, "_watchdog_wakeup", fake_wakeup)
+        caplog.set_level("INFO")
+
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
+
+        assert fake_redis.zrem.calls == [
+            pretend.call(bootstrap.BOOTSTRAP_DEADLINES_KEY, "task_1")
+        ]
+        assert "watch finished" not in caplog.text
+        # Nothing else to watch
+        assert fake_wakeup.wait.calls == [
+            pretend.call(bootstrap.WATCHDOG_MAX_INTERVAL)
+        ]
+
+    def test__bootstrap_watchdog_check_error(
+        self, watchdog_leader, monkeypatch, caplog
+    ):
+        fake_redis = pretend.stub(
+            zrange=lambda *a, **kw: [("task_1", time.time() - 1)],
+        )
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        # i.e. the broker is unavailable to revoke the task
+        monkeypatch.setattr(
+            bootstrap,
+            "_check_bootstrap_status",
+            pretend.raiser(OperationalError("broker unavailable")),
+        )
+        fake_wakeup = pretend.stub(
+            wait=pretend.call_recorder(pretend.raiser(StopWatchdog())),
+        )
+        monkeypatch.setattr(bootstrap, "_watchdog_wakeup", fake_wakeup)
+
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
+
+        # the watchdog keeps running, retried after the max interval
+        assert fake_wakeup.wait.calls == [
+            pretend.call(bootstrap.WATCHDOG_MAX_INTERVAL)
+        ]
+        assert "Bootstrap watchdog failed: broker unavailable" in caplog.text
+
+    def test__bootstrap_watchdog_not_leader(self, monkeypatch):
+        fake_acquire_watchdog_lock = pretend.call_recorder(lambda token: False)
+        monkeypatch.setattr(
+            bootstrap, "_acquire_watchdog_lock", fake_acquire_watchdog_lock
+        )
+        fake_redis = pretend.stub(zrange=pretend.call_recorder(lambda: []))
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        waits = []
+
+        def fake_wait(timeout):
+            waits.append(timeout)
+            if len(waits) == 2:
+                raise StopWatchdog()
+            return False
+
+        monkeypatch.setattr(
+            bootstrap,
+            "_watchdog_wakeup",
+            pretend.stub(wait=fake_wait, clear=lambda: None),
+        )
+
+        with pytest.raises(StopWatchdog):
+            bootstrap._bootstrap_watchdog()
+
+        # the lock is retried, the tasks are checked only by the leader
+        assert fake_redis.zrange.calls == []
+        assert waits == [bootstrap.WATCHDOG_MAX_INTERVAL] * 2
+        token = fake_acquire_watchdog_lock.calls[0].args[0]
+        assert fake_acquire_watchdog_lock.calls == [pretend.call(token)] * 2
+
+    def test__acquire_watchdog_lock(self, monkeypatch):
+        fake_script = pretend.call_recorder(lambda **kw: 1)
+        monkeypatch.setattr(bootstrap, "_watchdog_lock_script", fake_script)
+
+        assert bootstrap._acquire_watchdog_lock("token") is True
+        assert fake_script.calls == [
+            pretend.call(
+                keys=[bootstrap.BOOTSTRAP_WATCHDOG_LOCK_KEY],
+                args=["token", 30000],
+            )
+        ]
+
+    def test_watch_bootstrap(self, monkeypatch):
+        fake_redis = pretend.stub(zadd=pretend.call_recorder(lambda *a: None))
+        monkeypatch.setattr(bootstrap, "settings_redis", fake_redis)
+        fake_start_bootstrap_watchdog = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            bootstrap,
+            "start_bootstrap_watchdog",
+            fake_start_bootstrap_watchdog,
+        )
+        fake_wakeup = pretend.stub(set=pretend.call_recorder(lambda: None))
+        monkeypatch.setattr(bootstrap, "_watchdog_wakeup", fake_wakeup)
+        monkeypatch.setattr(bootstrap.time, "time", lambda: 1000)
+
+        bootstrap.watch_bootstrap("fake_task_id", 300)
+
+        assert fake_redis.zadd.calls == [
+            pretend.call(
+                bootstrap.BOOTSTRAP_DEADLINES_KEY, {"fake_task_id": 1300}
+            )
+        ]
+        assert fake_start_bootstrap_watchdog.calls == [pretend.call()]
+        assert fake_wakeup.set.calls == [pretend.call()]
+
+    def test_start_bootstrap_watchdog(self, monkeypatch):
+        fake_thread = pretend.stub(
+            start=pretend.call_recorder(lambda: None),
+            is_alive=lambda: True,
+        )
+        fake_thread_class = pretend.call_recorder(lambda *a, **kw: fake_thread)
+        monkeypatch.setattr(bootstrap, "Thread", fake_thread_class)
+        monkeypatch.setattr(bootstrap, "_watchdog_thread", None)
+
+        bootstrap.start_bootstrap_watchdog()
+        bootstrap.start_bootstrap_watchdog()
+
+        assert fake_thread_class.calls == [
+            pretend.call(
+                None,
+                bootstrap._bootstrap_watchdog,
+                name="bootstrap-watchdog",
+                daemon=True,
+            )
+        ]
+        assert fake_thread.start.calls == [pretend.call()]
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import pretend
+import pytest
+
+from repository_service_tuf_api import bootstrap_lock
+
+
+def fake_redis(lock_result=None, cas_result=None):
+    scripts = {
+        bootstrap_lock.BOOTSTRAP_LOCK_SCRIPT: pretend.call_recorder(
+            lambda keys, args: lock_result
+        ),
+        bootstrap_lock.BOOTSTRAP_CAS_SCRIPT: pretend.call_recorder(
+            lambda keys, args: cas_result
+        ),
+    }
+
+    return pretend.stub(register_script=scripts.get), scripts
+
+
+class TestBootstrapLock:
+    @pytest.mark.parametrize(
+        "current, expected",
+        [
+            ("pre-fake_task_id", "pre-fake_task_id"),
+            ("signing-other_task_id", "signing-other_task_id"),
+        ],
+    )
+    def test_acquire(self, current, expected):
+        redis, scripts = fake_redis(lock_result=current)
+        lock = bootstrap_lock.BootstrapLock(redis)
+
+        result = lock.acquire(["HOLDER", "VERSION"], "pre-fake_task_id")
+
+        assert result == expected
+        assert scripts[bootstrap_lock.BOOTSTRAP_LOCK_SCRIPT].calls == [
+            pretend.call(keys=["HOLDER", "VERSION"], args=["pre-fake_task_id"])
+        ]
+
+    @pytest.mark.parametrize("changed, expected", [(1, True), (0, False)])
+    def test_transition(self, changed, expected):
+        redis, scripts = fake_redis(cas_result=changed)
+        lock = bootstrap_lock.BootstrapLock(redis)
+
+        result = lock.transition(
+            ["HOLDER", "VERSION"],
+            [None, "pre-fake_task_id"],
+            "signing-fake_task_id",
+        )
+
+        assert result is expected
+        # unset (``None``) is expected as an empty string
+        assert scripts[bootstrap_lock.BOOTSTRAP_CAS_SCRIPT].calls == [
+            pretend.call(
+                keys=["HOLDER", "VERSION"],
+                args=["signing-fake_task_id", "", "pre-fake_task_id"],
+            )
+        ]
+
+    def test_transition_unset(self):
+        redis, scripts = fake_redis(cas_result=1)
+        lock = bootstrap_lock.BootstrapLock(redis)
+
+        assert lock.transition(["HOLDER", "VERSION"], ["pre-id"], None)
+        assert scripts[bootstrap_lock.BOOTSTRAP_CAS_SCRIPT].calls == [
+            pretend.call(keys=["HOLDER", "VERSION"], args=["@none ", "pre-id"])
+        ]
@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+import pytest
+from celery import Celery
+from kombu import Connection, pools
+from prometheus_client import REGISTRY
+
+from repository_service_tuf_api import broker
+
+
+def pool_metric(name):
+    return REGISTRY.get_sample_value(name) or 0
+
+
+class TestProducerPool:
+    def producer_pool(self, limit=2, **kwargs):
+        connections = pools.connections[Connection("memory://")]
+        return broker.ProducerPool(connections, limit=limit, **kwargs)
+
+    def test_acquire(self):
+        producer_pool = self.producer_pool()
+        wait_count = pool_metric("rstuf_api_broker_pool_wait_seconds_count")
+
+        producer = producer_pool.acquire(block=True)
+        producer.release()
+        producer = producer_pool.acquire(block=True)
+        producer.release()
+
+        assert (
+            pool_metric("rstuf_api_broker_pool_wait_seconds_count")
+            == wait_count + 2
+        )
+        assert list(producer_pool._connections_last_used) == [
+            producer.connection
+        ]
+
+    def test_acquire_timeout(self):
+        producer_pool = self.producer_pool(limit=1, timeout=0.01)
+        timeouts = pool_metric("rstuf_api_broker_pool_timeouts_total")
+
+        producer = producer_pool.acquire(block=True)
+        with pytest.raises(producer_pool.LimitExceeded):
+            producer_pool.acquire(block=True)
+        producer.release()
+
+        assert (
+            pool_metric("rstuf_api_broker_pool_timeouts_total") == timeouts + 1
+        )
+
+    def test_acquire_reopen_idle_connection(self):
+        producer_pool = self.producer_pool(limit=1, max_idle=-1)
+
+        producer = producer_pool.acquire(block=True)
+        producer.publish({"test": 1}, routing_key="test")
+        assert producer.connection.connected is True
+        producer.release()
+
+        producer = producer_pool.acquire(block=True)
+        assert producer.connection.connected is False
+        producer.publish({"test": 2}, routing_key="test")
+        assert producer.connection.connected is True
+        producer.release()
+
+
+class TestRSTUFAMQP:
+    def test_producer_pool(self):
+        app = Celery(
+            broker="memory://", amqp=broker.RSTUFAMQP, set_as_current=False
+        )
+        app.conf.broker_pool_limit = 3
+        app.conf.broker_pool_timeout = 0.5
+        app.conf.broker_pool_max_idle = 30
+
+        producer_pool = app.amqp.producer_pool
+
+        assert isinstance(producer_pool, broker.ProducerPool)
+        assert (producer_pool.limit, producer_pool.timeout) == (3, 0.5)
+        assert producer_pool.max_idle == 30
+        assert app.amqp.producer_pool is producer_pool
+
+        app.amqp.reset_producer_pool()
+
+        assert app.amqp.producer_pool is not producer_pool
+
+
+class TestTaskPublisher:
+    def test_publish(self):
+        fake_task = pretend.stub(
+            apply_async=pretend.call_recorder(lambda **kw: "result")
+        )
+        publisher = broker.TaskPublisher(1)
+
+        result = asyncio.run(
+            publisher.publish(
+                fake_task, kwargs={"action": "test"}, task_id="id"
+            )
+        )
+
+        assert result == "result"
+        assert fake_task.apply_async.calls == [
+            pretend.call(kwargs={"action": "test"}, task_id="id")
+        ]
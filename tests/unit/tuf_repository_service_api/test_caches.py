@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import pretend
+
+from repository_service_tuf_api import caches
+
+
+class TestExpiringCache:
+    def test_get_set(self):
+        cache = caches.ExpiringCache()
+        value = pretend.stub()
+
+        assert cache.get() is None
+
+        cache.set(value, 60)
+
+        assert cache.get() is value
+
+    def test_set_disabled(self):
+        cache = caches.ExpiringCache()
+
+        cache.set(pretend.stub(), 0)
+
+        assert cache.get() is None
+
+    def test_expired(self, monkeypatch):
+        cache = caches.ExpiringCache()
+        now = iter([100.0, 161.0])
+        monkeypatch.setattr(caches.time, "monotonic", lambda: next(now))
+
+        cache.set(pretend.stub(), 60)
+
+        assert cache.get() is None
+
+    def test_set_cleared_generation(self):
+        cache = caches.ExpiringCache()
+        generation = cache.generation
+
+        cache.clear()
+        cache.set(pretend.stub(), 60, generation)
+
+        assert cache.get() is None
+
+        value = pretend.stub()
+        cache.set(value, 60, cache.generation)
+
+        assert cache.get() is value
+
+
+class TestVersionedCache:
+    def test_get_set(self):
+        cache = caches.VersionedCache()
+        content = pretend.stub()
+
+        cache.set("1", content, 60)
+
+        assert cache.get("1") is content
+        assert cache.get("2") is None
+        assert cache.get(None) is None
+
+    def test_set_unversioned_or_disabled(self):
+        cache = caches.VersionedCache()
+
+        cache.set(None, pretend.stub(), 60)
+        cache.set("1", pretend.stub(), 0)
+
+        assert cache.get("1") is None
+
+    def test_expired(self, monkeypatch):
+        cache = caches.VersionedCache()
+        now = iter([100.0, 161.0])
+        monkeypatch.setattr(caches.time, "monotonic", lambda: next(now))
+
+        cache.set("1", pretend.stub(), 60)
+
+        assert cache.get("1") is None
+
+    def test_set_cleared_generation(self):
+        cache = caches.VersionedCache()
+        generation = cache.generation
+
+        cache.clear()
+        cache.set("1", pretend.stub(), 60, generation)
+
+        assert cache.get("1") is None
+
+        content = pretend.stub()
+        cache.set("1", content, 60, cache.generation)
+
+        assert cache.get("1") is content
+
+    def test_clear(self):
+        cache = caches.VersionedCache()
+        cache.set("1", pretend.stub(), 60)
+
+        cache.clear()
+
+        assert cache.get("1") is None
@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+import pytest
+
+from repository_service_tuf_api import RepositorySettings, hash_bins
+
+
+class TestHashBins:
+    def test_bin_roles_names(self):
+        assert hash_bins.bin_roles_names(4) == (
+            "bins-0",
+            "bins-1",
+            "bins-2",
+            "bins-3",
+        )
+        names = hash_bins.bin_roles_names(1024)
+        assert len(names) == 1024
+        assert names[0] == "bins-000"
+        assert names[-1] == "bins-3ff"
+
+    @pytest.mark.parametrize(
+        "number_of_bins, paths, expected",
+        [
+            (
+                32,
+                ["file1.tar.gz", "file2.tar.gz", "file3.tar.gz"],
+                ["bins-1f", "bins-16", "bins-10"],
+            ),
+            (1024, ["a", "b/c.tar.gz"], ["bins-32a", "bins-089"]),
+        ],
+    )
+    def test_bin_roles_for_paths(self, number_of_bins, paths, expected):
+        # Same delegated roles as the TUF succinct hash bin delegation
+        # (`tuf.api.metadata.SuccinctRoles.get_role_for_target`)
+        assert hash_bins.bin_roles_for_paths(paths, number_of_bins) == expected
+
+    def test_bin_numbers_for_paths(self):
+        assert hash_bins.bin_numbers_for_paths(
+            ["file1.tar.gz", "file2.tar.gz", "file3.tar.gz"], 32
+        ) == [0x1F, 0x16, 0x10]
+
+    def test_target_roles(self):
+        assert hash_bins.target_roles(["file1.tar.gz"], 32) == {
+            "file1.tar.gz": "bins-1f"
+        }
+        assert hash_bins.target_roles(["file1.tar.gz"], None) is None
+
+    @pytest.mark.parametrize(
+        "value, delegated_roles, expected",
+        [
+            ("@int 32", '@json ["bins-00", "bins-01"]', 32),
+            ("32", '@json ["bins-00", "bins-01"]', 32),
+            (None, '@json ["bins-00", "bins-01"]', None),
+            ("@none ", '@json ["bins-00", "bins-01"]', None),
+            # custom target delegation
+            ("@int 32", '@json ["foo", "bar"]', None),
+            ("@int 32", None, None),
+        ],
+    )
+    def test_number_of_delegated_bins(
+        self, monkeypatch, value, delegated_roles, expected
+    ):
+        async def fake_hmget(holder, keys):
+            return [value, delegated_roles]
+
+        fake_settings_redis = pretend.stub(
+            hmget=pretend.call_recorder(fake_hmget)
+        )
+        monkeypatch.setattr(
+            hash_bins, "settings_redis_async", fake_settings_redis
+        )
+        monkeypatch.setattr(hash_bins, "settings_holder", lambda: "HOLDER")
+
+        result = asyncio.run(hash_bins.number_of_delegated_bins())
+
+        assert result == expected
+        assert fake_settings_redis.hmget.calls == [
+            pretend.call(
+                "HOLDER", ["NUMBER_OF_DELEGATED_BINS", "DELEGATED_ROLES_NAMES"]
+            )
+        ]
+
+    @pytest.mark.parametrize(
+        "value, delegated_roles, expected",
+        [
+            (32, ["bins-00", "bins-01"], 32),
+            (None, ["bins-00", "bins-01"], None),
+            (32, ["foo", "bar"], None),
+        ],
+    )
+    def test_number_of_delegated_bins_shared_settings(
+        self, monkeypatch, value, delegated_roles, expected
+    ):
+        monkeypatch.setattr(
+            hash_bins,
+            "shared_repository_settings",
+            lambda: RepositorySettings(
+                data={
+                    "NUMBER_OF_DELEGATED_BINS": value,
+                    "DELEGATED_ROLES_NAMES": delegated_roles,
+                }
+            ),
+        )
+        monkeypatch.setattr(hash_bins, "settings_redis_async", pretend.stub())
+
+        result = asyncio.run(hash_bins.number_of_delegated_bins())
+
+        assert result == expected
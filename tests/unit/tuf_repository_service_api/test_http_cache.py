@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import gzip
+
+import pretend
+import pytest
+
+from repository_service_tuf_api import http_cache
+
+
+def fake_request(**headers):
+    return pretend.stub(headers=headers)
+
+
+class TestHTTPCache:
+    def test_make_etag(self):
+        etag = http_cache.make_etag(b"content")
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == http_cache.make_etag(b"content")
+        assert etag != http_cache.make_etag(b"other content")
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            (None, False),
+            ('"other"', False),
+            ('"etag"', True),
+            ('W/"etag"', True),
+            ('"other", "etag"', True),
+            ("*", True),
+        ],
+    )
+    def test_etag_matches(self, if_none_match, expected):
+        headers = {}
+        if if_none_match is not None:
+            headers["if-none-match"] = if_none_match
+
+        request = fake_request(**headers)
+
+        assert http_cache.etag_matches(request, '"etag"') is expected
+
+    def test_accepted_encodings(self):
+        request = fake_request(
+            **{"accept-encoding": "gzip;q=0.5, br;q=0, identity, , *;q=x"}
+        )
+
+        assert http_cache.accepted_encodings(request) == {
+            "gzip": 0.5,
+            "br": 0.0,
+            "identity": 1.0,
+            "*": 0.0,
+        }
+
+
+class TestPrecompressedContent:
+    def test_response_gzip(self, monkeypatch):
+        monkeypatch.setattr(http_cache, "brotli", None)
+        content = http_cache.PrecompressedContent(b"content", "text/plain")
+
+        response = content.response(
+            fake_request(**{"accept-encoding": "gzip, deflate"})
+        )
+
+        assert response.status_code == 200
+        assert gzip.decompress(response.body) == b"content"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == content.etag
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_response_brotli(self, monkeypatch):
+        fake_brotli = pretend.stub(compress=lambda content: b"br" + content)
+        monkeypatch.setattr(http_cache, "brotli", fake_brotli)
+        content = http_cache.PrecompressedContent(b"content", "text/plain")
+
+        response = content.response(
+            fake_request(**{"accept-encoding": "gzip, br"})
+        )
+
+        assert response.body == b"brcontent"
+        assert response.headers["content-encoding"] == "br"
+
+    def test_response_not_precompressed(self, monkeypatch):
+        fake_brotli = pretend.stub(
+            compress=pretend.call_recorder(lambda content: b"br" + content)
+        )
+        monkeypatch.setattr(http_cache, "brotli", fake_brotli)
+        content = http_cache.PrecompressedContent(
+            b"content", "text/plain", precompress=False
+        )
+        assert content.compressed == {}
+
+        response = content.response(
+            fake_request(**{"accept-encoding": "gzip, br"})
+        )
+
+        assert response.body == b"content"
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == content.etag
+        assert fake_brotli.compress.calls == []
+
+    def test_response_identity(self):
+        content = http_cache.PrecompressedContent(b"content", "text/plain")
+
+        response = content.response(
+            fake_request(**{"accept-encoding": "gzip;q=0, br;q=0"})
+        )
+
+        assert response.body == b"content"
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-type"].startswith("text/plain")
+
+    def test_response_not_modified(self):
+        content = http_cache.PrecompressedContent(b"content", "text/plain")
+
+        response = content.response(
+            fake_request(**{"if-none-match": content.etag})
+        )
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == content.etag
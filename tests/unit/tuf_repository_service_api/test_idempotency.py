@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+import pytest
+from fastapi import HTTPException
+
+from repository_service_tuf_api import idempotency
+
+
+def fake_scripts(monkeypatch, data):
+    """Fake idempotency Lua scripts, on the Result Backend data"""
+
+    async def claim(keys, args):
+        value, _ = args
+        if keys[0] in data:
+            return data[keys[0]]
+        data[keys[0]] = value.encode()
+
+    async def cas(keys, args):
+        expected, new, _ = args
+        if data.get(keys[0]) != expected.encode():
+            return 0
+        if new == "":
+            del data[keys[0]]
+        else:
+            data[keys[0]] = new.encode()
+        return 1
+
+    fake_claim = pretend.call_recorder(claim)
+    fake_cas = pretend.call_recorder(cas)
+    monkeypatch.setattr(idempotency, "_claim", fake_claim)
+    monkeypatch.setattr(idempotency, "_cas", fake_cas)
+
+    return fake_claim, fake_cas
+
+
+class TestIdempotentRequest:
+    def test_payload_digest(self):
+        assert idempotency.payload_digest(
+            {"b": [1, 2], "a": "x"}
+        ) == idempotency.payload_digest({"a": "x", "b": [1, 2]})
+        assert idempotency.payload_digest(
+            {"b": [1, 2]}
+        ) != idempotency.payload_digest({"b": [2, 1]})
+
+    def test_from_request(self, monkeypatch):
+        monkeypatch.setattr(idempotency, "DEDUPLICATION_WINDOW", 0)
+        assert (
+            idempotency.IdempotentRequest.from_request("a", {}, None) is None
+        )
+
+        request = idempotency.IdempotentRequest.from_request("a", {}, "key")
+        assert request.key == "rstuf-idempotency-a:key"
+        assert request.ttl == 86400
+
+    def test_from_request_deduplication_window(self, monkeypatch):
+        monkeypatch.setattr(idempotency, "DEDUPLICATION_WINDOW", 30)
+
+        request = idempotency.IdempotentRequest.from_request(
+            "a", {"k": "v"}, None
+        )
+        assert request.key == (
+            f"rstuf-idempotency-a:{idempotency.payload_digest({'k': 'v'})}"
+        )
+        assert request.ttl == 30
+
+    def test_claim(self, monkeypatch):
+        data = {}
+        fake_claim, fake_cas = fake_scripts(monkeypatch, data)
+        request = idempotency.IdempotentRequest("a", {"k": "v"}, "key")
+
+        assert asyncio.run(request.claim("task_1")) is None
+        asyncio.run(request.published())
+        # repeated request
+        assert asyncio.run(request.claim("task_2")) == "task_1"
+        assert fake_claim.calls == [
+            pretend.call(
+                keys=["rstuf-idempotency-a:key"],
+                args=[f"task_1 {request.digest} pending", 60],
+            ),
+            pretend.call(
+                keys=["rstuf-idempotency-a:key"],
+                args=[f"task_2 {request.digest} pending", 60],
+            ),
+        ]
+        assert fake_cas.calls == [
+            pretend.call(
+                keys=["rstuf-idempotency-a:key"],
+                args=[
+                    f"task_1 {request.digest} pending",
+                    f"task_1 {request.digest} published",
+                    86400,
+                ],
+            )
+        ]
+        assert data == {
+            "rstuf-idempotency-a:key": (
+                f"task_1 {request.digest} published".encode()
+            )
+        }
+
+    def test_claim_pending_ttl(self, monkeypatch):
+        monkeypatch.setattr(idempotency, "DEDUPLICATION_WINDOW", 30)
+        fake_claim, _ = fake_scripts(monkeypatch, {})
+        request = idempotency.IdempotentRequest("a", {"k": "v"}, None)
+
+        asyncio.run(request.claim("task_1"))
+
+        # the pending claim doesn't outlive the deduplication window
+        assert fake_claim.calls[0].kwargs["args"][1] == 30
+
+    def test_claim_different_payload(self, monkeypatch):
+        fake_scripts(monkeypatch, {})
+        asyncio.run(
+            idempotency.IdempotentRequest("a", {"k": "v"}, "key").claim("t1")
+        )
+
+        with pytest.raises(HTTPException) as err:
+            asyncio.run(
+                idempotency.IdempotentRequest("a", {"k": "x"}, "key").claim(
+                    "t2"
+                )
+            )
+
+        assert err.value.status_code == 422
+        assert err.value.detail == {
+            "message": "Task not accepted.",
+            "error": "Idempotency-Key already used with a different payload",
+        }
+
+    def test_claim_original_pending(self, monkeypatch):
+        data = {}
+        fake_scripts(monkeypatch, data)
+        original = idempotency.IdempotentRequest("a", {"k": "v"}, "key")
+        asyncio.run(original.claim("task_1"))
+
+        # repeated while the original isn't published, as it could fail
+        repeated = idempotency.IdempotentRequest("a", {"k": "v"}, "key")
+        with pytest.raises(HTTPException) as err:
+            asyncio.run(repeated.claim("task_2"))
+
+        assert err.value.status_code == 409
+        assert err.value.detail == {
+            "message": "Task not accepted.",
+            "error": (
+                "The original request (task task_1) is still being "
+                "submitted, retry later"
+            ),
+        }
+
+        # the original fails to publish, the repeated request is retried
+        asyncio.run(original.release())
+        assert data == {}
+        assert asyncio.run(repeated.claim("task_2")) is None
+
+    def test_claim_legacy_value(self, monkeypatch):
+        request = idempotency.IdempotentRequest("a", None, "key")
+        fake_scripts(
+            monkeypatch,
+            {request.key: f"task_1 {request.digest}".encode()},
+        )
+
+        assert asyncio.run(request.claim("task_2")) == "task_1"
+
+    def test_release(self, monkeypatch):
+        data = {}
+        fake_scripts(monkeypatch, data)
+        request = idempotency.IdempotentRequest("a", None, "key")
+        asyncio.run(request.claim("task_1"))
+
+        asyncio.run(request.release())
+
+        assert data == {}
+        assert asyncio.run(request.claim("task_2")) is None
+
+    def test_expired_claim(self, monkeypatch):
+        data = {}
+        fake_scripts(monkeypatch, data)
+        first = idempotency.IdempotentRequest("a", None, "key")
+        asyncio.run(first.claim("task_1"))
+        # the first claim expires and the key is claimed again
+        data.clear()
+        second = idempotency.IdempotentRequest("a", None, "key")
+        assert asyncio.run(second.claim("task_2")) is None
+        second_claim = data[second.key]
+
+        # the first request doesn't own the key anymore
+        asyncio.run(first.published())
+        assert data[second.key] == second_claim
+        asyncio.run(first.release())
+        assert data[second.key] == second_claim
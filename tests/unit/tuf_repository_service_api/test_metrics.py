@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+from prometheus_client import REGISTRY, Histogram
+
+from repository_service_tuf_api import metrics
+
+
+def sample_value(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    def test_timed(self):
+        histogram = Histogram("test_timed_seconds", "test", registry=None)
+
+        @metrics.timed(histogram)
+        def func(value):
+            return value
+
+        assert func("sync") == "sync"
+        assert histogram._sum.get() > 0
+
+    def test_timed_async(self):
+        histogram = Histogram(
+            "test_timed_async_seconds", "test", registry=None
+        )
+
+        @metrics.timed(histogram)
+        async def func(value):
+            return value
+
+        assert asyncio.run(func("async")) == "async"
+        assert histogram._sum.get() > 0
+
+    def test_task_publish(self):
+        publish_count = sample_value(
+            "rstuf_api_task_publish_duration_seconds_count"
+        )
+        published = sample_value(
+            "rstuf_api_tasks_published_total", {"task": "add_artifacts"}
+        )
+        headers = {
+            "id": "task_id",
+            "task": "app.repository_service_tuf_worker",
+        }
+        body = ([], {"action": "add_artifacts", "payload": {}}, {})
+
+        metrics._before_task_publish(headers=headers, body=body)
+        metrics._after_task_publish(headers=headers, body=body)
+
+        assert (
+            sample_value("rstuf_api_task_publish_duration_seconds_count")
+            == publish_count + 1
+        )
+        assert (
+            sample_value(
+                "rstuf_api_tasks_published_total", {"task": "add_artifacts"}
+            )
+            == published + 1
+        )
+        assert metrics._publishing == {}
+
+    def test_task_publish_failed(self, monkeypatch):
+        monkeypatch.setattr(metrics, "_PUBLISHING_MAX_SIZE", 2)
+
+        # no `after_task_publish` for the failed publishes
+        for task_id in ["task_1", "task_2", "task_3"]:
+            metrics._before_task_publish(headers={"id": task_id})
+
+        assert list(metrics._publishing) == ["task_2", "task_3"]
+        metrics._publishing.clear()
+
+    def test_metrics_endpoint(self, test_client):
+        labels = {"method": "GET", "route": "/api/v1/task/", "status": "422"}
+        requests = sample_value("rstuf_api_requests_total", labels)
+
+        test_response = test_client.get("/api/v1/task/")
+        assert test_response.status_code == 422
+        test_response = test_client.get("/metrics")
+        assert test_response.status_code == 200
+        assert test_response.headers["content-type"].startswith("text/plain")
+        assert "rstuf_api_request_duration_seconds_bucket" in (
+            test_response.text
+        )
+        assert sample_value("rstuf_api_requests_total", labels) == (
+            requests + 1
+        )
+
+    def test_metrics_unmatched_route(self, test_client):
+        labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+        requests = sample_value("rstuf_api_requests_total", labels)
+
+        test_response = test_client.get("/not-found")
+        assert test_response.status_code == 404
+        assert sample_value("rstuf_api_requests_total", labels) == (
+            requests + 1
+        )
+
+    def test_metrics_starlette_route(self, test_client):
+        labels = {"method": "GET", "route": "/openapi.json", "status": "200"}
+        requests = sample_value("rstuf_api_requests_total", labels)
+
+        test_response = test_client.get("/openapi.json")
+        assert test_response.status_code == 200
+        assert sample_value("rstuf_api_requests_total", labels) == (
+            requests + 1
+        )
+
+    def test__registry_multiprocess(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        fake_collector = pretend.call_recorder(lambda registry: None)
+        monkeypatch.setattr(
+            "repository_service_tuf_api.metrics.MultiProcessCollector",
+            fake_collector,
+        )
+
+        registry = metrics._registry()
+
+        assert registry is not REGISTRY
+        assert fake_collector.calls == [pretend.call(registry)]
+
+    def test__registry(self, monkeypatch):
+        monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+        assert metrics._registry() is REGISTRY
@@ -0,0 +1,378 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+import os
+
+import pretend
+import pytest
+from celery import Celery
+from celery.backends.redis import SentinelBackend
+from redis.cluster import key_slot
+
+from repository_service_tuf_api import redis_modes
+
+# Tests against local Redis processes, skipped if not configured. Example:
+#
+#   for port in 7000 7001 7002; do
+#       redis-server --port $port --cluster-enabled yes \
+#           --cluster-config-file nodes-$port.conf \
+#           --notify-keyspace-events Kh --daemonize yes
+#   done
+#   redis-cli --cluster create 127.0.0.1:7000 127.0.0.1:7001 \
+#       127.0.0.1:7002 --cluster-yes
+#   RSTUF_TEST_REDIS_CLUSTER_NODES=127.0.0.1:7000,127.0.0.1:7001 pytest ...
+#
+# and a Redis primary with Sentinels monitoring it as `mymaster`:
+#
+#   RSTUF_TEST_REDIS_SENTINELS=127.0.0.1:26379,127.0.0.1:26380 pytest ...
+TEST_CLUSTER_NODES = redis_modes.parse_nodes(
+    os.environ.get("RSTUF_TEST_REDIS_CLUSTER_NODES"), 6379
+)
+TEST_SENTINELS = redis_modes.parse_nodes(
+    os.environ.get("RSTUF_TEST_REDIS_SENTINELS"), 26379
+)
+
+
+def connections(mode, **kwargs):
+    return redis_modes.RedisConnections(mode, "redis", 6379, **kwargs)
+
+
+class TestRedisConnections:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, []),
+            ("", []),
+            ("redis", [("redis", 26379)]),
+            (
+                "redis://redis-1:7000, redis-2,",
+                [("redis-1", 7000), ("redis-2", 26379)],
+            ),
+        ],
+    )
+    def test_parse_nodes(self, value, expected):
+        assert redis_modes.parse_nodes(value, 26379) == expected
+
+    def test_hash_tag(self):
+        key = redis_modes.hash_tag("rstuf-settings-version", "HOLDER")
+
+        assert key == "rstuf-settings-version{HOLDER}"
+        assert key_slot(key.encode()) == key_slot(b"HOLDER")
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError) as err:
+            connections("replicated")
+
+        assert "Invalid Redis mode 'replicated'" in str(err)
+
+    def test_sentinel_mode_without_sentinels(self):
+        with pytest.raises(ValueError) as err:
+            connections("sentinel")
+
+        assert "requires the sentinels" in str(err)
+
+    def test_standalone(self, monkeypatch):
+        fake_strict_redis = pretend.call_recorder(lambda **kw: "client")
+        monkeypatch.setattr(redis_modes, "StrictRedis", fake_strict_redis)
+        redis = connections("standalone")
+
+        assert redis.client(1, decode_responses=True) == "client"
+        assert fake_strict_redis.calls == [
+            pretend.call(host="redis", port=6379, db=1, decode_responses=True)
+        ]
+        assert redis.hash_tagged("key", "tag") == "key"
+        assert redis.keyspace_channel(1, "HOLDER") == "__keyspace@1__:HOLDER"
+        assert redis.result_backend(0) == ("redis://redis:6379/0", {})
+
+    def test_standalone_keyspace_pubsub(self, monkeypatch):
+        fake_client = pretend.stub(
+            pubsub=pretend.call_recorder(lambda **kw: "pubsub")
+        )
+        monkeypatch.setattr(
+            redis_modes, "StrictRedis", lambda **kw: fake_client
+        )
+
+        pubsub = connections("standalone").keyspace_pubsub(1, "HOLDER")
+
+        assert pubsub == "pubsub"
+        assert fake_client.pubsub.calls == [
+            pretend.call(ignore_subscribe_messages=True)
+        ]
+
+    def test_sentinel(self, monkeypatch):
+        fake_sentinel = pretend.stub(
+            master_for=pretend.call_recorder(lambda *a, **kw: "client")
+        )
+        fake_sentinel_class = pretend.call_recorder(lambda s: fake_sentinel)
+        monkeypatch.setattr(redis_modes, "Sentinel", fake_sentinel_class)
+        monkeypatch.setattr(redis_modes, "AsyncSentinel", fake_sentinel_class)
+        sentinels = [("sentinel-1", 26379), ("sentinel-2", 26380)]
+        redis = connections(
+            "sentinel", sentinels=sentinels, sentinel_master="rstuf"
+        )
+
+        assert redis.client(1, decode_responses=True) == "client"
+        assert redis.async_client(0) == "client"
+        assert fake_sentinel_class.calls == [
+            pretend.call(sentinels),
+            pretend.call(sentinels),
+        ]
+        assert fake_sentinel.master_for.calls == [
+            pretend.call("rstuf", db=1, decode_responses=True),
+            pretend.call("rstuf", db=0),
+        ]
+        assert redis.keyspace_channel(1, "HOLDER") == "__keyspace@1__:HOLDER"
+
+    def test_sentinel_result_backend(self):
+        redis = connections(
+            "sentinel",
+            sentinels=[("sentinel-1", 26379), ("sentinel-2", 26380)],
+            sentinel_master="rstuf",
+        )
+        url, options = redis.result_backend(2)
+
+        assert url == (
+            "sentinel://sentinel-1:26379/2;sentinel://sentinel-2:26380/2"
+        )
+        assert options == {"master_name": "rstuf"}
+
+        app = Celery(set_as_current=False)
+        app.conf.result_backend = url
+        app.conf.result_backend_transport_options = options
+
+        assert isinstance(app.backend, SentinelBackend)
+        assert app.backend.connparams["db"] == 2
+
+    def test_cluster(self, monkeypatch):
+        fake_cluster_redis = pretend.call_recorder(lambda **kw: "client")
+        monkeypatch.setattr(redis_modes, "ClusterRedis", fake_cluster_redis)
+        redis = connections("cluster")
+
+        client = redis.client(1, decode_responses=True)
+
+        # connected on first use
+        assert fake_cluster_redis.calls == []
+        assert client.client == "client"
+        assert len(fake_cluster_redis.calls) == 1
+        startup_nodes = fake_cluster_redis.calls[0].kwargs["startup_nodes"]
+        assert [(n.host, n.port) for n in startup_nodes] == [("redis", 6379)]
+        assert fake_cluster_redis.calls[0].kwargs["decode_responses"]
+        assert redis.hash_tagged("key", "tag") == "key{tag}"
+        assert redis.keyspace_channel(1, "HOLDER") == "__keyspace@0__:HOLDER"
+
+    def test_cluster_keyspace_pubsub(self, monkeypatch):
+        fake_client = pretend.stub(
+            get_node_from_key=pretend.call_recorder(lambda key: "node"),
+            pubsub=pretend.call_recorder(lambda **kw: "pubsub"),
+        )
+        monkeypatch.setattr(
+            redis_modes, "ClusterRedis", lambda **kw: fake_client
+        )
+
+        pubsub = connections("cluster").keyspace_pubsub(1, "HOLDER")
+
+        assert pubsub == "pubsub"
+        assert fake_client.get_node_from_key.calls == [pretend.call("HOLDER")]
+        assert fake_client.pubsub.calls == [
+            pretend.call(node="node", ignore_subscribe_messages=True)
+        ]
+
+    def test_cluster_async_client(self):
+        redis = connections(
+            "cluster", cluster_nodes=[("redis-1", 7000), ("redis-2", 7001)]
+        )
+
+        client = redis.async_client(0)
+
+        assert isinstance(client, redis_modes.AsyncClusterRedis)
+        assert list(client.nodes_manager.startup_nodes) == [
+            "redis-1:7000",
+            "redis-2:7001",
+        ]
+
+    def test_cluster_result_backend(self):
+        redis = connections(
+            "cluster", cluster_nodes=[("redis-1", 7000), ("redis-2", 7001)]
+        )
+        url, options = redis.result_backend(2)
+
+        assert url == (
+            "repository_service_tuf_api.redis_modes:"
+            "RedisClusterBackend+redis://redis-1:7000/0"
+        )
+        assert options == {
+            "startup_nodes": [("redis-1", 7000), ("redis-2", 7001)]
+        }
+
+        app = Celery(set_as_current=False)
+        app.conf.result_backend = url
+        app.conf.result_backend_transport_options = options
+
+        assert isinstance(app.backend, redis_modes.RedisClusterBackend)
+        assert app.backend.get_key_for_task("id") == b"celery-task-meta-id"
+
+    def test_cluster_backend_client(self, monkeypatch):
+        fake_cluster_redis = pretend.call_recorder(lambda **kw: "client")
+        monkeypatch.setattr(redis_modes, "ClusterRedis", fake_cluster_redis)
+        app = Celery(set_as_current=False)
+        app.conf.result_backend = (
+            "repository_service_tuf_api.redis_modes:"
+            "RedisClusterBackend+redis://redis-1:7000/0"
+        )
+
+        assert app.backend.client == "client"
+        startup_nodes = fake_cluster_redis.calls[0].kwargs["startup_nodes"]
+        assert [(n.host, n.port) for n in startup_nodes] == [("redis-1", 7000)]
+
+    def test_lazy_client_register_script(self):
+        factory = pretend.call_recorder(lambda: None)
+        lazy_client = redis_modes.LazyClient(factory)
+
+        script = lazy_client.register_script("return 1")
+
+        assert script.registered_client is lazy_client
+        assert script.sha == "e0e1f9fabfc9d4800c877a703b823ac0578ff8db"
+        assert factory.calls == []
+
+    def test_reset_async_client(self):
+        fake_client = pretend.stub(
+            connection_pool=pretend.stub(
+                reset=pretend.call_recorder(lambda: None)
+            )
+        )
+
+        redis_modes.reset_async_client(fake_client)
+
+        assert fake_client.connection_pool.reset.calls == [pretend.call()]
+
+    def test_reset_async_client_cluster(self):
+        client = connections("cluster").async_client(0)
+        node = client.nodes_manager.startup_nodes["redis:6379"]
+        node._connections.append("connection")
+        node._free.append("connection")
+        client.pubsub()
+
+        redis_modes.reset_async_client(client)
+
+        assert node._connections == []
+        assert len(node._free) == 0
+
+    def test_async_cluster_mget(self, monkeypatch):
+        client = connections("cluster").async_client(0)
+
+        async def fake_mget_nonatomic(keys, *args):
+            return ["value"] * len(keys)
+
+        monkeypatch.setattr(
+            client,
+            "mget_nonatomic",
+            pretend.call_recorder(fake_mget_nonatomic),
+        )
+
+        assert asyncio.run(client.mget(["a", "b"])) == ["value", "value"]
+        assert client.mget_nonatomic.calls == [pretend.call(["a", "b"])]
+
+    def test_async_cluster_pubsub(self):
+        client = connections(
+            "cluster", cluster_nodes=[("redis-1", 7000)]
+        ).async_client(0)
+
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+
+        kwargs = pubsub.connection_pool.connection_kwargs
+        assert (kwargs["host"], kwargs["port"]) == ("redis-1", 7000)
+        assert pubsub.ignore_subscribe_messages is True
+
+
+@pytest.mark.skipif(
+    len(TEST_CLUSTER_NODES) == 0, reason="RSTUF_TEST_REDIS_CLUSTER_NODES"
+)
+class TestRedisCluster:
+    def connections(self):
+        host, port = TEST_CLUSTER_NODES[0]
+        return redis_modes.RedisConnections(
+            "cluster", host, port, cluster_nodes=TEST_CLUSTER_NODES
+        )
+
+    def test_script_hash_tagged_keys(self):
+        redis = self.connections()
+        client = redis.client(0, decode_responses=True)
+        version_key = redis.hash_tagged("rstuf-test-version", "RSTUF_TEST")
+        script = client.register_script(
+            "redis.call('HSET', KEYS[1], 'BOOTSTRAP', ARGV[1]) "
+            "return redis.call('INCR', KEYS[2])"
+        )
+
+        try:
+            version = script(keys=["RSTUF_TEST", version_key], args=["v"])
+
+            assert client.get(version_key) == str(version)
+            assert client.hget("RSTUF_TEST", "BOOTSTRAP") == "v"
+        finally:
+            client.delete("RSTUF_TEST", version_key)
+
+    def test_mget_slots(self):
+        client = self.connections().client(0, decode_responses=True)
+        keys = [f"rstuf-test-{i}" for i in range(16)]
+        try:
+            for key in keys:
+                client.set(key, key)
+
+            assert client.mget(keys + ["rstuf-test-unknown"]) == keys + [None]
+        finally:
+            client.delete(*keys)
+
+    def test_async_pubsub(self):
+        redis = self.connections()
+
+        async def publish_and_receive():
+            client = redis.async_client(0)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe("rstuf-test-channel")
+            try:
+                # published in another node of the cluster
+                await client.publish("rstuf-test-channel", "meta")
+                return await pubsub.get_message(timeout=5)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+        message = asyncio.run(publish_and_receive())
+
+        assert message["data"] == b"meta"
+
+
+@pytest.mark.skipif(
+    len(TEST_SENTINELS) == 0, reason="RSTUF_TEST_REDIS_SENTINELS"
+)
+class TestRedisSentinel:
+    def test_client(self):
+        redis = redis_modes.RedisConnections(
+            "sentinel", "redis", 6379, sentinels=TEST_SENTINELS
+        )
+        client = redis.client(1, decode_responses=True)
+        try:
+            client.set("rstuf-test", "value")
+
+            assert client.get("rstuf-test") == "value"
+        finally:
+            client.delete("rstuf-test")
+
+    def test_result_backend(self):
+        redis = redis_modes.RedisConnections(
+            "sentinel", "redis", 6379, sentinels=TEST_SENTINELS
+        )
+        app = Celery(set_as_current=False)
+        (
+            app.conf.result_backend,
+            app.conf.result_backend_transport_options,
+        ) = redis.result_backend(0)
+
+        app.backend.store_result(
+            "rstuf-test-task", {"status": True}, "SUCCESS"
+        )
+        try:
+            assert app.AsyncResult("rstuf-test-task").status == "SUCCESS"
+        finally:
+            app.backend.forget("rstuf-test-task")
@@ -0,0 +1,294 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import asyncio
+
+import pretend
+import pytest
+from redis.exceptions import ConnectionError
+
+from repository_service_tuf_api import replicas
+
+
+def fake_redis(info):
+    def fake_info(section):
+        if isinstance(info, Exception):
+            raise info
+        return info
+
+    return pretend.stub(info=pretend.call_recorder(fake_info))
+
+
+def fake_primary(offsets):
+    offsets = iter(offsets)
+    return pretend.stub(
+        info=lambda section: {"master_repl_offset": next(offsets)}
+    )
+
+
+class TestReplicasState:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, []),
+            ("", []),
+            ("redis://replica1", ["redis://replica1"]),
+            (
+                "redis://replica1:6380, redis://replica2,",
+                ["redis://replica1:6380", "redis://replica2"],
+            ),
+        ],
+    )
+    def test_parse_replica_urls(self, value, expected):
+        assert replicas.parse_replica_urls(value) == expected
+
+    def test_check(self):
+        in_sync = fake_redis(
+            {"master_link_status": "up", "slave_repl_offset": 100}
+        )
+        link_down = fake_redis(
+            {"master_link_status": "down", "slave_repl_offset": 100}
+        )
+        behind = fake_redis(
+            {"master_link_status": "up", "slave_repl_offset": 90}
+        )
+        unavailable = fake_redis(ConnectionError("connection refused"))
+        state = replicas.ReplicasState(
+            [in_sync, link_down, behind, unavailable], 5
+        )
+
+        assert state.pick() is None
+
+        state.check(fake_primary([100]))
+
+        assert in_sync.info.calls == [pretend.call("replication")]
+        assert state.pick() == 0
+        assert state.pick() == 0
+
+    def test_check_staleness_bound(self, monkeypatch):
+        replica = fake_redis(
+            {"master_link_status": "up", "slave_repl_offset": 100}
+        )
+        state = replicas.ReplicasState([replica], 5)
+        primary = fake_primary([100, 150, 200, 250])
+        now = iter([0, 3, 6, 12])
+        monkeypatch.setattr(replicas.time, "monotonic", lambda: next(now))
+
+        # t=0 and t=3: the first primary offset (100) is required
+        state.check(primary)
+        assert state.pick() == 0
+        state.check(primary)
+        assert state.pick() == 0
+        # t=6: the primary offset of t=0 (100) is required
+        state.check(primary)
+        assert state.pick() == 0
+        # t=12: the primary offset of t=6 (200) is required
+        state.check(primary)
+        assert state.pick() is None
+
+    def test_check_primary_unavailable(self):
+        replica = fake_redis(
+            {"master_link_status": "up", "slave_repl_offset": 100}
+        )
+        state = replicas.ReplicasState([replica], 5)
+        state.check(fake_primary([100]))
+
+        state.check(fake_redis(ConnectionError("connection refused")))
+
+        assert state.pick() is None
+
+    def test_pick_round_robin(self):
+        replica = fake_redis(
+            {"master_link_status": "up", "slave_repl_offset": 100}
+        )
+        state = replicas.ReplicasState([replica, replica, replica], 5)
+        state.check(fake_primary([100]))
+
+        assert [state.pick() for _ in range(4)] == [0, 1, 2, 0]
+
+        state.mark_out_of_sync(1)
+
+        assert [state.pick() for _ in range(2)] == [0, 2]
+
+    def test_monitor(self, monkeypatch):
+        state = replicas.ReplicasState([], 5)
+        state.check = pretend.call_recorder(lambda primary: None)
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raise StopIteration
+
+        monkeypatch.setattr(replicas.time, "sleep", fake_sleep)
+        primary = pretend.stub()
+
+        with pytest.raises(StopIteration):
+            state.monitor(primary, 1)
+
+        assert state.check.calls == [pretend.call(primary)] * 2
+        assert sleeps == [1, 1]
+
+    def test_start_monitor(self, monkeypatch):
+        state = replicas.ReplicasState([], 5)
+        fake_thread = pretend.stub(start=pretend.call_recorder(lambda: None))
+        fake_thread_class = pretend.call_recorder(
+            lambda *args, **kwargs: fake_thread
+        )
+        monkeypatch.setattr(replicas, "Thread", fake_thread_class)
+        primary = pretend.stub()
+
+        state.start_monitor(primary, 1)
+
+        assert fake_thread_class.calls == [
+            pretend.call(
+                None,
+                state.monitor,
+                args=(primary, 1),
+                name="replicas-monitor",
+                daemon=True,
+            )
+        ]
+        assert fake_thread.start.calls == [pretend.call()]
+
+
+class TestReadReplicas:
+    def state(self, in_sync):
+        return pretend.stub(
+            pick=lambda: 0 if in_sync else None,
+            mark_out_of_sync=pretend.call_recorder(lambda index: None),
+        )
+
+    def test_read_replica(self):
+        primary = pretend.stub(get=pretend.call_recorder(lambda key: "p"))
+        replica = pretend.stub(get=pretend.call_recorder(lambda key: "r"))
+        read_replicas = replicas.ReadReplicas(
+            primary, [replica], self.state(True)
+        )
+
+        assert read_replicas.get("key") == "r"
+        assert replica.get.calls == [pretend.call("key")]
+        assert primary.get.calls == []
+
+    def test_read_primary(self):
+        primary = pretend.stub(get=pretend.call_recorder(lambda key: "p"))
+        read_replicas = replicas.ReadReplicas(
+            primary, [pretend.stub()], self.state(False)
+        )
+
+        assert read_replicas.get("key") == "p"
+        assert primary.get.calls == [pretend.call("key")]
+
+    def test_read_replica_error(self):
+        def fake_get(key):
+            raise ConnectionError("connection refused")
+
+        primary = pretend.stub(get=lambda key: "p")
+        state = self.state(True)
+        read_replicas = replicas.ReadReplicas(
+            primary, [pretend.stub(get=fake_get)], state
+        )
+
+        assert read_replicas.get("key") == "p"
+        assert state.mark_out_of_sync.calls == [pretend.call(0)]
+
+    def test_async_read_replica(self):
+        async def fake_mget(keys):
+            return ["r"]
+
+        replica = pretend.stub(mget=pretend.call_recorder(fake_mget))
+        read_replicas = replicas.AsyncReadReplicas(
+            pretend.stub(), [replica], self.state(True)
+        )
+
+        assert asyncio.run(read_replicas.mget(["key"])) == ["r"]
+        assert replica.mget.calls == [pretend.call(["key"])]
+
+    def test_async_read_replica_error(self):
+        async def fake_replica_mget(keys):
+            raise ConnectionError("connection refused")
+
+        async def fake_primary_mget(keys):
+            return ["p"]
+
+        state = self.state(True)
+        read_replicas = replicas.AsyncReadReplicas(
+            pretend.stub(mget=fake_primary_mget),
+            [pretend.stub(mget=fake_replica_mget)],
+            state,
+        )
+
+        assert asyncio.run(read_replicas.mget(["key"])) == ["p"]
+        assert state.mark_out_of_sync.calls == [pretend.call(0)]
+
+    def round_robin_state(self):
+        picks = iter([0, 1, 0, 1])
+        return pretend.stub(
+            pick=pretend.call_recorder(lambda: next(picks)),
+            mark_out_of_sync=pretend.call_recorder(lambda index: None),
+        )
+
+    def test_pinned(self):
+        replica_0 = pretend.stub(get=lambda key: "r0", hgetall=lambda key: 0)
+        replica_1 = pretend.stub(get=lambda key: "r1", hgetall=lambda key: 1)
+        state = self.round_robin_state()
+        read_replicas = replicas.ReadReplicas(
+            pretend.stub(), [replica_0, replica_1], state
+        )
+
+        with read_replicas.pinned():
+            with read_replicas.pinned():
+                assert read_replicas.get("version") == "r0"
+            assert read_replicas.hgetall("settings") == 0
+
+        # a replica is picked once by context
+        assert len(state.pick.calls) == 1
+        assert read_replicas.get("version") == "r1"
+
+    def test_pinned_primary(self):
+        primary = pretend.stub(get=lambda key: "p", hgetall=lambda key: "p")
+        state = pretend.stub(pick=pretend.call_recorder(lambda: None))
+        read_replicas = replicas.ReadReplicas(primary, [pretend.stub()], state)
+
+        with read_replicas.pinned():
+            assert read_replicas.get("version") == "p"
+            assert read_replicas.hgetall("settings") == "p"
+
+        assert len(state.pick.calls) == 1
+
+    def test_pinned_replica_error(self):
+        def fake_get(key):
+            raise ConnectionError("connection refused")
+
+        primary = pretend.stub(get=lambda key: "p", hgetall=lambda key: "p")
+        replica_1 = pretend.stub(get=lambda key: "r1", hgetall=lambda key: 1)
+        state = self.round_robin_state()
+        read_replicas = replicas.ReadReplicas(
+            primary, [pretend.stub(get=fake_get), replica_1], state
+        )
+
+        with read_replicas.pinned():
+            assert read_replicas.get("version") == "p"
+            # the next reads are from the primary, not from other replica
+            assert read_replicas.hgetall("settings") == "p"
+
+        assert state.mark_out_of_sync.calls == [pretend.call(0)]
+
+    def test_async_pinned(self):
+        async def fake_get(key, value):
+            return value
+
+        replica_0 = pretend.stub(get=lambda key: fake_get(key, "r0"))
+        replica_1 = pretend.stub(get=lambda key: fake_get(key, "r1"))
+        read_replicas = replicas.AsyncReadReplicas(
+            pretend.stub(), [replica_0, replica_1], self.round_robin_state()
+        )
+
+        async def read():
+            with read_replicas.pinned():
+                return [
+                    await read_replicas.get("version"),
+                    await read_replicas.get("settings"),
+                ]
+
+        assert asyncio.run(read()) == ["r0", "r0"]
@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import pretend
+import pytest
+from redis.exceptions import RedisError
+
+from repository_service_tuf_api import settings_changes
+from repository_service_tuf_api.redis_modes import RedisConnections
+
+
+class TestSettingsChanges:
+    def test_notify_settings_change_callback_error(self, monkeypatch, caplog):
+        def fake_callback():
+            raise ValueError("failed")
+
+        fake_ok_callback = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            settings_changes,
+            "_settings_change_callbacks",
+            [fake_callback, fake_ok_callback],
+        )
+
+        settings_changes.notify_settings_change()
+
+        assert fake_ok_callback.calls == [pretend.call()]
+        assert "Settings change callback failed: failed" in caplog.text
+
+    def test_settings_listener(self, monkeypatch):
+        class StopListener(Exception):
+            pass
+
+        def fake_listen():
+            yield {"type": "message", "data": "hset"}
+            raise RedisError("connection lost")
+
+        fake_pubsub = pretend.stub(
+            subscribe=pretend.call_recorder(lambda *a: None),
+            listen=fake_listen,
+        )
+        redis_connections = RedisConnections("standalone", "redis", 6379)
+        fake_keyspace_pubsub = pretend.call_recorder(
+            lambda *a, **kw: fake_pubsub
+        )
+        monkeypatch.setattr(
+            redis_connections, "keyspace_pubsub", fake_keyspace_pubsub
+        )
+        fake_callback = pretend.call_recorder(lambda: None)
+        monkeypatch.setattr(
+            settings_changes, "_settings_change_callbacks", [fake_callback]
+        )
+
+        def fake_sleep(interval):
+            raise StopListener()
+
+        monkeypatch.setattr(settings_changes.time, "sleep", fake_sleep)
+
+        with pytest.raises(StopListener):
+            settings_changes.settings_listener(
+                redis_connections, 1, "DYNACONF_MAIN"
+            )
+
+        assert fake_keyspace_pubsub.calls == [
+            pretend.call(1, "DYNACONF_MAIN", decode_responses=True)
+        ]
+        assert fake_pubsub.subscribe.calls == [
+            pretend.call("__keyspace@1__:DYNACONF_MAIN")
+        ]
+        # connect, message and disconnection
+        assert len(fake_callback.calls) == 3
+
+    def test_start_settings_listener(self, monkeypatch):
+        fake_thread = pretend.stub(start=pretend.call_recorder(lambda: None))
+        fake_thread_class = pretend.call_recorder(
+            lambda *args, **kwargs: fake_thread
+        )
+        monkeypatch.setattr(settings_changes, "Thread", fake_thread_class)
+        redis_connections = pretend.stub()
+
+        settings_changes.start_settings_listener(
+            redis_connections, 1, "DYNACONF_MAIN"
+        )
+
+        assert fake_thread_class.calls == [
+            pretend.call(
+                None,
+                settings_changes.settings_listener,
+                args=(redis_connections, 1, "DYNACONF_MAIN"),
+                name="settings-listener",
+                daemon=True,
+            )
+        ]
+        assert fake_thread.start.calls == [pretend.call()]
@@ -0,0 +1,262 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import json
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+import pretend
+import pytest
+from redis.exceptions import RedisError
+
+from repository_service_tuf_api import shared_settings
+
+
+@pytest.fixture
+def shared_file(tmp_path):
+    return shared_settings.SharedSettingsFile(
+        str(tmp_path / "rstuf-api-settings"), 4096
+    )
+
+
+class TestSharedSettingsFile:
+    def test_never_written(self, shared_file):
+        assert shared_file.header() is None
+        assert shared_file.read() is None
+        assert os.path.getsize(shared_file.path) == 4096
+        assert shared_file.capacity == 4096 - shared_settings.HEADER.size
+
+    def test_publish(self, shared_file):
+        sequence = shared_file.publish(b"snapshot-1", None)
+
+        assert sequence == 2
+        assert shared_file.read() == (2, b"snapshot-1")
+        header_sequence, heartbeat = shared_file.header()
+        assert header_sequence == 2
+        assert time.time() - heartbeat < 60
+
+        # a shorter snapshot replaces the previous one
+        assert shared_file.publish(b"s2", sequence) == 4
+        assert shared_file.read() == (4, b"s2")
+
+    def test_publish_read_by_other_instance(self, shared_file):
+        shared_file.publish(b"snapshot-1", None)
+        reader = shared_settings.SharedSettingsFile(shared_file.path, 4096)
+
+        assert reader.read() == (2, b"snapshot-1")
+
+    def test_publish_unexpected_sequence(self, shared_file):
+        shared_file.publish(b"snapshot-1", None)
+        shared_file.invalidate()
+
+        assert shared_file.publish(b"snapshot-2", 2) is None
+        assert shared_file.read() == (4, None)
+
+    def test_publish_larger_than_capacity(self, shared_file):
+        with pytest.raises(ValueError) as err:
+            shared_file.publish(b"x" * 4096, None)
+
+        assert "larger than the shared settings file capacity" in str(err)
+        assert shared_file.header() is None
+
+    def test_read_being_written(self, shared_file, monkeypatch):
+        shared_file.publish(b"snapshot-1", None)
+        # odd sequence: a snapshot is being written
+        struct.pack_into("<Q", shared_file._mapped(), 8, 3)
+        monkeypatch.setattr(shared_settings.time, "sleep", lambda s: None)
+
+        assert shared_file.read() is None
+
+    def test_heartbeat(self, shared_file, monkeypatch):
+        shared_file.publish(b"snapshot-1", None)
+        monkeypatch.setattr(shared_settings.time, "time", lambda: 1234.5)
+
+        shared_file.heartbeat()
+
+        assert shared_file.header() == (2, 1234.5)
+        assert shared_file.read() == (2, b"snapshot-1")
+
+    def test_acquire_refresher(self, shared_file):
+        other = shared_settings.SharedSettingsFile(shared_file.path, 4096)
+
+        assert shared_file.acquire_refresher() is True
+        assert shared_file.acquire_refresher() is True
+        # the lock is held by the first instance
+        assert other.acquire_refresher() is False
+
+
+class TestSharedSettingsRefresher:
+    @pytest.fixture
+    def settings(self):
+        return {"version": "1", "values": {"BOOTSTRAP": "<task_id>"}}
+
+    @pytest.fixture
+    def refresher(self, shared_file, settings):
+        return shared_settings.SharedSettingsRefresher(
+            shared_file,
+            pretend.call_recorder(lambda: settings["version"]),
+            pretend.call_recorder(lambda: dict(settings["values"])),
+            contextmanager(lambda: (yield)),
+            reload_interval=10,
+            refresh_interval=1,
+        )
+
+    def published(self, shared_file):
+        return json.loads(shared_file.read()[1])
+
+    def test_refresh(self, refresher, shared_file, settings):
+        # version 1 (published), version 1 (heartbeat), version 2 (published)
+        refresher.refresh()
+        heartbeat = shared_file.header()[1]
+        refresher.refresh()
+
+        assert self.published(shared_file) == {
+            "version": "1",
+            "settings": {"BOOTSTRAP": "<task_id>"},
+        }
+        assert shared_file.header()[1] >= heartbeat
+        assert len(refresher.read_settings.calls) == 1
+
+        settings["version"] = "2"
+        refresher.refresh()
+
+        assert len(refresher.read_settings.calls) == 2
+        assert self.published(shared_file)["version"] == "2"
+        assert refresher.published["sequence"] == shared_file.header()[0]
+
+    def test_refresh_pinned_reads(self, shared_file, settings):
+        pinned = {"reads": []}
+
+        @contextmanager
+        def fake_pinned_reads():
+            pinned["reads"].append("pinned")
+            yield
+            pinned["reads"].append("unpinned")
+
+        def read(name, value):
+            pinned["reads"].append(name)
+            return value
+
+        refresher = shared_settings.SharedSettingsRefresher(
+            shared_file,
+            lambda: read("version", "1"),
+            lambda: read("settings", {}),
+            fake_pinned_reads,
+            reload_interval=10,
+            refresh_interval=1,
+        )
+
+        refresher.refresh()
+
+        # the version and the settings are read from the same server
+        assert pinned["reads"] == ["pinned", "version", "settings", "unpinned"]
+
+    def test_refresh_invalidated(self, refresher, shared_file):
+        refresher.refresh()
+        shared_file.invalidate()
+
+        assert shared_file.read()[1] is None
+
+        # republished, even if the version didn't change
+        refresher.refresh()
+
+        assert len(refresher.read_settings.calls) == 2
+        assert self.published(shared_file)["settings"] == {
+            "BOOTSTRAP": "<task_id>"
+        }
+
+    def test_refresh_invalidated_while_reading(self, shared_file, settings):
+        def read_settings():
+            shared_file.invalidate()
+            return settings["values"]
+
+        refresher = shared_settings.SharedSettingsRefresher(
+            shared_file,
+            lambda: "1",
+            read_settings,
+            contextmanager(lambda: (yield)),
+            reload_interval=10,
+            refresh_interval=1,
+        )
+        shared_file.publish(b"snapshot-1", None)
+
+        refresher.refresh()
+
+        # not published, as the settings could be read before the change
+        assert shared_file.read()[1] is None
+        assert refresher.published["sequence"] is None
+
+    def test_refresh_version_not_increased(
+        self, refresher, shared_file, settings, monkeypatch
+    ):
+        now = time.monotonic()
+        monkeypatch.setattr(shared_settings.time, "monotonic", lambda: now)
+        # a worker writes `BOOTSTRAP` without increasing the version
+        settings["values"] = {"BOOTSTRAP": "signing-<task_id>"}
+        refresher.refresh()
+        settings["values"] = {"BOOTSTRAP": "<task_id>"}
+        refresher.refresh()
+
+        assert len(refresher.read_settings.calls) == 1
+        assert self.published(shared_file)["settings"] == {
+            "BOOTSTRAP": "signing-<task_id>"
+        }
+
+        # all the settings are read again after the reload interval
+        now += refresher.reload_interval
+        refresher.refresh()
+
+        assert len(refresher.read_settings.calls) == 2
+        assert self.published(shared_file)["settings"] == {
+            "BOOTSTRAP": "<task_id>"
+        }
+
+    def test_run(self, refresher, monkeypatch):
+        fake_shared_file = pretend.stub(
+            acquire_refresher=pretend.call_recorder(lambda: True)
+        )
+        refresher.shared_file = fake_shared_file
+        results = iter([None, RedisError("connection refused")])
+
+        def fake_refresh():
+            result = next(results)
+            if result is not None:
+                raise result
+
+        refresher.refresh = pretend.call_recorder(fake_refresh)
+        sleeps = iter([None, StopIteration])
+
+        def fake_sleep(seconds):
+            result = next(sleeps)
+            if result is not None:
+                raise result
+
+        monkeypatch.setattr(shared_settings.time, "sleep", fake_sleep)
+
+        with pytest.raises(StopIteration):
+            refresher.run()
+
+        # refreshed, failed (retried after the interval)
+        assert len(refresher.refresh.calls) == 2
+        assert len(fake_shared_file.acquire_refresher.calls) == 2
+
+    def test_start(self, refresher, monkeypatch):
+        fake_thread = pretend.stub(start=pretend.call_recorder(lambda: None))
+        fake_thread_class = pretend.call_recorder(
+            lambda *args, **kwargs: fake_thread
+        )
+        monkeypatch.setattr(shared_settings, "Thread", fake_thread_class)
+
+        refresher.start()
+
+        assert fake_thread_class.calls == [
+            pretend.call(
+                None,
+                refresher.run,
+                name="shared-settings-refresher",
+                daemon=True,
+            )
+        ]
+        assert fake_thread.start.calls == [pretend.call()]
@@ -0,0 +1,39 @@
+# SPDX-FileCopyrightText: 2024 Repository Service for TUF Contributors
+#
+# SPDX-License-Identifier: MIT
+import pytest
+
+from repository_service_tuf_api import topology
+
+
+class TestTopology:
+    def test_repository_topology_bins(self):
+        bins_topology = topology.RepositoryTopology(True, ("bins-0", "bins-1"))
+
+        assert bins_topology.bins_used is True
+        assert bins_topology.online_roles() == [
+            "snapshot",
+            "timestamp",
+            "targets",
+            "bins",
+        ]
+        assert bins_topology.is_online_role("bins") is True
+        assert bins_topology.is_online_role("bins-0") is False
+
+    @pytest.mark.parametrize(
+        "targets_online, delegated_roles, expected",
+        [
+            (None, None, topology.RepositoryTopology(True, ())),
+            (False, ["foo"], topology.RepositoryTopology(False, ("foo",))),
+            (
+                True,
+                ["bins-0", "bins-1"],
+                topology.RepositoryTopology(True, ("bins-0", "bins-1")),
+            ),
+        ],
+    )
+    def test_parse_topology(self, targets_online, delegated_roles, expected):
+        assert (
+            topology.parse_topology(targets_online, delegated_roles)
+            == expected
+        )